@@ -1,9 +1,26 @@
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response, Header, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 from main import AgenticAIAssistant
+from agent.memory import Memory
+from agent import kb_ingest
+from metrics import REGISTRY, CONTENT_TYPE
+from idempotency import IdempotencyCache, IdempotencyConflict
 import threading
+import time
+import json
+import hashlib
+import asyncio
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -16,6 +33,73 @@ app = FastAPI(
 # We use a global instance to persist memory across requests
 agent = AgenticAIAssistant()
 
+# --- Response encoding ---
+
+API_CONFIG = agent.config.get("api", {})
+# When enabled, endpoints return pre-encoded JSON for data the agent built itself
+# instead of re-validating it through the response models.
+FAST_RESPONSES = API_CONFIG.get("fast_responses", False)
+
+# Compress responses above the threshold when the client sends Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=API_CONFIG.get("gzip_min_size", 1024))
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when installed, compact stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+# Completed /query responses, replayed for retries that carry the same Idempotency-Key
+idempotency_cache = IdempotencyCache(
+    max_entries=API_CONFIG.get("idempotency_max_entries", 1024),
+    ttl=API_CONFIG.get("idempotency_ttl", 600)
+)
+
+def _respond(model_cls, headers: Optional[Dict[str, str]] = None, **data):
+    """
+    Build the endpoint response, skipping model validation on the fast path.
+    
+    On the model path FastAPI ignores 'headers'; endpoints set them on their Response parameter too.
+    """
+    if FAST_RESPONSES:
+        return FastJSONResponse(data, headers=headers)
+    return model_cls(**data)
+
+# --- Metrics ---
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "nexus_http_request_duration_seconds", "API request latency by endpoint.", ["method", "endpoint", "status"]
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "nexus_http_request_errors_total", "API requests that failed with a 5xx status.", ["method", "endpoint"]
+)
+REGISTRY.gauge("nexus_memory_items", "Interactions held in agent memory.").set_function(
+    lambda: len(agent.memory.conversation_history)
+)
+REGISTRY.gauge("nexus_kb_entries", "Entries in the knowledge base.").set_function(
+    lambda: len(agent.kb.knowledge)
+)
+WS_SESSIONS = REGISTRY.gauge("nexus_ws_sessions", "Open WebSocket sessions.")
+WS_MESSAGES = REGISTRY.counter("nexus_ws_messages_total", "WebSocket messages by direction.", ["direction"])
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template rather than raw path to keep cardinality bounded
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", "unmatched")
+        REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint, status=status)
+        if status >= 500:
+            REQUEST_ERRORS.inc(method=request.method, endpoint=endpoint)
+
 # --- Data Models ---
 
 class QueryRequest(BaseModel):
@@ -44,44 +128,116 @@ class QueryResponse(BaseModel):
     execution_results: List[Dict[str, Any]]
 
 class HistoryItem(BaseModel):
-    role: str
-    content: str
-    timestamp: str
-    metadata: Dict[str, Any]
+    id: Optional[int] = None
+    role: Optional[str] = None
+    content: Optional[str] = None
+    timestamp: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 class HistoryResponse(BaseModel):
     history: List[HistoryItem]
+    next_cursor: Optional[int] = None
+
+class KBItem(BaseModel):
+    source: str
+    seq: int
+    content: Optional[str] = None
+    timestamp: Optional[float] = None
+    length: Optional[int] = None
+    chunks: Optional[int] = None
+
+class KBResponse(BaseModel):
+    items: List[KBItem]
+    next_cursor: Optional[int] = None
+
+HISTORY_FIELDS = ["id", "role", "content", "timestamp", "metadata"]
+KB_FIELDS = ["content", "timestamp", "length", "chunks"]
+
+# --- Helpers ---
+
+def _parse_fields(fields: Optional[str], exclude: Optional[str], allowed: List[str]) -> Optional[List[str]]:
+    """Turn comma-separated 'fields' / 'exclude' parameters into a projection list."""
+    if fields is None and exclude is None:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(allowed)
+    excluded = {f.strip() for f in exclude.split(",")} if exclude else set()
+    unknown = [f for f in list(selected) + list(excluded) if f and f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [f for f in selected if f not in excluded]
+
+def _parse_timestamp(value: Optional[str], name: str) -> Optional[str]:
+    """Normalize an ISO timestamp so it compares correctly against stored ones."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' timestamp: {value}")
+    if parsed.tzinfo is not None:
+        # History timestamps are naive local time; compare in that time, not by the offset's characters
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
 
 # --- Endpoints ---
 
 @app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest, response: Response,
+                        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """
     Process a user query using Nexus AI.
+    
+    Requests carrying an Idempotency-Key header run at most once: retries replay the
+    stored response, or wait for the original execution if it is still running.
     """
+    async def run_query():
+        # The agent is synchronous; run it off the event loop so other requests keep flowing
+        return await run_in_threadpool(agent.process_query, request.query, request.context)
+
+    headers = {}
     try:
-        # The agent.process_query is synchronous, but fast enough for this demo.
-        # For production with long running tasks, we might want to use background tasks.
-        result = agent.process_query(request.query, request.context)
+        if idempotency_key:
+            fingerprint = hashlib.sha256(
+                json.dumps([request.query, request.context], sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+            result, replayed = await idempotency_cache.run(idempotency_key, fingerprint, run_query)
+            if replayed:
+                headers["Idempotent-Replayed"] = "true"
+        else:
+            result = await run_query()
         
-        return QueryResponse(
+        response.headers.update(headers)
+        return _respond(
+            QueryResponse,
+            headers=headers,
             query=result['query'],
             response=result['response'],
             plan=result['plan'],
             execution_results=result['execution_results']
         )
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/history", response_model=HistoryResponse)
-async def get_history(limit: int = 50):
+@app.get("/history", response_model=HistoryResponse, response_model_exclude_unset=True)
+async def get_history(limit: int = Query(50, ge=1, le=500), cursor: Optional[int] = None,
+                      role: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                      fields: Optional[str] = None, exclude: Optional[str] = None):
     """
-    Get conversation history.
+    Get conversation history, newest page first.
+    
+    Pass the returned next_cursor back as 'cursor' to fetch the previous page.
+    'fields' / 'exclude' take comma-separated field names (e.g. exclude=content).
     """
+    projection = _parse_fields(fields, exclude, HISTORY_FIELDS)
+    since = _parse_timestamp(since, "since")
+    until = _parse_timestamp(until, "until")
     try:
-        history = agent.get_conversation_history()
-        # Filter explicitly to match model just in case, though pydantic handles most
-        return HistoryResponse(history=history[-limit:])
+        history, next_cursor = agent.get_conversation_page(
+            cursor=cursor, limit=limit, role=role, since=since, until=until, fields=projection
+        )
+        return _respond(HistoryResponse, history=history, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -103,13 +259,80 @@ async def health_check():
     """
     return {"status": "ok", "agent_status": "ready"}
 
-@app.get("/kb", response_model=Dict[str, Any])
-async def get_kb_content():
+@app.websocket("/ws")
+async def websocket_session(websocket: WebSocket):
+    """
+    Query session over a WebSocket.
+    
+    Clients send {"query": ..., "context": {...}} messages and receive 'plan', 'step'
+    and 'result' events (or 'error'). The session's memory lives in-process for as
+    long as the socket stays open and is not written to memory.json.
+    """
+    await websocket.accept()
+    session_memory = Memory(max_history=agent.config.get("max_history_items", 100), path=None)
+    loop = asyncio.get_running_loop()
+    WS_SESSIONS.inc()
+    
+    async def send(event: Dict[str, Any]):
+        WS_MESSAGES.inc(direction="out")
+        await websocket.send_text(json.dumps(event, default=str))
+    
+    try:
+        while True:
+            text = await websocket.receive_text()
+            WS_MESSAGES.inc(direction="in")
+            try:
+                message = json.loads(text)
+            except ValueError:
+                await send({"type": "error", "detail": "Message is not valid JSON"})
+                continue
+            query = message.get("query") if isinstance(message, dict) else None
+            if not query:
+                await send({"type": "error", "detail": "Message must contain a 'query'"})
+                continue
+            
+            events: asyncio.Queue = asyncio.Queue()
+            
+            def on_event(kind: str, payload: Dict[str, Any]):
+                # Called from the worker thread; hand events back to the event loop
+                loop.call_soon_threadsafe(events.put_nowait, {"type": kind, **payload})
+            
+            task = asyncio.ensure_future(run_in_threadpool(
+                agent.process_query, query, message.get("context"), memory=session_memory, on_event=on_event
+            ))
+            task.add_done_callback(lambda _: events.put_nowait(None))
+            
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                await send(event)
+            if task.exception() is not None:
+                await send({"type": "error", "detail": str(task.exception())})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        WS_SESSIONS.dec()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Agent, tool and storage metrics in Prometheus text exposition format.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/kb", response_model=KBResponse, response_model_exclude_unset=True)
+async def get_kb_content(limit: int = Query(50, ge=1, le=500), cursor: Optional[int] = None,
+                         fields: Optional[str] = None, exclude: Optional[str] = None):
     """
-    Get all knowledge from the agent's knowledge base.
+    Get knowledge from the agent's knowledge base, most recently learned first.
+    
+    Pass the returned next_cursor back as 'cursor' to fetch the previous page.
     """
+    projection = _parse_fields(fields, exclude, KB_FIELDS)
     try:
-        return agent.kb.get_all()
+        items, next_cursor = agent.kb.get_page(cursor=cursor, limit=limit, fields=projection)
+        return _respond(KBResponse, items=items, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -124,6 +347,37 @@ async def learn_info(source: str, content: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/kb/forget")
+async def forget_info(source: str):
+    """
+    Remove a document from the knowledge base.
+    """
+    try:
+        removed = agent.kb.forget(source)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Unknown source: {source}")
+    return {"status": "success", "message": f"Forgot {source}"}
+
+@app.post("/kb/ingest")
+async def ingest_directory(path: str, workers: int = Query(4, ge=1, le=32)):
+    """
+    Bulk-ingest a directory (inside the file tool's sandbox) into the knowledge base.
+    
+    Unchanged files are skipped and the batch is logged in one write; the response reports files/sec and bytes/sec.
+    The knowledge base's own files, the conversation memory, the log and the data cache are never ingested.
+    """
+    data_cache = agent.tools["data"].columnar
+    exclude = [agent.memory.path, agent.logger.log_file, data_cache.cache_dir if data_cache is not None else None]
+    try:
+        return await run_in_threadpool(kb_ingest.ingest_directory, agent.kb, path, agent.tools["file"],
+                                       workers=workers, exclude=exclude)
+    except (PermissionError, NotADirectoryError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
 
@@ -396,11 +396,21 @@ def render_kb_explorer():
             st.info("Knowledge base is currently empty. Use the 'Add Knowledge' tool to teach the agent.")
         else:
             search_query = st.text_input("🔍 Search KB", "")
-            for source, info in knowledge_data.items():
-                if search_query.lower() in source.lower() or search_query.lower() in info["content"].lower():
-                    with st.expander(f"📄 {source}"):
-                        st.markdown(f"**Learned on:** {datetime.fromtimestamp(info.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S')}")
-                        st.text(info["content"])
+            if search_query.strip():
+                # Ranked lookup through the KB's inverted index instead of scanning every entry
+                matches = [
+                    (r["source"], f"📄 {r['source']}  (chunk {r['chunk']}, score {r['score']:.2f})", r["content"])
+                    for r in kb.search(search_query, top_k=50)
+                ]
+                if not matches:
+                    st.info("No matching knowledge found.")
+            else:
+                matches = [(source, f"📄 {source}", None) for source in knowledge_data]
+            for source, label, text in matches:
+                info = knowledge_data[source]
+                with st.expander(label):
+                    st.markdown(f"**Learned on:** {datetime.fromtimestamp(info.get('timestamp', 0)).strftime('%Y-%m-%d %H:%M:%S')}")
+                    st.text(text if text is not None else kb.get_content(source))
 
 # --- Modify render_chat to show plan details better ---
 # (Already done in previous steps but ensuring integration)
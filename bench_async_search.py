@@ -0,0 +1,143 @@
+"""
+Benchmark WebSearch.aexecute against the local DuckDuckGo stand-in: hundreds of
+concurrent searches on a single event loop versus the blocking execute() on a
+thread pool of the same width. The stand-in runs in a separate process so the
+reported thread counts are the client's alone.
+
+Usage: python bench_async_search.py --searches 1000 --concurrency 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tools.web_search import WebSearch
+
+
+def start_stub_process(latency: float):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen([sys.executable, "stub_search_server.py", "--port", str(port), "--latency", str(latency)],
+                               stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/"
+    for _ in range(100):
+        try:
+            requests.get(url, params={"q": "ready"}, timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("stub search server did not start")
+
+
+class ThreadSampler:
+    """Records the peak number of live threads while running."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def summarize(latencies, elapsed: float, peak_threads: int):
+    # Latencies run from the start of the batch, so time spent waiting for a free
+    # worker thread or a concurrency slot is counted the same way in both modes
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "searches_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": ms(latencies[len(latencies) // 2]),
+        "p99_ms": ms(latencies[int(len(latencies) * 0.99)]),
+        "peak_threads": peak_threads - 1,  # minus the sampler
+    }
+
+
+def run_threads(url: str, searches: int, concurrency: int):
+    search = WebSearch(duckduckgo_url=url, pool_size=concurrency)
+    latencies = []
+    started = 0.0
+
+    def one(i: int):
+        result = search.execute(f"query {i}")
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    with ThreadSampler() as sampler:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(searches)))
+        elapsed = time.perf_counter() - started
+    search.close()
+    assert all(r.startswith("Answer:") for r in results), results[:3]
+    return summarize(latencies, elapsed, sampler.peak)
+
+
+def run_async(url: str, searches: int, concurrency: int):
+    search = WebSearch(duckduckgo_url=url, pool_size=concurrency, engine_concurrency=concurrency)
+    latencies = []
+    started = 0.0
+
+    async def one(i: int):
+        result = await search.aexecute(f"query {i}")
+        latencies.append(time.perf_counter() - started)
+        return result
+
+    async def main():
+        nonlocal started
+        started = time.perf_counter()
+        try:
+            return await asyncio.gather(*(one(i) for i in range(searches)))
+        finally:
+            await search.aclose()
+
+    with ThreadSampler() as sampler:
+        results = asyncio.run(main())
+        elapsed = time.perf_counter() - started
+    assert all(r.startswith("Answer:") for r in results), results[:3]
+    return summarize(latencies, elapsed, sampler.peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSearch async versus threaded benchmark")
+    parser.add_argument("--searches", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200, help="Searches in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Delay of the local search stand-in")
+    args = parser.parse_args()
+
+    process, url = start_stub_process(args.latency)
+    try:
+        report = {
+            "searches": args.searches,
+            "concurrency": args.concurrency,
+            "threaded": run_threads(url, args.searches, args.concurrency),
+            "async": run_async(url, args.searches, args.concurrency),
+        }
+    finally:
+        process.terminate()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark Calculator throughput: the AST-validated, compile-cached evaluator versus
+the previous character-check-and-eval implementation, on repeated and unique
+expressions. Also times adversarial inputs (huge powers and factorials), which the
+previous implementation would run until memory or patience ran out, and tabulating
+a formula with an execute() loop versus one evaluate_many() call.
+
+Usage: python bench_calculator.py --n 20000
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from tools.calculator import Calculator
+
+
+class LegacyCalculator(Calculator):
+    """The implementation before compiled expressions: a fresh names dict per instance, eval per call."""
+
+    def __init__(self):
+        self.safe_dict = {"__builtins__": {}, "abs": abs, "round": round, "min": min, "max": max,
+                          "sum": sum, "pow": pow, "math": math}
+        for func_name in dir(math):
+            if not func_name.startswith("_"):
+                func = getattr(math, func_name)
+                if callable(func):
+                    self.safe_dict[func_name] = func
+
+    def _safe_eval(self, expression: str):
+        allowed_chars = set("0123456789+-*/.()[]{}abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ, ")
+        if not all(c in allowed_chars for c in expression):
+            raise ValueError("Expression contains invalid characters")
+        try:
+            return eval(expression, self.safe_dict)
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression syntax: {str(e)}")
+        except Exception as e:
+            raise ValueError(f"Evaluation error: {str(e)}")
+
+
+TEMPLATES = [
+    "{a} * {b} + {c}",
+    "sqrt({a}) + log({b} + 1) * {c}",
+    "({a} + {b}) / ({c} + 1) - {a} // 7",
+    "max([{a}, {b}, {c}]) - min({a}, {b})",
+    "calculate {a}^2 + sin({b}) * cos({c})",
+]
+
+
+ADVERSARIAL = [
+    "9**9**9",
+    "factorial(10**6)",
+    "comb(10**7, 5*10**6)",
+    "10**(10**5)",
+    "(3**500000)//(7**200000)",
+    "factorial(factorial(9))",
+    "lcm(2**900000, 3**500000)",
+    "factorial(20000) - factorial(19999)",  # big but inside the limits: evaluated
+]
+
+
+def make_expressions(n: int, unique: bool, seed: int = 0):
+    rng = random.Random(seed)
+    if not unique:
+        return [TEMPLATES[i % len(TEMPLATES)].format(a=12, b=34, c=56) for i in range(n)]
+    return [rng.choice(TEMPLATES).format(a=rng.randint(1, 10 ** 6), b=rng.randint(1, 10 ** 6), c=rng.randint(1, 999))
+            for _ in range(n)]
+
+
+def run(make_calculator, expressions, per_call_instance: bool):
+    calculator = make_calculator()
+    started = time.perf_counter()
+    results = []
+    for expression in expressions:
+        if per_call_instance:
+            calculator = make_calculator()
+        results.append(calculator.execute(expression))
+    elapsed = time.perf_counter() - started
+    return results, {"evals_per_s": round(len(expressions) / elapsed), "us_per_eval": round(elapsed / len(expressions) * 1e6, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calculator evaluation benchmark")
+    parser.add_argument("--n", type=int, default=20000, help="Expressions per run")
+    args = parser.parse_args()
+
+    report = {"n": args.n}
+    for label, unique in (("repeated", False), ("unique", True)):
+        expressions = make_expressions(args.n, unique)
+        Calculator._cache.clear()
+        legacy, report[f"{label}_legacy"] = run(LegacyCalculator, expressions, False)
+        current, report[f"{label}_compiled"] = run(Calculator, expressions, False)
+        assert legacy == current, next((e, a, b) for e, a, b in zip(expressions, legacy, current) if a != b)
+    # A new Calculator per call, as a short-lived worker would create one
+    expressions = make_expressions(args.n // 10, False)
+    _, report["new_instance_legacy"] = run(LegacyCalculator, expressions, True)
+    _, report["new_instance_compiled"] = run(Calculator, expressions, True)
+
+    calculator = Calculator()
+    worst = {}
+    for expression in ADVERSARIAL:
+        started = time.perf_counter()
+        result = calculator.execute(expression)
+        worst[expression] = {"ms": round((time.perf_counter() - started) * 1000, 3),
+                             "rejected": "too expensive" in result}
+    report["adversarial"] = worst
+
+    formula = "sqrt(x) * sin(x) + log(x, 10) ** 2"
+    xs = [0.5 + i * 0.01 for i in range(args.n)]
+    started = time.perf_counter()
+    looped = [calculator.execute(formula.replace("x", f"({x!r})")) for x in xs]
+    loop_s = time.perf_counter() - started
+    calculator.evaluate_many(formula, {"x": xs[:1]})  # import NumPy outside the timing
+    started = time.perf_counter()
+    batch = calculator.evaluate_many(formula, {"x": xs})
+    batch_s = time.perf_counter() - started
+    assert [calculator._format(float(v)) for v in batch["values"]] == looped
+    report["tabulate"] = {"values": len(xs), "execute_loop_ms": round(loop_s * 1000, 2),
+                          "evaluate_many_ms": round(batch_s * 1000, 2)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark DataTool on generated CSVs: summarize_csv's sampled fast path versus
+parsing the whole file, checking that both print the same summary; the memory of a
+frame loaded with compact dtypes versus read_csv's defaults; and stats on two columns
+of a wide CSV parsed from text versus read from its columnar sidecar.
+
+Usage: python bench_data_tools.py --rows 2000000 --wide-rows 50000 --wide-columns 200
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from tools.data_tools import DataTool
+
+
+def make_csv(path: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "price": rng.normal(100, 15, rows).round(2),
+        "quantity": rng.integers(1, 50, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "score": rng.exponential(3, rows),
+    }).to_csv(path, index=False)
+
+
+def make_wide_csv(path: str, rows: int, columns: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(rng.normal(size=(rows, columns)).round(6), columns=[f"c{i}" for i in range(columns)]).to_csv(path, index=False)
+
+
+def full_parse_summary(path: str) -> str:
+    """summarize_csv before the fast path: parse everything, report the head."""
+    df = pd.read_csv(path)
+    return "\n".join([f"Summary of {path}:", f"Rows: {len(df)}", f"Columns: {', '.join(df.columns)}",
+                      "\nFirst 5 rows:", df.head().to_string()])
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataTool benchmark")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--wide-rows", type=int, default=50_000)
+    parser.add_argument("--wide-columns", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.csv")
+        make_csv(path, args.rows)
+        report = {"rows": args.rows, "file_mb": round(os.path.getsize(path) / 2 ** 20, 1)}
+
+        expected, report["summarize_full_parse_ms"] = timed(full_parse_summary, path)
+        summary, report["summarize_sampled_ms"] = timed(DataTool(cache_bytes=0).summarize_csv, path)
+        # Same summary apart from the memory line, which full_parse_summary predates
+        summary = "\n".join(line for line in summary.splitlines() if not line.startswith("Memory: "))
+        assert summary == expected, (summary, expected)
+
+        for label, compact in (("default", False), ("compact", True)):
+            tool = DataTool(cache_bytes=0, cache_dir=None, stream_threshold_bytes=None, compact_dtypes=compact)
+            df, report[f"load_{label}_ms"] = timed(tool._load, path)
+            report[f"memory_{label}_mb"] = round(df.memory_usage(deep=True).sum() / 2 ** 20, 1)
+            report[f"stats_{label}"] = tool.get_stats(path)
+        assert report.pop("stats_default") == report.pop("stats_compact")
+
+        wide = os.path.join(tmp, "wide.csv")
+        make_wide_csv(wide, args.wide_rows, args.wide_columns)
+        columns = ["c0", f"c{args.wide_columns - 1}"]
+        report["wide_file_mb"] = round(os.path.getsize(wide) / 2 ** 20, 1)
+        parsed = DataTool(cache_bytes=0, cache_dir=None, stream_threshold_bytes=None)
+        expected, report["stats_2_columns_csv_ms"] = timed(parsed.get_stats, wide, columns)
+        sidecar = DataTool(cache_bytes=0, cache_dir=os.path.join(tmp, "cache"), stream_threshold_bytes=None)
+        _, report["stats_2_columns_first_load_ms"] = timed(sidecar.get_stats, wide, columns)
+        stats, report["stats_2_columns_sidecar_ms"] = timed(sidecar.get_stats, wide, columns)
+        assert stats == expected, (stats, expected)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark KnowledgeBase write cost as the knowledge base grows.
+
+Each learn appends one record to the change log, so per-learn latency should stay
+flat as the entry count rises; compactions are reported separately. Finishes by
+timing a cold load (snapshot plus log replay).
+
+Usage: python bench_kb_persistence.py --entries 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from agent.knowledge_base import KnowledgeBase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KnowledgeBase persistence benchmark")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--doc-length", type=int, default=60, help="Words per document")
+    parser.add_argument("--buckets", type=int, default=10, help="Report latency per this many slices of the run")
+    parser.add_argument("--fsync", action="store_true", help="fsync the log after every learn")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="nexus_kb_bench_")
+    try:
+        kb = KnowledgeBase(os.path.join(workdir, "knowledge_base.json"), fsync=args.fsync)
+        bucket_size = max(1, args.entries // args.buckets)
+        buckets, latencies = [], []
+        compactions = 0
+        generation = kb.generation
+        for i in range(args.entries):
+            content = " ".join(f"w{rng.randrange(50000)}" for _ in range(args.doc_length))
+            t = time.perf_counter()
+            kb.learn(f"doc{i}.txt", content)
+            latencies.append(time.perf_counter() - t)
+            if kb.generation != generation:
+                compactions += 1
+                generation = kb.generation
+            if len(latencies) == bucket_size:
+                latencies.sort()
+                buckets.append({
+                    "entries": i + 1,
+                    "p50_ms": round(latencies[len(latencies) // 2] * 1000, 4),
+                    "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 4),
+                    "max_ms": round(latencies[-1] * 1000, 2),
+                })
+                latencies = []
+
+        t = time.perf_counter()
+        reloaded = KnowledgeBase(kb.kb_path)
+        load_s = time.perf_counter() - t
+        assert len(reloaded.knowledge) == args.entries
+
+        print(json.dumps({
+            "entries": args.entries,
+            "compactions": compactions,
+            "snapshot_mb": round(os.path.getsize(kb.kb_path) / 1e6, 2) if os.path.exists(kb.kb_path) else 0,
+            "log_mb": round(os.path.getsize(kb.log_path) / 1e6, 2),
+            "learn_latency": buckets,
+            "cold_load_s": round(load_s, 2),
+        }, indent=2))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark KnowledgeBase search latency on a synthetic corpus: its BM25 inverted index,
+or with --vector the n-gram vector index (brute force and clustered, with how often
+the quoted document is found by each).
+
+Usage: python bench_kb_search.py --entries 100000 [--vector]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+
+from agent.kb_index import BM25Index
+from agent.kb_vectors import VectorIndex
+
+
+def make_corpus(entries: int, vocabulary: int, doc_length: int, seed: int):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    # Zipf-like weights so a few terms are common and most are rare, as in real text
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary)))
+    for i in range(entries):
+        yield f"doc{i}.txt", " ".join(rng.choices(words, cum_weights=cum_weights, k=doc_length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KnowledgeBase search benchmark")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--doc-length", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--vector", action="store_true", help="Benchmark the n-gram vector index instead of BM25")
+    parser.add_argument("--n-probe", type=int, default=8, help="Clusters scored per vector query")
+    args = parser.parse_args()
+
+    index = VectorIndex() if args.vector else BM25Index()
+    passages = []
+    start = time.perf_counter()
+    for source, content in make_corpus(args.entries, args.vocabulary, args.doc_length, args.seed):
+        if args.vector:
+            index.add(source, content)
+            if len(passages) < args.queries:
+                passages.append(content.split())
+        else:
+            index.add(source, f"{source} {content}")
+    build_s = time.perf_counter() - start
+
+    rng = random.Random(args.seed + 1)
+    if args.vector:
+        # Similarity lookups quote a passage loosely: a run of words from a document, shuffled
+        queries = []
+        for words in passages:
+            start = rng.randrange(len(words) - 10)
+            excerpt = words[start:start + 10]
+            rng.shuffle(excerpt)
+            queries.append(" ".join(excerpt))
+    else:
+        # Typical lookups use distinctive terms; sample from outside the head of the distribution
+        queries = [" ".join(f"w{rng.randrange(100, args.vocabulary)}" for _ in range(rng.randint(1, 3)))
+                   for _ in range(args.queries)]
+    report = {"entries": args.entries, "build_s": round(build_s, 2), "queries": len(queries)}
+    latency, exact = measure(index, queries)
+    report["latency_ms"] = latency
+    if args.vector:
+        start = time.perf_counter()
+        index.build_clusters()
+        report["cluster_s"] = round(time.perf_counter() - start, 2)
+        latency, approximate = measure(index, queries, n_probe=args.n_probe)
+        report["clustered_latency_ms"] = latency
+        # Query i quotes doc{i}: how often does it come back in the top 10?
+        hit_rate = lambda results: round(sum(f"doc{i}.txt" in {d for d, _ in r} for i, r in enumerate(results)) / len(results), 3)
+        report["source_hit_rate"] = {"brute_force": hit_rate(exact), "clustered": hit_rate(approximate)}
+    print(json.dumps(report, indent=2))
+
+
+def measure(index, queries, **kwargs):
+    latencies, results = [], []
+    for query in queries:
+        t = time.perf_counter()
+        results.append(index.search(query, top_k=10, **kwargs))
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    pct = lambda p: round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 4)
+    return {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": round(latencies[-1] * 1000, 4)}, results
+
+
+if __name__ == "__main__":
+    main()
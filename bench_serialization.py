@@ -0,0 +1,67 @@
+"""
+Benchmark API response serialization: model validation + stdlib json vs the fast path,
+and bytes on the wire with and without gzip.
+"""
+
+import gzip
+import json
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api import QueryResponse, HistoryResponse, FastJSONResponse, orjson
+
+SEARCH_TEXT = "Answer: " + "Python is a high-level, general-purpose programming language. " * 20 + "\n" + "\n".join(
+    f"- Related topic {i}: " + "Details about a related search result. " * 5 for i in range(5)
+)
+
+
+def make_query_payload():
+    plan = [{
+        "step": 1,
+        "action": "web_search",
+        "description": "Search the web for: Python programming",
+        "parameters": {"query": "Python programming"},
+        "confidence": 0.8,
+        "reasoning": "Detected informational query"
+    }]
+    results = [dict(plan[0], result=SEARCH_TEXT, status="success")]
+    return {"query": "Search for Python programming", "response": SEARCH_TEXT, "plan": plan, "execution_results": results}
+
+
+def make_history_payload(n: int = 100):
+    history = []
+    for i in range(n):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.append({
+            "id": i + 1,
+            "role": role,
+            "content": "who is Ada Lovelace" if role == "user" else SEARCH_TEXT,
+            "timestamp": datetime.now().isoformat(),
+            "metadata": {"mode": "Standard"} if role == "user" else {}
+        })
+    return {"history": history, "next_cursor": None}
+
+
+def bench(label, func, rounds=200):
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = func()
+    elapsed = (time.perf_counter() - start) / rounds
+    compressed = len(gzip.compress(body))
+    print(f"{label:<40} {elapsed * 1000:8.3f} ms  {len(body):>9} B  {compressed:>8} B gzip")
+
+
+if __name__ == "__main__":
+    print(f"Fast encoder: {'orjson' if orjson is not None else 'stdlib json'}\n")
+    for name, model_cls, payload in [
+        ("query", QueryResponse, make_query_payload()),
+        ("history[100]", HistoryResponse, make_history_payload()),
+    ]:
+        # What FastAPI does with a response_model: validate, encode to primitives, json.dumps
+        bench(f"{name}: validated + json", lambda: JSONResponse(jsonable_encoder(model_cls(**payload))).body)
+        bench(f"{name}: fast path", lambda: FastJSONResponse(payload).body)
+        print()
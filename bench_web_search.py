@@ -0,0 +1,81 @@
+"""
+Benchmark WebSearch against the local DuckDuckGo stand-in: connection reuse and
+latency of the pooled session versus a new connection per search, a retry check
+where the first responses are 503s, and hedged fan-out across two stand-ins whose
+primary has a slow tail.
+
+Usage: python bench_web_search.py --searches 200 --concurrency 4
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from stub_search_server import start_stub_server
+from tools.web_search import WebSearch
+
+
+def run(search_fn, searches: int, concurrency: int):
+    latencies = []
+
+    def one(i: int):
+        t = time.perf_counter()
+        result = search_fn(f"query {i}")
+        latencies.append(time.perf_counter() - t)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(searches)))
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3)
+    return results, {"p50_ms": ms(latencies[len(latencies) // 2]), "p99_ms": ms(latencies[int(len(latencies) * 0.99)])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSearch connection pooling benchmark")
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay of the local search stand-in")
+    args = parser.parse_args()
+    report = {"searches": args.searches, "concurrency": args.concurrency}
+
+    server, url = start_stub_server(latency=args.latency)
+    search = WebSearch(duckduckgo_url=url, pool_size=args.concurrency)
+    results, latency = run(search.execute, args.searches, args.concurrency)
+    assert all(r.startswith("Answer:") for r in results)
+    report["pooled"] = dict(latency, connections=server.connections)
+    server.shutdown()
+
+    server, url = start_stub_server(latency=args.latency)
+    unpooled = lambda q: requests.get(url, params={"q": q, "format": "json"}, timeout=5).json()
+    _, latency = run(unpooled, args.searches, args.concurrency)
+    report["new_connection_per_search"] = dict(latency, connections=server.connections)
+    server.shutdown()
+
+    server, url = start_stub_server(failures=2)
+    search = WebSearch(duckduckgo_url=url, retries=2, backoff_factor=0.05)
+    result = search.execute("retry check")
+    report["retry_after_two_503s"] = {"answered": result.startswith("Answer:"), "requests": server.requests}
+    server.shutdown()
+
+    # 10% of the primary's answers take a second; the backup is uniformly a bit slower than its median
+    primary, primary_url = start_stub_server(latency=0.01, tail_latency=1.0, tail_ratio=0.1)
+    backup, backup_url = start_stub_server(latency=0.03)
+    for mode in ("single_engine", "hedged_fanout"):
+        search = WebSearch(duckduckgo_url=primary_url, search_engine="duckduckgo" if mode == "single_engine" else "fanout")
+        search.register_engine("backup", search.duckduckgo_engine(backup_url))
+        run(search.execute, 20, 1)  # warm up latency history
+        _, latency = run(search.execute, args.searches, args.concurrency)
+        report[mode] = dict(latency, primary_requests=primary.requests, backup_requests=backup.requests)
+        primary.requests = backup.requests = 0
+    primary.shutdown()
+    backup.shutdown()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test for the /ws session endpoint: many concurrent sockets on one event loop,
+reporting messages/sec and the server's memory cost per open socket.
+
+Usage: python bench_websocket.py --sockets 200 --queries 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+import websockets
+
+QUERIES = ["Calculate 25 * 4 + 100", "What time is it?", "Hi", "Calculate sqrt(144)"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_rss(pid: int):
+    """Resident set size of the server process in bytes, or None if it can't be read."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def start_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("API server did not start")
+
+
+async def run_socket(ws, queries: int) -> int:
+    received = 0
+    for i in range(queries):
+        await ws.send(json.dumps({"query": QUERIES[i % len(QUERIES)]}))
+        while True:
+            event = json.loads(await ws.recv())
+            received += 1
+            if event["type"] in ("result", "error"):
+                break
+    return received
+
+
+async def main(args):
+    port = free_port()
+    proc = start_server(port)
+    try:
+        url = f"ws://127.0.0.1:{port}/ws"
+        rss_before = server_rss(proc.pid)
+        sockets = [await websockets.connect(url) for _ in range(args.sockets)]
+        await asyncio.sleep(0.5)
+        rss_open = server_rss(proc.pid)
+
+        start = time.perf_counter()
+        received = await asyncio.gather(*(run_socket(ws, args.queries) for ws in sockets))
+        elapsed = time.perf_counter() - start
+        rss_after = server_rss(proc.pid)
+
+        for ws in sockets:
+            await ws.close()
+
+        total_events = sum(received)
+        total_queries = args.sockets * args.queries
+        report = {
+            "sockets": args.sockets,
+            "queries_per_socket": args.queries,
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_s": round(total_queries / elapsed, 1),
+            "messages_per_s": round((total_queries + total_events) / elapsed, 1),
+            "server_rss_bytes": {"idle": rss_before, "sockets_open": rss_open, "after_queries": rss_after},
+            "bytes_per_idle_socket": (rss_open - rss_before) // args.sockets if rss_before and rss_open else None,
+            "bytes_per_active_socket": (rss_after - rss_before) // args.sockets if rss_before and rss_after else None,
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=100, help="Concurrent WebSocket sessions")
+    parser.add_argument("--queries", type=int, default=5, help="Queries sent per session")
+    asyncio.run(main(parser.parse_args()))
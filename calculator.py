@@ -2,66 +2,447 @@
 Calculator tool for performing mathematical calculations.
 """
 
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, Callable, List, Optional, Tuple, Iterable
+from collections import OrderedDict
+from functools import reduce
+from types import SimpleNamespace
+import ast
 import re
 import math
+import threading
+from metrics import CACHE_REQUESTS
+
+
+PREFIX_RE = re.compile(r"^(calculate|compute|what is|what's|solve|evaluate)\s*", re.IGNORECASE)
+
+# Syntax an expression may use: arithmetic, calls, names, number literals and lists/tuples
+# (for min/max/sum). Anything else - attributes other than math.<name>, subscripts,
+# comprehensions, lambdas, strings, keyword arguments - is rejected before any code runs.
+ALLOWED_OPERATORS = {ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub}
+NUMBER_TYPES = {int, float, complex}
+
+# Floats overflow instead of growing, so no float (or int rounded from one) exceeds this
+FLOAT_BITS = 1024
+# Big-integer multiplication (Karatsuba) costs about words ** KARATSUBA machine-word operations
+KARATSUBA = 1.585
+# Functions returning integers as large as, or larger than, their arguments
+# (pow is math.pow, which works on floats)
+INT_FUNCTIONS = {"abs", "round", "min", "max", "sum", "factorial", "comb", "perm",
+                 "gcd", "lcm", "isqrt", "prod", "sumprod", "floor", "ceil", "trunc"}
+# math functions returning floats (or bools, or tuples of floats and small ints) whatever their arguments
+FLOAT_FUNCTIONS = {"sqrt", "cbrt", "exp", "exp2", "expm1", "log", "log10", "log2", "log1p",
+                   "sin", "cos", "tan", "asin", "acos", "atan", "atan2", "sinh", "cosh", "tanh",
+                   "asinh", "acosh", "atanh", "fabs", "degrees", "radians", "hypot", "dist", "copysign",
+                   "fmod", "remainder", "pow", "ldexp", "frexp", "modf", "fsum", "fma", "erf", "erfc",
+                   "gamma", "lgamma", "isnan", "isinf", "isfinite", "isclose", "nextafter", "ulp"}
+MATH_CONSTANTS = {"pi", "e", "tau", "inf", "nan"}
+# Bounds (in bits) on the magnitude of some float functions' results, from their argument's;
+# the others may return anything up to the largest float. Logarithms of floats down to the
+# smallest subnormal (2 ** -1074) stay within 1075 in magnitude.
+FLOAT_RESULT_BITS: Dict[str, Callable[[float], float]] = {
+    "sqrt": lambda bits: bits / 2 + 1,
+    "cbrt": lambda bits: bits / 3 + 1,
+    "fabs": lambda bits: bits,
+    "log": lambda bits: math.log2(max(bits, 1075)) + 1,
+    "log2": lambda bits: math.log2(max(bits, 1075)) + 1,
+    "log10": lambda bits: math.log2(max(bits, 1075)) + 1,
+    "log1p": lambda bits: math.log2(max(bits, 1075)) + 1,
+}
+# The math names expressions may use: only those the estimator has a bound for, so a
+# function added to math in a later Python stays unavailable until it gets one
+MATH_NAMES = {name: getattr(math, name) for name in sorted(INT_FUNCTIONS | FLOAT_FUNCTIONS | MATH_CONSTANTS)
+              if hasattr(math, name)}
+
+
+class CalculationTooExpensive(ValueError):
+    """An expression whose evaluation could exceed the calculator's size or work limits."""
+
+
+class _Bound:
+    """
+    What evaluating a sub-expression can produce: an upper bound on the bit length of an
+    integer result (or of a float's integer part), whether the result is an integer at
+    all, the exact value of literals, and the element bounds of a list or tuple.
+    """
+    
+    __slots__ = ("bits", "integral", "value", "elements")
+    
+    def __init__(self, bits: float, integral: bool = True, value: Union[int, float, None] = None,
+                 elements: Optional[List["_Bound"]] = None):
+        self.bits = bits
+        self.integral = integral
+        self.value = value
+        self.elements = elements
+    
+    def max_value(self) -> float:
+        """Upper bound of the absolute value, as a float (inf beyond the float range)."""
+        if self.value is not None:
+            return float(abs(self.value)) if abs(self.value) < 2.0 ** (FLOAT_BITS - 1) else math.inf
+        return 2.0 ** self.bits if self.bits < FLOAT_BITS else math.inf
+    
+    def max_bits(self) -> float:
+        """log2 of the upper bound of the absolute value, finite beyond the float range too."""
+        if self.value is not None:
+            return math.log2(abs(self.value)) if self.value else -math.inf
+        return self.bits
+
+
+FLOAT = _Bound(FLOAT_BITS, integral=False)
+
+
+def _float_bound(value: float) -> _Bound:
+    """Bound of a known float: its magnitude in bits, and the value itself."""
+    if not math.isfinite(value):
+        return FLOAT
+    return _Bound(math.frexp(value)[1], integral=False, value=value)
+
+# math functions that only accept integers; evaluate_many passes them whole floats as ints
+INTEGER_ARGUMENTS = {"factorial", "comb", "perm", "gcd", "lcm", "isqrt"}
+
+# NumPy ufuncs computing the same function as the math (or builtin) name, for evaluate_many.
+# math functions missing here are applied element by element.
+UFUNCS = {
+    "sqrt": "sqrt", "cbrt": "cbrt", "exp": "exp", "exp2": "exp2", "expm1": "expm1",
+    "log10": "log10", "log2": "log2", "log1p": "log1p",
+    "sin": "sin", "cos": "cos", "tan": "tan", "asin": "arcsin", "acos": "arccos", "atan": "arctan",
+    "atan2": "arctan2", "sinh": "sinh", "cosh": "cosh", "tanh": "tanh",
+    "asinh": "arcsinh", "acosh": "arccosh", "atanh": "arctanh",
+    "fabs": "fabs", "floor": "floor", "ceil": "ceil", "trunc": "trunc",
+    "degrees": "degrees", "radians": "radians", "hypot": "hypot", "copysign": "copysign",
+    "fmod": "fmod", "pow": "power", "ldexp": "ldexp", "isnan": "isnan", "isinf": "isinf", "isfinite": "isfinite",
+}
+
+
+class _CompileCache:
+    """Least recently used compiled expressions, shared by every Calculator."""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            CACHE_REQUESTS.inc(cache="calculator", result="hit")
+            return entry
+        CACHE_REQUESTS.inc(cache="calculator", result="miss")
+        entry = build()  # invalid expressions raise here and are not cached
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _Estimator:
+    """
+    Validates an expression tree against the whitelist and bounds the cost of evaluating it.
+    
+    Expressions have no loops, so their running time and memory are dominated by the
+    big-integer arithmetic in them. visit() returns a _Bound per node; the largest
+    integer bound is kept in bits and the estimated machine-word operations in steps.
+    """
+    
+    def __init__(self, names: Iterable[str]):
+        self.names = names
+        self.bits = 0.0
+        self.steps = 0.0
+    
+    def _charge(self, bits: float, steps: float = 1.0) -> _Bound:
+        self.bits = max(self.bits, bits)
+        self.steps += steps
+        return _Bound(bits)
+    
+    @staticmethod
+    def _multiply_steps(bits: float) -> float:
+        words = bits / 64 + 1
+        return words ** KARATSUBA if words < 1e100 else math.inf  # float ** raises on overflow
+    
+    @staticmethod
+    def _divide_steps(left: float, right: float) -> float:
+        return (left / 64 + 1) * (right / 64 + 1)  # long division and gcd are quadratic
+    
+    def visit(self, node: ast.AST) -> _Bound:
+        """Reject every node, operator, name and literal outside the whitelist."""
+        kind = type(node)
+        if kind is ast.Expression:
+            return self.visit(node.body)
+        elif kind is ast.Constant:
+            if type(node.value) not in NUMBER_TYPES:
+                raise ValueError(f"Unsupported literal in expression: {node.value!r}")
+            if type(node.value) is int:
+                return _Bound(node.value.bit_length(), value=node.value)
+            return _float_bound(node.value) if type(node.value) is float else FLOAT
+        elif kind is ast.Name:
+            if node.id not in self.names:
+                raise ValueError(f"Unknown name in expression: {node.id}")
+            # Variables of evaluate_many may not shadow math names, so constants are known
+            return _float_bound(MATH_NAMES[node.id]) if node.id in MATH_CONSTANTS else FLOAT
+        elif kind is ast.BinOp or kind is ast.UnaryOp:
+            if type(node.op) not in ALLOWED_OPERATORS:
+                raise ValueError(f"Unsupported operator in expression: {type(node.op).__name__}")
+            if kind is ast.BinOp:
+                return self._binop(node.op, self._number(node.left), self._number(node.right))
+            operand = self._number(node.operand)
+            if operand.value is not None:
+                return _Bound(operand.bits, operand.integral,
+                              value=-operand.value if type(node.op) is ast.USub else operand.value)
+            return operand
+        elif kind is ast.Call:
+            if node.keywords:
+                raise ValueError("Keyword arguments are not supported in expressions")
+            name = self._function(node.func)
+            return self._call(name, [self.visit(arg) for arg in node.args])
+        elif kind is ast.Attribute:
+            self._function(node)
+            return FLOAT
+        elif kind is ast.List or kind is ast.Tuple:
+            elements = [self.visit(element) for element in node.elts]
+            return _Bound(max((e.bits for e in elements), default=0), all(e.integral for e in elements), elements=elements)
+        else:
+            raise ValueError(f"Unsupported syntax in expression: {kind.__name__}")
+    
+    def _number(self, node: ast.AST) -> _Bound:
+        bound = self.visit(node)
+        if bound.elements is not None:
+            raise ValueError("Arithmetic on lists is not supported in expressions")
+        return bound
+    
+    def _function(self, node: ast.AST) -> Optional[str]:
+        """Name of a called function (math.<name> counts as <name>), None when it is not a plain name."""
+        if type(node) is ast.Attribute:
+            if not (type(node.value) is ast.Name and node.value.id == "math" and node.attr in MATH_NAMES):
+                raise ValueError(f"Unsupported attribute in expression: {node.attr}")
+            return node.attr
+        self.visit(node)
+        return node.id if type(node) is ast.Name else None
+    
+    def _binop(self, op: ast.AST, left: _Bound, right: _Bound) -> _Bound:
+        op = type(op)
+        if op is ast.Div or not (left.integral and right.integral):
+            self.steps += 1
+            return self._float_result(op, left, right)
+        if op is ast.Add or op is ast.Sub:
+            return self._charge(max(left.bits, right.bits) + 1, max(left.bits, right.bits) / 64 + 1)
+        if op is ast.Mult:
+            return self._charge(left.bits + right.bits, self._multiply_steps(max(left.bits, right.bits)))
+        if op is ast.FloorDiv or op is ast.Mod:
+            return self._charge(max(left.bits, right.bits), self._divide_steps(left.bits, right.bits))
+        return self._power(left, right)
+    
+    @staticmethod
+    def _float_result(op: type, left: _Bound, right: _Bound) -> _Bound:
+        """Magnitude of a float result (integer operands are converted), capped at the largest float."""
+        if op is ast.Add or op is ast.Sub:
+            bits = max(left.bits, right.bits) + 1
+        elif op is ast.Mult:
+            bits = left.bits + right.bits
+        elif op is ast.Div or op is ast.FloorDiv:
+            # An integer divisor is at least 1 in magnitude (0 raises); a float one must be known
+            if right.integral:
+                bits = left.bits + 1
+            elif right.value is not None:
+                bits = left.bits - math.frexp(right.value)[1] + 2
+            else:
+                return FLOAT
+        elif op is ast.Mod:
+            bits = right.bits  # below the divisor in magnitude
+        else:
+            return FLOAT
+        return _Bound(min(bits, FLOAT_BITS), integral=False)
+    
+    def _power(self, base: _Bound, exponent: _Bound) -> _Bound:
+        if exponent.value is not None and exponent.value < 0:
+            self.steps += 1
+            return FLOAT
+        if base.value is not None and abs(base.value) <= 1:
+            return self._charge(1)
+        times = exponent.max_value()
+        bits = times * math.log2(abs(base.value)) + 1 if base.value is not None else base.bits * times
+        # Repeated squaring: one multiplication per exponent bit, the last ones dominating
+        return self._charge(bits, self._multiply_steps(bits) * max(1.0, math.log2(times + 1)))
+    
+    def _call(self, name: Optional[str], args: List[_Bound]) -> _Bound:
+        if name in FLOAT_FUNCTIONS:
+            self.steps += 1
+            if name in FLOAT_RESULT_BITS and len(args) == 1 and args[0].elements is None:
+                return _Bound(min(FLOAT_RESULT_BITS[name](args[0].bits), FLOAT_BITS), integral=False)
+            return FLOAT
+        if name not in INT_FUNCTIONS:
+            raise ValueError(f"Unsupported function in expression: {name or 'call of an expression'}")
+        if name == "sumprod":
+            return self._sumprod(args)
+        # min([...]), sum((...)) and friends take their values from a single list or tuple
+        values = args[0].elements if len(args) == 1 and args[0].elements is not None else args
+        if not values or any(v.elements is not None for v in values):
+            self.steps += 1
+            return FLOAT  # evaluation raises on these shapes, at no cost
+        bits = max(v.bits for v in values)
+        if not all(v.integral for v in values):
+            if name in ("round", "floor", "ceil", "trunc") and len(values) == 1:
+                return self._charge(max(values[0].bits, 0) + 1)
+            if name in ("sum", "prod"):
+                # The integers are still added or multiplied exactly before the float turns up
+                self._call(name, [v for v in values if v.integral])
+            self.steps += 1
+            return FLOAT
+        if name in ("factorial", "comb", "perm"):
+            return self._combinatorial(name, values)
+        if name in ("lcm", "gcd"):
+            bits = sum(v.bits for v in values) if name == "lcm" else bits
+            return self._charge(bits, len(values) * self._divide_steps(bits, bits))
+        if name == "prod":
+            bits = sum(v.bits for v in values)
+            return self._charge(bits, len(values) * self._multiply_steps(bits))
+        if name == "isqrt":
+            return self._charge(bits / 2, self._multiply_steps(bits) * max(1.0, math.log2(bits + 1)))
+        if name == "sum":
+            bits += math.log2(len(values))
+        return self._charge(bits, len(values) * (bits / 64 + 1))
+    
+    def _sumprod(self, args: List[_Bound]) -> _Bound:
+        if len(args) != 2 or args[0].elements is None or args[1].elements is None:
+            self.steps += 1
+            return FLOAT  # evaluation raises on these shapes, at no cost
+        pairs = list(zip(args[0].elements, args[1].elements))
+        integral = [(p, q) for p, q in pairs if p.integral and q.integral]
+        if integral:
+            bits = max(p.bits + q.bits for p, q in integral) + math.log2(len(integral))
+            self._charge(bits, sum(self._multiply_steps(max(p.bits, q.bits)) for p, q in integral) + len(integral) * (bits / 64 + 1))
+        if not pairs or len(integral) < len(pairs):
+            self.steps += 1
+            return FLOAT
+        return _Bound(bits)
+    
+    def _combinatorial(self, name: str, values: List[_Bound]) -> _Bound:
+        n = values[0].max_value()
+        k = n if name == "factorial" or len(values) < 2 else min(values[1].max_value(), n)
+        if math.isinf(k):
+            return self._charge(math.inf, math.inf)
+        if n < 2 or k < 1:
+            return self._charge(1)
+        if name == "factorial":
+            # Stirling: log2(n!) <= n log2(n / e) + log2(n) / 2 + log2(e)
+            bits = n * math.log2(n / math.e) + math.log2(n) / 2 + 2
+            return self._charge(bits, self._multiply_steps(bits) * math.log2(n))
+        # perm multiplies k factors of at most n; comb divides that by k! and is symmetric in k.
+        # n may be beyond the float range, so only its logarithm is used
+        log_n = values[0].max_bits()
+        product_bits = k * log_n
+        if name == "perm":
+            return self._charge(product_bits, self._multiply_steps(product_bits) * math.log2(k + 1))
+        k = min(k, n / 2)
+        product_bits = k * log_n
+        bits = k * (log_n + math.log2(math.e / k)) + 1
+        return self._charge(bits, 3 * self._multiply_steps(product_bits) * math.log2(k + 1))
+
+
+def _arguments(args: tuple) -> tuple:
+    """min([a, b]) and min(a, b) take the same values."""
+    return tuple(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else args
+
+
+def _elementwise(np, func: Callable) -> Callable:
+    """Apply a scalar function over broadcast arrays; failing elements become NaN."""
+    def apply(*args):
+        arrays = np.broadcast_arrays(*(np.asarray(a) for a in args))
+        out = np.empty(arrays[0].shape if arrays else (), dtype=np.float64)
+        for i, elements in enumerate(zip(*(a.flat for a in arrays))):
+            try:
+                out.flat[i] = func(*(e.item() for e in elements))
+            except Exception:
+                out.flat[i] = np.nan  # evaluate_many re-runs the element to report the error
+        return out
+    return apply
 
 
 class Calculator:
     """Tool for performing mathematical calculations safely."""
     
-    def __init__(self):
-        """Initialize calculator with safe evaluation."""
-        # Allowed functions and constants
-        self.safe_dict = {
-            "__builtins__": {},
-            "abs": abs,
-            "round": round,
-            "min": min,
-            "max": max,
-            "sum": sum,
-            "pow": pow,
-            "math": math,
-        }
-        
-        # Add math functions
-        for func_name in dir(math):
-            if not func_name.startswith("_"):
-                func = getattr(math, func_name)
-                if callable(func):
-                    self.safe_dict[func_name] = func
-    
-    def execute(self, expression: str) -> str:
+    # Allowed functions and constants; built once and shared by every instance
+    safe_dict: Dict[str, Any] = {
+        "__builtins__": {},
+        "abs": abs,
+        "round": round,
+        "min": min,
+        "max": max,
+        "sum": sum,
+        "pow": pow,
+        "math": math,
+        **MATH_NAMES,
+    }
+    
+    _cache = _CompileCache()
+    
+    def __init__(self, max_bits: int = 1 << 20, max_steps: float = 2e7):
+        """
+        Initialize calculator.
+        
+        Args:
+            max_bits: Largest integer (in bits, about 0.3 decimal digits each) an expression may build
+            max_steps: Estimated machine-word operations an evaluation may take
+        """
+        self.max_bits = max_bits
+        self.max_steps = max_steps
+        self._batch_names = None  # (vector, scalar) namespaces of evaluate_many, built on first use
+    
+    def execute(self, expression: str, variables: Optional[Dict[str, Any]] = None) -> str:
         """
         Execute a mathematical calculation.
         
         Args:
             expression: Mathematical expression as string
+            variables: Optional {name: values} to evaluate the expression for each value (see evaluate_many)
             
         Returns:
             Result as string
         """
         try:
+            if variables:
+                return self._format_many(self.evaluate_many(expression, variables))
+            
             # Clean the expression
             expression = self._clean_expression(expression)
             
             # Evaluate safely
             result = self._safe_eval(expression)
             
-            # Format result
-            if isinstance(result, float):
-                # Check if it's a whole number
-                if result.is_integer():
-                    return str(int(result))
-                else:
-                    # Round to reasonable precision
-                    return str(round(result, 10))
-            else:
-                return str(result)
+            return self._format(result)
                 
         except Exception as e:
             return f"Calculation error: {str(e)}"
     
+    @staticmethod
+    def _format(result: Any) -> str:
+        if isinstance(result, float):
+            # Check if it's a whole number
+            if result.is_integer():
+                return str(int(result))
+            else:
+                # Round to reasonable precision
+                return str(round(result, 10))
+        else:
+            return str(result)
+    
+    def _format_many(self, batch: Dict[str, Any], max_errors: int = 20) -> str:
+        errors = batch["errors"]
+        values = ["error" if i in errors else self._format(float(v)) for i, v in enumerate(batch["values"].flat)]
+        lines = [f"Results ({len(values)} values): " + ", ".join(values)]
+        if errors:
+            lines.append(f"Errors ({len(errors)}):")
+            lines += [f"- element {i}: {message}" for i, message in sorted(errors.items())[:max_errors]]
+            if len(errors) > max_errors:
+                lines.append(f"- ... and {len(errors) - max_errors} more")
+        return "\n".join(lines)
+    
     def _clean_expression(self, expression: str) -> str:
         """
         Clean and preprocess the expression.
@@ -73,7 +454,7 @@ class Calculator:
             Cleaned expression
         """
         # Remove common text prefixes
-        expression = re.sub(r"^(calculate|compute|what is|what's|solve|evaluate)\s*", "", expression, flags=re.IGNORECASE)
+        expression = PREFIX_RE.sub("", expression)
         
         # Remove question marks and extra whitespace
         expression = expression.strip().rstrip("?")
@@ -88,6 +469,42 @@ class Calculator:
         
         return expression
     
+    def compile(self, expression: str, variables: Iterable[str] = ()):
+        """
+        Parse and validate a cleaned expression into a code object, reusing earlier compilations.
+        
+        Args:
+            expression: Cleaned mathematical expression
+            variables: Extra names the expression may use (their values count as floats)
+            
+        Returns:
+            Tuple of (code object to evaluate against safe_dict, bound on the bits of any
+            integer it builds, estimated machine-word operations)
+        """
+        variables = sorted(variables)
+        key = f"{expression}\x1f{','.join(variables)}" if variables else expression
+        return self._cache.get(key, lambda: self._compile(expression, variables))
+    
+    def _compile(self, expression: str, variables: List[str] = ()) -> Tuple[Any, float, float]:
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression syntax: {str(e)}")
+        estimator = _Estimator(self.safe_dict.keys() | set(variables))
+        estimator.visit(tree)
+        return compile(tree, "<expression>", "eval"), estimator.bits, estimator.steps
+    
+    def _check_cost(self, bits: float, steps: float):
+        """Refuse expressions whose static cost bound exceeds this calculator's limits, before running them."""
+        if bits > self.max_bits:
+            digits = f"{bits * math.log10(2):.3g}" if bits < 1e300 else "astronomically many"
+            raise CalculationTooExpensive(
+                f"Expression is too expensive to evaluate: it could produce a number with about {digits} digits "
+                f"(limit {int(self.max_bits * math.log10(2))})")
+        if steps > self.max_steps:
+            raise CalculationTooExpensive(
+                f"Expression is too expensive to evaluate: about {steps:.3g} operations (limit {self.max_steps:.3g})")
+    
     def _safe_eval(self, expression: str) -> Union[int, float]:
         """
         Safely evaluate a mathematical expression.
@@ -98,21 +515,101 @@ class Calculator:
         Returns:
             Evaluation result
         """
-        # Additional safety check - only allow numbers, operators, and safe functions
-        allowed_chars = set("0123456789+-*/.()[]{}abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ, ")
-        
-        if not all(c in allowed_chars for c in expression):
-            raise ValueError("Expression contains invalid characters")
-        
+        code, bits, steps = self.compile(expression)
+        self._check_cost(bits, steps)
         try:
-            # Use eval with safe dictionary
-            result = eval(expression, self.safe_dict)
-            return result
-        except SyntaxError as e:
-            raise ValueError(f"Invalid expression syntax: {str(e)}")
+            return eval(code, self.safe_dict)
         except Exception as e:
             raise ValueError(f"Evaluation error: {str(e)}")
     
+    def evaluate_many(self, expression: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate one expression for many values of its variables at once.
+        
+        The expression is compiled once and evaluated over NumPy arrays (as float64), with
+        math functions replaced by the equivalent ufuncs; functions without one are applied
+        element by element. Elements whose result is not finite are re-evaluated on their
+        own, so each failing element gets the error the scalar calculator would report.
+        
+        Args:
+            expression: Mathematical expression using the variable names, e.g. "x**2 + sqrt(y)"
+            variables: {name: number or sequence of numbers}; sequences must have broadcastable shapes
+            
+        Returns:
+            {"values": float64 array of results (NaN where evaluation failed),
+             "errors": {flat element index: error message}}
+        """
+        import numpy as np
+        
+        for name in variables:
+            if not name.isidentifier() or name in self.safe_dict:
+                raise ValueError(f"Invalid variable name: {name}")
+        expression = self._clean_expression(expression)
+        code, bits, steps = self.compile(expression, variables)
+        self._check_cost(bits, steps)
+        
+        arrays = {}
+        for name, values in variables.items():
+            try:
+                arrays[name] = np.asarray(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError(f"Variable '{name}' must be numeric")
+        try:
+            shape = np.broadcast_shapes(*(array.shape for array in arrays.values()))
+        except ValueError:
+            raise ValueError("Variables must have the same length")
+        vector, scalar = self._batch_namespaces(np)
+        
+        with np.errstate(all="ignore"):
+            try:
+                result = np.asarray(eval(code, {**vector, **arrays}))
+                if result.dtype.kind not in "biuf":
+                    raise TypeError("non-real result")
+                values = np.array(np.broadcast_to(result, shape), dtype=np.float64)
+            except Exception:
+                values = np.full(shape, np.nan)  # evaluate every element on its own below
+        
+        errors = {}
+        flat = values.reshape(-1)
+        columns = {name: np.broadcast_to(array, shape).reshape(-1) for name, array in arrays.items()}
+        for i in np.flatnonzero(~np.isfinite(flat)).tolist():
+            scope = {name: float(column[i]) for name, column in columns.items()}
+            try:
+                flat[i] = float(eval(code, {**scalar, **scope}))
+            except Exception as e:
+                flat[i] = np.nan
+                errors[i] = str(e) or type(e).__name__
+        return {"values": values, "errors": errors}
+    
+    def _batch_namespaces(self, np) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Names for evaluate_many: ufuncs over arrays, and guarded scalars for the per-element pass."""
+        if self._batch_names is None:
+            scalar = dict(self.safe_dict)
+            for name in INTEGER_ARGUMENTS:
+                scalar[name] = self._guarded(name, MATH_NAMES[name])
+            vector = dict(scalar)
+            for name in MATH_NAMES:
+                if callable(MATH_NAMES[name]) and name not in UFUNCS:
+                    vector[name] = _elementwise(np, scalar[name])
+            vector.update((name, getattr(np, ufunc)) for name, ufunc in UFUNCS.items() if hasattr(np, ufunc))
+            vector["log"] = lambda x, base=None: np.log(x) if base is None else np.log(x) / np.log(base)
+            vector["min"] = lambda *args: reduce(np.minimum, _arguments(args))
+            vector["max"] = lambda *args: reduce(np.maximum, _arguments(args))
+            scalar["math"] = SimpleNamespace(**{name: scalar[name] for name in MATH_NAMES})
+            vector["math"] = SimpleNamespace(**{name: vector[name] for name in MATH_NAMES})
+            self._batch_names = (vector, scalar)
+        return self._batch_names
+    
+    def _guarded(self, name: str, func: Callable) -> Callable:
+        """An integer math function that takes whole floats and refuses arguments over the cost limits."""
+        def guarded(*args):
+            args = tuple(int(a) if isinstance(a, float) and a.is_integer() else a for a in args)
+            estimator = _Estimator(())
+            estimator._call(name, [_Bound(a.bit_length(), value=a) if isinstance(a, int) else FLOAT for a in args])
+            self._check_cost(estimator.bits, estimator.steps)
+            return func(*args)
+        return guarded
+    
     def calculate(self, expression: str) -> Union[int, float]:
         """
         Calculate and return numeric result.
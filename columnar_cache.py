@@ -0,0 +1,246 @@
+"""
+Columnar sidecar copies of CSV files, so repeated analysis skips text parsing.
+
+The first full load of a CSV writes its columns to cache_dir. Later loads read the
+sidecar, and only the requested columns. A sidecar records the mtime and size of the
+CSV it was built from and is rebuilt when either changes. With pyarrow installed the
+sidecar is a Feather file. Otherwise each column is a .npy file (saved without
+pickling), with text and other object columns stored as integer codes plus a JSON
+list of their distinct values.
+
+Each store also prunes cache_dir: sidecars whose CSV was deleted or has changed since
+are removed, then the least recently used ones until the rest fit in max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from metrics import CACHE_REQUESTS
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+
+# Names _directory gives sidecars; nothing else in cache_dir is ever removed
+SIDECAR_NAME = re.compile(r".+\.[0-9a-f]{20}$")
+
+
+class ColumnarCache:
+    """Sidecars of CSV files in cache_dir, one directory per source file."""
+
+    FORMAT_VERSION = 1
+
+    # Staging directories left this long are from writers that died
+    STAGING_TIMEOUT = 3600.0
+
+    def __init__(self, cache_dir: str = "data_cache", format: str = "auto", variant: str = "", name: str = "columnar",
+                 max_bytes: Optional[int] = 1024 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Directory holding the sidecars (created on first write)
+            format: "feather", "npy", or "auto" (Feather when pyarrow is installed)
+            variant: Label for how frames were parsed; sidecars of other variants are kept apart
+            name: Label of this cache in metrics
+            max_bytes: Disk budget of all sidecars in cache_dir; None leaves only orphans removed
+        """
+        if format == "auto":
+            format = "feather" if feather is not None else "npy"
+        if format not in ("feather", "npy"):
+            raise ValueError(f"Unknown sidecar format '{format}'")
+        if format == "feather" and feather is None:
+            raise RuntimeError("Feather sidecars require pyarrow (pip install pyarrow)")
+        self.cache_dir = cache_dir
+        self.format = format
+        self.variant = variant
+        self.name = name
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _directory(self, path: str) -> str:
+        source = os.path.abspath(path)
+        digest = hashlib.sha1(f"{source}\x1f{self.variant}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source)}.{digest}")
+
+    def info(self, path: str) -> Optional[Dict[str, Any]]:
+        """Metadata of the current sidecar of path (rows, columns, dtypes), or None if missing or stale."""
+        try:
+            with open(os.path.join(self._directory(path), "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stat = os.stat(path)
+        if (meta.get("version") != self.FORMAT_VERSION or meta.get("format") != self.format
+                or meta.get("variant", "") != self.variant or meta["source_mtime_ns"] != stat.st_mtime_ns or meta["source_size"] != stat.st_size):
+            return None
+        return meta
+
+    def load(self, path: str, columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+        """The requested columns (all when None) from the current sidecar of path, or None on a miss."""
+        meta = self.info(path)
+        if meta is None:
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+        if columns is not None:
+            missing = [c for c in columns if c not in meta["columns"]]
+            if missing:
+                raise ValueError(f"Columns not in {path}: {', '.join(map(str, missing))}")
+        directory = self._directory(path)
+        try:
+            if self.format == "feather":
+                df = feather.read_feather(os.path.join(directory, "data.feather"),
+                                          columns=list(columns) if columns is not None else None)
+            else:
+                df = self._read_npy(directory, meta, columns)
+        except OSError:
+            # Replaced or removed by another process between info() and here
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+        try:
+            os.utime(os.path.join(directory, "meta.json"))  # last use, for pruning
+        except OSError:
+            pass
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return df
+
+    def store(self, path: str, df: pd.DataFrame, stat: os.stat_result):
+        """Write df as the sidecar of path; stat is the source's stat from before it was read."""
+        meta = {
+            "version": self.FORMAT_VERSION,
+            "format": self.format,
+            "variant": self.variant,
+            "source": os.path.abspath(path),
+            "source_mtime_ns": stat.st_mtime_ns,
+            "source_size": stat.st_size,
+            "rows": len(df),
+            "columns": [str(c) for c in df.columns],
+            "dtypes": [str(t) for t in df.dtypes],
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        directory = self._directory(path)
+        # Build next to the final location and swap it in, so readers never see a partial sidecar
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            if self.format == "feather":
+                feather.write_feather(df.set_axis(meta["columns"], axis=1), os.path.join(staging, "data.feather"))
+            else:
+                meta["files"] = self._write_npy(staging, df)
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            with self._lock:
+                shutil.rmtree(directory, ignore_errors=True)
+                os.replace(staging, directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.prune(keep=directory)
+
+    def prune(self, keep: Optional[str] = None):
+        """
+        Remove sidecars that can never be hit again (source deleted or changed, unreadable
+        metadata), then the least recently used ones while the rest exceed max_bytes.
+        keep is a sidecar directory spared from the size bound.
+        """
+        with self._lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+            live = []
+            for name in names:
+                directory = os.path.join(self.cache_dir, name)
+                if not os.path.isdir(directory):
+                    continue
+                if name.startswith(".tmp-"):
+                    try:
+                        abandoned = time.time() - os.path.getmtime(directory) > self.STAGING_TIMEOUT
+                    except OSError:
+                        continue
+                    if abandoned:
+                        shutil.rmtree(directory, ignore_errors=True)
+                    continue
+                if not SIDECAR_NAME.match(name):
+                    continue
+                meta_path = os.path.join(directory, "meta.json")
+                try:
+                    with open(meta_path, encoding="utf-8") as f:
+                        meta = json.load(f)
+                    used = os.path.getmtime(meta_path)
+                    stat = os.stat(meta["source"])
+                    current = (meta["source_mtime_ns"], meta["source_size"]) == (stat.st_mtime_ns, stat.st_size)
+                except (OSError, ValueError, KeyError, TypeError):
+                    current = False
+                if not current:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    continue
+                live.append((used, directory))
+            if self.max_bytes is None:
+                return
+            sizes = {directory: self._size(directory) for _, directory in live}
+            total = sum(sizes.values())
+            for _, directory in sorted(live):
+                if total <= self.max_bytes:
+                    break
+                if directory != keep:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    total -= sizes[directory]
+
+    @staticmethod
+    def _size(directory: str) -> int:
+        total = 0
+        try:
+            for entry in os.scandir(directory):
+                total += entry.stat().st_size
+        except OSError:
+            pass  # removed by another process meanwhile
+        return total
+
+    @staticmethod
+    def _write_npy(directory: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        files = []
+        for i, (_, series) in enumerate(df.items()):
+            dtype = series.dtype
+            file = os.path.join(directory, f"{i}.npy")
+            if isinstance(dtype, np.dtype) and dtype != object:
+                np.save(file, series.to_numpy(), allow_pickle=False)
+                files.append({"kind": "array"})
+                continue
+            if isinstance(dtype, pd.CategoricalDtype):
+                codes, values, spec = series.cat.codes.to_numpy(), series.cat.categories, {"kind": "category"}
+            else:
+                # Object and extension dtypes: distinct values go to JSON, so they must be plain scalars
+                codes, values = pd.factorize(series)
+                spec = {"kind": "object"} if dtype == object else {"kind": "object", "dtype": str(dtype)}
+            np.save(file, codes, allow_pickle=False)
+            spec["values"] = [v.item() if isinstance(v, np.generic) else v for v in values]
+            files.append(spec)
+        return files
+
+    @staticmethod
+    def _read_npy(directory: str, meta: Dict[str, Any], columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        names = meta["columns"]
+        wanted = names if columns is None else columns
+        data = {}
+        for name in wanted:
+            i = names.index(name)
+            array = np.load(os.path.join(directory, f"{i}.npy"), allow_pickle=False)
+            spec = meta["files"][i]
+            if spec["kind"] == "array":
+                data[name] = array
+            else:
+                column = pd.Categorical.from_codes(array, categories=spec["values"])
+                if spec["kind"] == "object":
+                    column = column.astype(spec.get("dtype", object))
+                data[name] = column
+        return pd.DataFrame(data, columns=list(wanted))
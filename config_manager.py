@@ -2,10 +2,23 @@
 Configuration manager for Nexus AI.
 """
 
+import copy
 import json
 import os
 from typing import Dict, Any
 
+
+def _merge(defaults: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep copy of defaults with overrides applied; nested sections merge key by key."""
+    merged = copy.deepcopy(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
 class ConfigManager:
     """Manages application configuration."""
     
@@ -19,6 +32,57 @@ class ConfigManager:
             "web_search": True,
             "calculator": True,
             "system_tools": True
+        },
+        "api": {
+            "fast_responses": False,
+            "gzip_min_size": 1024,
+            "idempotency_ttl": 600,
+            "idempotency_max_entries": 1024
+        },
+        "knowledge_base": {
+            "vector_search": False,
+            "vector_dim": 512
+        },
+        "web_search": {
+            "search_engine": "duckduckgo",
+            "fanout_engines": None,
+            "hedge_percentile": 90,
+            "pool_size": 10,
+            "connect_timeout": 3.05,
+            "read_timeout": 5.0,
+            "retries": 2,
+            "backoff_factor": 0.25,
+            "engine_concurrency": 64,
+            "host_concurrency": None,
+            "cache": {
+                "path": "search_cache.sqlite3",
+                "ttl": 3600,
+                "stale_ttl": 86400,
+                "max_entries": 5000,
+                "max_bytes": 20971520
+            }
+        },
+        "data": {
+            "cache_bytes": 268435456,
+            "stream_threshold_bytes": 104857600,
+            "chunk_rows": 100000,
+            "sample_rows": 10000,
+            "cache_dir": "data_cache",
+            "sidecar_format": "auto",
+            "sidecar_bytes": 1073741824,
+            "compact_dtypes": True
+        },
+        "calculator": {
+            "max_bits": 1048576,
+            "max_steps": 20000000
+        },
+        "local_answers": {
+            "enabled": True,
+            "answer_ttl": 86400,
+            "volatile_ttl": 0,
+            "kb_max_age": None,
+            "min_similarity": 0.85,
+            "kb_min_score": 0.5
         }
     }
     
@@ -27,14 +91,14 @@ class ConfigManager:
         self.config = self.load_config()
         
     def load_config(self) -> Dict[str, Any]:
-        """Load configuration from file or default."""
+        """Load configuration from file over the defaults, so settings it leaves out keep their default."""
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, "r") as f:
-                    return json.load(f)
+                    return _merge(self.DEFAULT_CONFIG, json.load(f))
             except Exception:
-                return self.DEFAULT_CONFIG.copy()
-        return self.DEFAULT_CONFIG.copy()
+                return copy.deepcopy(self.DEFAULT_CONFIG)
+        return copy.deepcopy(self.DEFAULT_CONFIG)
         
     def save_config(self):
         """Save current configuration to file."""
@@ -1,29 +1,341 @@
+import numpy as np
 import pandas as pd
 import os
-from typing import Dict, Any, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS, CACHE_BYTES
+from tools.stream_stats import ColumnSummary
+from tools.columnar_cache import ColumnarCache
+
+
+# Bytes read_csv ignores on an otherwise blank line
+CSV_WHITESPACE = b" \t\r"
+
+
+def count_csv_rows(path: str, block_size: int = 1 << 20) -> Optional[int]:
+    """
+    Data rows of a CSV file by scanning for newlines in fixed-size blocks.
+    
+    Lines of only spaces, tabs and carriage returns are skipped like read_csv does.
+    Quotes are tracked to notice newlines inside quoted fields, assuming quotes only
+    open and close fields; the row count is then unknown and None is returned.
+    """
+    lines = 0  # lines holding more than whitespace
+    blank_tail = True  # whether the line running into the next block is whitespace so far
+    quoted = False  # whether the next block starts inside a quoted field
+    buffer = bytearray(block_size)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            data = np.frombuffer(buffer, dtype=np.uint8, count=size)
+            newlines = np.flatnonzero(data == 10)
+            if quoted or buffer.find(b'"', 0, size) >= 0:
+                # A newline is quoted when an odd number of quotes precede it ("" escapes keep the parity)
+                quotes = np.flatnonzero(data == 34)
+                if np.any((np.searchsorted(quotes, newlines) + quoted) % 2):
+                    return None
+                quoted = (len(quotes) + quoted) % 2 == 1
+            if not len(newlines):
+                blank_tail = blank_tail and not buffer[:size].translate(None, CSV_WHITESPACE)
+                continue
+            blank = _whitespace_lines(data, np.concatenate(([0], newlines[:-1] + 1)), newlines)
+            blank[0] &= blank_tail
+            lines += len(newlines) - int(np.count_nonzero(blank))
+            blank_tail = not buffer[newlines[-1] + 1:size].translate(None, CSV_WHITESPACE)
+    if quoted:
+        return None  # unterminated quote; left to the parser
+    if not blank_tail:
+        lines += 1  # final line without a terminator
+    return max(lines - 1, 0)  # minus the header
+
+
+def _whitespace_lines(data: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Whether each line data[starts[i]:ends[i]] is empty or holds only CSV_WHITESPACE."""
+    blank = ends == starts
+    # Only lines starting with whitespace can be blank; usually there are none to check
+    candidates = np.flatnonzero(~blank & np.isin(data[starts], list(CSV_WHITESPACE)))
+    if len(candidates):
+        text = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum(~np.isin(data, list(CSV_WHITESPACE)), out=text[1:])
+        blank[candidates] = text[ends[candidates]] == text[starts[candidates]]
+    return blank
+
+
+def infer_compact_dtypes(sample: pd.DataFrame, category_ratio: float = 0.5) -> Tuple[Dict[str, str], List[str]]:
+    """
+    read_csv arguments for compact text columns, inferred from a sample of the file.
+    
+    Returns a dtype map sending low-cardinality text columns to "category", and the text
+    columns whose sampled values all parse as ISO 8601 datetimes. Numeric columns are
+    left to downcast_numeric, which sees their full range.
+    """
+    dtypes: Dict[str, str] = {}
+    dates: List[str] = []
+    for column, series in sample.items():
+        if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+            continue
+        values = series.dropna()
+        if values.empty:
+            continue
+        try:
+            pd.to_datetime(values, format="ISO8601")
+            dates.append(column)
+            continue
+        except (ValueError, TypeError):
+            pass
+        if values.nunique() <= category_ratio * len(values):
+            dtypes[column] = "category"
+    return dtypes, dates
+
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert df's integer columns to the smallest type holding their range, and float
+    columns to float32 where every value converts exactly. Modifies and returns df.
+    """
+    for column, series in df.items():
+        kind = series.dtype.kind
+        if kind in "iu" and len(series):
+            df[column] = pd.to_numeric(series, downcast="unsigned" if series.min() >= 0 else "integer")
+        elif kind == "f" and series.dtype.itemsize > 4:
+            values = series.to_numpy()
+            with np.errstate(over="ignore"):
+                small = values.astype(np.float32)
+            if np.array_equal(small, values, equal_nan=True):
+                df[column] = small
+    return df
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class DataFrameCache:
+    """
+    Parsed DataFrames kept in memory, least recently used evicted first.
+    
+    Entries are keyed by (absolute path, mtime, size, columns), so a file that changes on
+    disk is parsed again and its old version dropped. The budget is the frames' deep memory
+    usage. Cached frames are shared between callers and must not be modified.
+    """
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, name: str = "dataframes"):
+        """
+        Args:
+            max_bytes: Memory budget for cached frames; larger frames are not cached at all
+            name: Label of this cache in metrics
+        """
+        self.max_bytes = max_bytes
+        self.name = name
+        self._entries: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        CACHE_BYTES.set_function(lambda: self._bytes, cache=name)
+    
+    @staticmethod
+    def key(path: str, columns: Optional[List[str]] = None) -> Tuple:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_mtime_ns, stat.st_size, tuple(columns) if columns is not None else None
+    
+    def get(self, path: str, load: Callable[[], pd.DataFrame], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Return the cached frame (of just columns, if given) for the current version of path, calling load() on a miss."""
+        key = self.key(path, columns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return entry[0]
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        df = load()
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            # Older versions of the same file can never be hit again
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._bytes -= self._entries.pop(stale)[1]
+            # Another caller may have loaded the same version meanwhile; keep its frame
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            if size <= self.max_bytes:
+                self._entries[key] = (df, size)
+                self._bytes += size
+                self._evict()
+        return df
+    
+    def peek(self, path: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """The cached frame for the current version of path, or None; never loads."""
+        with self._lock:
+            entry = self._entries.get(self.key(path, columns))
+        return None if entry is None else entry[0]
+    
+    def _evict(self):
+        evicted = 0
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.inc(evicted, cache=self.name)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class DataTool:
     """Tools for data analysis and manipulation."""
     
+    def __init__(self, cache_bytes: int = 256 * 1024 * 1024, stream_threshold_bytes: Optional[int] = 100 * 1024 * 1024,
+                 chunk_rows: int = 100_000, sketch_size: int = 1024, sample_rows: int = 10_000,
+                 cache_dir: Optional[str] = "data_cache", sidecar_format: str = "auto",
+                 sidecar_bytes: Optional[int] = 1024 * 1024 * 1024, compact_dtypes: bool = True, category_ratio: float = 0.5):
+        """
+        Args:
+            cache_bytes: Memory budget of the parsed-DataFrame cache; 0 disables it
+            stream_threshold_bytes: Files at least this large get statistics computed chunk by
+                chunk instead of being loaded whole; None never streams
+            chunk_rows: Rows per chunk when streaming
+            sketch_size: Values kept per level of the streaming quantile sketch (rank error about 1/sketch_size)
+            sample_rows: Rows summarize_csv parses to infer dtypes and show the head of an uncached file
+            cache_dir: Directory of columnar sidecar copies of loaded CSVs; None disables them
+            sidecar_format: "feather", "npy" or "auto" (Feather when pyarrow is installed)
+            sidecar_bytes: Disk budget of cache_dir; least recently used sidecars beyond it are
+                removed, as are those of deleted or changed CSVs. None only removes the latter
+            compact_dtypes: Load CSVs with dtypes inferred from a sample (small integers, float32 where
+                exact, categories, datetimes) instead of read_csv's int64/float64/str defaults
+            category_ratio: Text columns with at most this many distinct values per sampled row become categories
+        """
+        self.cache = DataFrameCache(cache_bytes) if cache_bytes else None
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.chunk_rows = chunk_rows
+        self.sketch_size = sketch_size
+        self.sample_rows = sample_rows
+        self.compact_dtypes = compact_dtypes
+        self.category_ratio = category_ratio
+        # Compact and default sidecars of a file differ, so they are kept apart
+        self.columnar = (ColumnarCache(cache_dir, sidecar_format, variant="compact" if compact_dtypes else "default",
+                                       max_bytes=sidecar_bytes)
+                         if cache_dir else None)
+    
     def execute(self, operation: str, **kwargs) -> Any:
         if operation == "summarize_csv":
             return self.summarize_csv(kwargs.get("path"))
         elif operation == "stats":
-            return self.get_stats(kwargs.get("path"))
+            columns = kwargs.get("columns")
+            if isinstance(columns, str):
+                columns = [c.strip() for c in columns.split(",") if c.strip()]
+            return self.get_stats(kwargs.get("path"), columns)
         else:
             return f"Data operation '{operation}' not supported"
 
+    def _load(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if self.cache is None:
+            return self._read(path, columns)
+        if columns is not None:
+            df = self.cache.peek(path)
+            if df is not None:
+                return df[columns]
+        return self.cache.get(path, lambda: self._read(path, columns), columns)
+
+    def _read(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Parse path, or read it from its sidecar; the first full parse writes the sidecar."""
+        if self.columnar is None:
+            df = self._parse(path, columns)
+            return df if columns is None else df[columns]
+        df = self.columnar.load(path, columns)
+        if df is not None:
+            return df
+        stat = os.stat(path)
+        df = self._parse(path)
+        try:
+            self.columnar.store(path, df, stat)
+        except (OSError, TypeError, ValueError):
+            pass  # The sidecar only saves parsing next time; this load succeeded regardless
+        return df if columns is None else df[columns]
+
+    def _parse(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """read_csv of path, with compact dtypes unless they are turned off."""
+        if not self.compact_dtypes:
+            return pd.read_csv(path, usecols=columns)
+        dtypes, dates = infer_compact_dtypes(pd.read_csv(path, nrows=self.sample_rows, usecols=columns),
+                                             self.category_ratio)
+        df = pd.read_csv(path, usecols=columns, dtype=dtypes, parse_dates=dates, date_format="ISO8601")
+        return downcast_numeric(df)
+
+    def _memory_report(self, sample: pd.DataFrame, rows: int, loaded: Optional[pd.DataFrame]) -> str:
+        """Memory of the file with compact dtypes versus read_csv's defaults, scaled up from the sample."""
+        default = sample.memory_usage(deep=True).sum()
+        if loaded is not None:
+            compact = loaded.memory_usage(deep=True).sum()
+        else:
+            dtypes, dates = infer_compact_dtypes(sample, self.category_ratio)
+            compact_sample = sample.astype(dtypes)
+            for column in dates:
+                compact_sample[column] = pd.to_datetime(compact_sample[column], format="ISO8601", errors="coerce")
+            compact = downcast_numeric(compact_sample).memory_usage(deep=True).sum()
+        estimated = len(sample) < rows
+        scale = rows / len(sample) if estimated else 1
+        default *= scale
+        if loaded is None:
+            compact *= scale
+        saved = 1 - compact / default if default else 0
+        note = ""
+        if estimated:
+            note = f" ({'defaults ' if loaded is not None else ''}estimated from the first {len(sample)} rows)"
+        return (f"Memory: {_format_bytes(compact)} with compact dtypes, {_format_bytes(default)} with defaults "
+                f"({saved:.0%} less){note}")
+
+    def _numeric_columns(self, path: str) -> Optional[List[str]]:
+        """Columns describe() would report, known from the sidecar without loading anything."""
+        meta = self.columnar.info(path) if self.columnar is not None else None
+        if meta is None:
+            return None
+        numeric = [c for c, t in zip(meta["columns"], meta["dtypes"])
+                   if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(t))
+                   and not pd.api.types.is_bool_dtype(pd.api.types.pandas_dtype(t))]
+        return numeric or None
+
     def summarize_csv(self, path: str) -> str:
         """Summarize a CSV file."""
         if not path or not os.path.exists(path):
             return f"Error: File '{path}' not found"
         
         try:
-            df = pd.read_csv(path)
+            # Only the head is shown, so parse a sample and count the rest of the rows.
+            # The sample has read_csv's default dtypes, so the head prints as it always has
+            df = pd.read_csv(path, nrows=self.sample_rows)
+            loaded = self.cache.peek(path) if self.cache is not None else None
+            meta = self.columnar.info(path) if self.columnar is not None and loaded is None else None
+            if loaded is not None:
+                rows = len(loaded)
+            elif meta is not None:
+                rows = meta["rows"]
+            elif len(df) < self.sample_rows:
+                rows = len(df)
+            else:
+                rows = self._count_rows(path)
             summary = [
                 f"Summary of {path}:",
-                f"Rows: {len(df)}",
+                f"Rows: {rows}",
                 f"Columns: {', '.join(df.columns)}",
+            ]
+            if self.compact_dtypes:
+                summary.append(self._memory_report(df, rows, loaded))
+            summary += [
                 "\nFirst 5 rows:",
                 df.head().to_string()
             ]
@@ -31,14 +343,56 @@ class DataTool:
         except Exception as e:
             return f"Error reading CSV: {str(e)}"
 
-    def get_stats(self, path: str) -> str:
-        """Get descriptive statistics for numerical columns."""
+    def _count_rows(self, path: str) -> int:
+        rows = count_csv_rows(path)
+        if rows is None:
+            # Quoted newlines: line counts are wrong, so tokenize one column instead
+            rows = sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=self.chunk_rows))
+        return rows
+
+    def get_stats(self, path: str, columns: Optional[List[str]] = None) -> str:
+        """Get descriptive statistics for numerical columns (of just columns, if given)."""
         if not path or not os.path.exists(path):
             return f"Error: File '{path}' not found"
         
         try:
-            df = pd.read_csv(path)
+            if self.stream_threshold_bytes is not None and os.path.getsize(path) >= self.stream_threshold_bytes:
+                return self._stream_stats(path, columns)
+            if columns is None and (self.cache is None or self.cache.peek(path) is None):
+                columns = self._numeric_columns(path)
+            df = self._load(path, columns)
+            # float32 columns hold exactly the parsed values, but describe() would sum them in float32
+            narrow = {c: "float64" for c, t in df.dtypes.items() if t == np.float32}
+            if narrow:
+                df = df.astype(narrow)
+            # Parsed datetimes were text to read_csv's defaults; keep them out of the numeric summary
+            dates = df.select_dtypes("datetime").columns
+            if len(dates) < len(df.columns):
+                df = df.drop(columns=dates)
             stats = df.describe().to_string()
             return f"Statistics for {path}:\n{stats}"
         except Exception as e:
             return f"Error calculating stats: {str(e)}"
+
+    def _stream_stats(self, path: str, columns: Optional[List[str]] = None) -> str:
+        """describe() of the numeric columns in one pass over the file, holding one chunk at a time."""
+        summaries: Dict[str, ColumnSummary] = {}
+        excluded = set()  # columns that are not numeric in some chunk, so not in the whole file either
+        chunks = 0
+        for chunk in pd.read_csv(path, chunksize=self.chunk_rows, usecols=columns):
+            chunks += 1
+            if chunks == 1:
+                columns = list(chunk.columns) if columns is None else columns
+            numeric = set(chunk.select_dtypes("number").columns)
+            for column in columns:
+                if column not in numeric:
+                    excluded.add(column)
+                elif column not in excluded:
+                    summary = summaries.setdefault(column, ColumnSummary(self.sketch_size))
+                    summary.update(chunk[column].to_numpy(dtype="float64", na_value=float("nan")))
+        described = {c: summaries[c].describe() for c in columns or [] if c in summaries and c not in excluded}
+        if not described:
+            return f"Statistics for {path}:\nNo numeric columns"
+        stats = pd.DataFrame(described).to_string()
+        return (f"Statistics for {path}:\n{stats}\n"
+                f"(streamed in {chunks} chunks of {self.chunk_rows} rows; percentiles are approximate)")
@@ -3,6 +3,7 @@ Executor module for executing planned actions.
 """
 
 from typing import Dict, Any, List, Callable
+import threading
 import traceback
 
 
@@ -13,6 +14,7 @@ class Executor:
         """Initialize the executor."""
         self.execution_history = []
         self.tool_registry = {}
+        self._lock = threading.Lock()  # one executor serves concurrent API requests
     
     def register_tool(self, name: str, tool: Callable):
         """
@@ -74,7 +76,8 @@ class Executor:
                 "error": None
             }
             
-            self.execution_history.append(execution_record)
+            with self._lock:
+                self.execution_history.append(execution_record)
             return execution_record
             
         except Exception as e:
@@ -92,7 +95,8 @@ class Executor:
                 "traceback": error_trace
             }
             
-            self.execution_history.append(execution_record)
+            with self._lock:
+                self.execution_history.append(execution_record)
             return execution_record
     
     def execute_plan(self, plan: List[Dict[str, Any]], tools: Dict[str, Any] = None) -> List[Dict[str, Any]]:
@@ -120,9 +124,11 @@ class Executor:
     
     def get_execution_history(self) -> List[Dict[str, Any]]:
         """Get the execution history."""
-        return self.execution_history
+        with self._lock:
+            return list(self.execution_history)
     
     def clear_history(self):
         """Clear the execution history."""
-        self.execution_history = []
+        with self._lock:
+            self.execution_history = []
 
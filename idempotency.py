@@ -0,0 +1,98 @@
+"""
+Idempotency-key handling for API requests that run agent plans.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from metrics import CACHE_REQUESTS
+
+
+class IdempotencyConflict(ValueError):
+    """Raised when an idempotency key is reused for a different request."""
+
+
+class IdempotencyCache:
+    """
+    Bounded TTL cache of completed responses keyed by client-supplied idempotency key.
+
+    A request whose key is still executing attaches to the running execution instead
+    of starting a new one. All bookkeeping happens on the event loop, so no locks
+    are needed.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of completed responses to keep
+            ttl: Seconds a completed response stays replayable
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(self, key: str, fingerprint: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Return the response for ``key``, computing it at most once.
+
+        Args:
+            key: Idempotency key from the client
+            fingerprint: Digest of the request body; reusing a key with a different body is a conflict
+            compute: Coroutine factory producing the response
+
+        Returns:
+            Tuple of (response, replayed) where replayed is True if no new execution was started
+        """
+        self._evict_expired()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            _, stored_fingerprint, result = entry
+            self._check(key, fingerprint, stored_fingerprint)
+            CACHE_REQUESTS.inc(cache="idempotency", result="hit")
+            return result, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stored_fingerprint, task = inflight
+            self._check(key, fingerprint, stored_fingerprint)
+            CACHE_REQUESTS.inc(cache="idempotency", result="inflight")
+            return await asyncio.shield(task), True
+
+        CACHE_REQUESTS.inc(cache="idempotency", result="miss")
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = (fingerprint, task)
+        task.add_done_callback(lambda t: self._finish(key, fingerprint, t))
+        # Shield so a disconnecting client does not cancel the execution others are waiting on
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: str, fingerprint: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        # Failed executions are not cached so the client can retry them
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, fingerprint, task.result())
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        # Entries share one TTL and are kept in insertion order, so expired ones cluster at the front
+        while self._entries:
+            key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _check(key: str, fingerprint: str, stored_fingerprint: str):
+        if fingerprint != stored_fingerprint:
+            raise IdempotencyConflict(f"Idempotency key '{key}' was already used for a different request")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,104 @@
+"""
+Inverted index with BM25 ranking for the knowledge base.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Incrementally updated inverted index scored with Okapi BM25."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {doc_id: term frequency}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str, text: str = None):
+        """
+        Remove a document from the index.
+
+        Passing the indexed text limits the work to that document's terms;
+        otherwise every posting list is checked.
+        """
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        terms = set(tokenize(text)) if text is not None else list(self.postings)
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs and docs.pop(doc_id, None) is not None and not docs:
+                del self.postings[term]
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Return up to top_k (doc_id, score) pairs, best first."""
+        n_docs = len(self.doc_lengths)
+        if not n_docs:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        k1, b = self.k1, self.b
+        doc_lengths = self.doc_lengths
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            df = len(docs)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            weight = idf * (k1 + 1)
+            norm = k1 * (1 - b)
+            slope = k1 * b / avg_length
+            for doc_id, tf in docs.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + norm + slope * doc_lengths[doc_id])
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def max_score(self, query: str) -> float:
+        """Upper bound of search() scores for query: every term at saturating frequency."""
+        n_docs = len(self.doc_lengths)
+        total = 0.0
+        for term in set(tokenize(query)):
+            df = len(self.postings.get(term, ()))
+            total += math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k1": self.k1, "b": self.b, "postings": self.postings, "doc_lengths": self.doc_lengths}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        index.postings = data.get("postings", {})
+        index.doc_lengths = data.get("doc_lengths", {})
+        index.total_length = sum(index.doc_lengths.values())
+        return index
@@ -0,0 +1,196 @@
+"""
+Bulk ingestion of directory trees into the knowledge base.
+
+Files are read and chunked in a worker pool, unchanged files are skipped, and the
+whole batch is appended to the knowledge base's change log in a single write.
+
+Usage: python -m agent.kb_ingest docs/ --workers 8 [--processes]
+"""
+
+import argparse
+import codecs
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterable
+
+from agent.knowledge_base import KnowledgeBase, iter_chunks
+from config_manager import ConfigManager
+from tools.system_tools import FileTool
+
+DEFAULT_EXTENSIONS = (".txt", ".md", ".rst", ".csv", ".json", ".py", ".html", ".htm", ".xml", ".yaml", ".yml", ".log")
+
+
+class _HashingReader:
+    """Text reader over a binary file that hashes the raw bytes as they stream past."""
+
+    def __init__(self, raw, digest):
+        self.raw = raw
+        self.digest = digest
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def read(self, size: int) -> str:
+        data = self.raw.read(size)
+        self.digest.update(data)
+        return self.decoder.decode(data, final=not data)
+
+
+def read_document(path: str, chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+    """
+    Read, hash and chunk one file. Runs in a worker thread or process.
+
+    Returns:
+        Dictionary with the file's chunks, sha256, size and mtime
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as raw:
+        chunks = [{"offset": offset, "text": text}
+                  for offset, text in iter_chunks(_HashingReader(raw, digest), chunk_size, chunk_overlap)]
+    return {"path": path, "chunks": chunks, "sha256": digest.hexdigest(), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _walk(root: str, extensions: Optional[Iterable[str]]) -> Iterable[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if extensions is None or os.path.splitext(filename)[1].lower() in extensions:
+                yield os.path.join(dirpath, filename)
+
+
+def agent_files(config: Dict[str, Any]) -> List[str]:
+    """
+    Files the agent writes besides the knowledge base, as configured in config (the
+    config.json contents): conversation memory, log, columnar data cache and search cache.
+    Paths are relative to the agent's working directory.
+    """
+    search_cache = (config.get("web_search") or {}).get("cache") or {}
+    search_path = search_cache.get("path", "search_cache.sqlite3")
+    data_cache = (config.get("data") or {}).get("cache_dir", "data_cache")
+    return ["memory.json", "nexus_ai.log", data_cache, search_path, search_path + "-wal", search_path + "-shm"]
+
+
+def _excluded(path: str, excluded: List[str]) -> bool:
+    return any(path == e or path.startswith(e + os.sep) for e in excluded)
+
+
+def ingest_directory(kb: KnowledgeBase, path: str, file_tool: Optional[FileTool] = None,
+                     extensions: Optional[Iterable[str]] = DEFAULT_EXTENSIONS, workers: int = 4,
+                     use_processes: bool = False, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Ingest every matching file under a directory into the knowledge base.
+
+    The knowledge base's own snapshot, log, index and data files are always skipped.
+
+    Args:
+        kb: Knowledge base to add documents to
+        path: Directory to walk, relative to the file tool's root
+        file_tool: Sandbox that decides which paths may be read (defaults to FileTool("."))
+        extensions: File extensions to include, or None for every file
+        workers: Size of the read/chunk worker pool
+        use_processes: Use a process pool instead of threads (helps when chunking is CPU-bound)
+        exclude: Further files or directories to skip (e.g. the conversation memory and logs)
+
+    Returns:
+        Report with counts, bytes, elapsed time and files/bytes per second
+    """
+    file_tool = file_tool or FileTool()
+    root = file_tool.resolve(path)
+    if root is None:
+        raise PermissionError("Access denied (outside root directory)")
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"Not a directory: {path}")
+    extensions = {e.lower() for e in extensions} if extensions is not None else None
+
+    started = time.perf_counter()
+    report = {"scanned": 0, "ingested": 0, "unchanged": 0, "denied": 0, "excluded": 0, "errors": [], "bytes": 0}
+    pending: List[str] = []
+    sources: Dict[str, str] = {}
+    base = os.path.realpath(file_tool.root_dir)
+    excluded = [os.path.realpath(e) for e in exclude if e]
+
+    for file_path in _walk(root, extensions):
+        report["scanned"] += 1
+        resolved = file_tool.resolve(file_path)
+        if resolved is None or not os.path.isfile(resolved):
+            # Symlinks pointing outside the sandbox are skipped
+            report["denied"] += 1
+            continue
+        if kb.owns_file(resolved) or _excluded(resolved, excluded):
+            report["excluded"] += 1
+            continue
+        source = os.path.relpath(file_path, base).replace(os.sep, "/")
+        entry = kb.get_entry(source)
+        stat = os.stat(resolved)
+        if entry is not None and entry.get("timestamp") == stat.st_mtime and entry.get("size") == stat.st_size:
+            report["unchanged"] += 1
+            continue
+        sources[resolved] = source
+        pending.append(resolved)
+
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    workers = max(1, workers)
+    # Read documents are held until the loop below adds them, so only a few are read ahead
+    max_in_flight = 2 * workers
+    remaining = iter(pending)
+    futures: Dict[Future, str] = {}
+    with kb.batch():
+        with pool_cls(max_workers=workers) as pool:
+            while True:
+                for file_path in islice(remaining, max_in_flight - len(futures)):
+                    futures[pool.submit(read_document, file_path, kb.chunk_size, kb.chunk_overlap)] = file_path
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = sources[futures.pop(future)]
+                    try:
+                        document = future.result()
+                    except Exception as e:
+                        report["errors"].append({"source": source, "error": str(e)})
+                        continue
+                    report["bytes"] += document["size"]
+                    entry = kb.get_entry(source)
+                    if entry is not None and entry.get("sha256") == document["sha256"]:
+                        # Touched but not modified: keep the entry, remember the new mtime
+                        kb.update_metadata(source, timestamp=document["mtime"], size=document["size"])
+                        report["unchanged"] += 1
+                        continue
+                    kb.add_document(source, document["chunks"], document["mtime"],
+                                    size=document["size"], sha256=document["sha256"])
+                    report["ingested"] += 1
+
+    elapsed = time.perf_counter() - started
+    read = report["ingested"] + report["unchanged"]
+    report["elapsed_s"] = round(elapsed, 3)
+    report["files_per_s"] = round(read / elapsed, 2) if elapsed else 0.0
+    report["bytes_per_s"] = round(report["bytes"] / elapsed, 2) if elapsed else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory into the knowledge base")
+    parser.add_argument("path", help="Directory to ingest, relative to --root")
+    parser.add_argument("--root", default=".", help="Sandbox root; files outside it are never read")
+    parser.add_argument("--kb", default="knowledge_base.json", help="Knowledge base file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--processes", action="store_true", help="Use worker processes instead of threads")
+    parser.add_argument("--ext", help="Comma-separated extensions to include (default: common text formats)")
+    parser.add_argument("--all-files", action="store_true", help="Include files of every extension")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Further file or directory to skip (repeatable); the agent's memory, log and caches always are")
+    args = parser.parse_args()
+
+    if args.all_files:
+        extensions = None
+    elif args.ext:
+        extensions = [e if e.startswith(".") else f".{e}" for e in args.ext.split(",")]
+    else:
+        extensions = DEFAULT_EXTENSIONS
+    exclude = agent_files(ConfigManager().config) + args.exclude
+    result = ingest_directory(KnowledgeBase(args.kb), args.path, FileTool(args.root), extensions,
+                              workers=args.workers, use_processes=args.processes, exclude=exclude)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,282 @@
+"""
+Offline vector similarity search for the knowledge base.
+
+Texts are embedded without any model or network call: byte n-grams are hashed into a
+fixed number of signed buckets (the "hashing trick"), term frequencies are damped with
+log1p, and rows are L2-normalized. Inverse document frequencies are applied to the
+query only, so stored vectors never go stale as the corpus grows.
+
+Vectors live in one contiguous float32 matrix that is saved as .npy and memory-mapped
+on load. Every save writes a new .npy file, so a matrix another process has mapped is
+never replaced under it. Large indexes can be partitioned with spherical k-means so a lookup only
+scores the rows of the clusters nearest to the query.
+"""
+
+import glob
+import json
+import math
+import os
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_PRIME = np.uint64(1099511628211)
+
+
+def _normalize(text: str) -> np.ndarray:
+    """Lowercase, collapse whitespace and pad with spaces so word boundaries form n-grams."""
+    data = (" " + " ".join(text.lower().split()) + " ").encode("utf-8")
+    return np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class HashingVectorizer:
+    """Embeds text as hashed, signed byte n-gram frequencies."""
+
+    def __init__(self, dim: int = 512, ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+
+    def counts(self, text: str) -> np.ndarray:
+        """Raw signed n-gram counts per bucket."""
+        data = _normalize(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        with np.errstate(over="ignore"):
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                if len(data) < n:
+                    break
+                width = len(data) - n + 1
+                h = np.zeros(width, dtype=np.uint64)
+                for k in range(n):
+                    h = h * _PRIME + data[k:k + width]
+                h = (h ^ (h >> np.uint64(29))) * _MIX
+                buckets = (h >> np.uint64(32)) % np.uint64(self.dim)
+                signs = np.where(h >> np.uint64(63), -1.0, 1.0)
+                vector += np.bincount(buckets.astype(np.intp), weights=signs, minlength=self.dim).astype(np.float32)
+        return vector
+
+    def embed(self, text: str) -> np.ndarray:
+        """Sublinear-tf, unit-length vector for a document."""
+        vector = self.counts(text)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Cosine top-k search over a contiguous, optionally memory-mapped embedding matrix."""
+
+    def __init__(self, dim: int = 512, ngram_range: Tuple[int, int] = (3, 5)):
+        self.vectorizer = HashingVectorizer(dim, ngram_range)
+        self.ids: List[Optional[str]] = []  # row -> doc id, None for removed rows
+        self.rows: Dict[str, int] = {}
+        self.df = np.zeros(dim, dtype=np.int64)  # documents with a non-zero value per bucket
+        self.centroids: Optional[np.ndarray] = None
+        self.members: List[List[int]] = []  # cluster -> rows
+        self.clustered_size = 0  # live rows when the clusters were built
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+
+    @property
+    def dim(self) -> int:
+        return self.vectorizer.dim
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:self._size]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.rows
+
+    def _writable(self):
+        """Copy a memory-mapped matrix into memory before the first change."""
+        if isinstance(self._matrix, np.memmap):
+            self._matrix = np.array(self._matrix[:self._size])
+
+    def add(self, doc_id: str, text: str):
+        """Embed and index a document, replacing any previous version with the same id."""
+        if doc_id in self.rows:
+            self.remove(doc_id)
+        vector = self.vectorizer.embed(text)
+        self._writable()
+        if self._size == len(self._matrix):
+            grown = np.zeros((max(64, 2 * len(self._matrix)), self.dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        row = self._size
+        self._matrix[row] = vector
+        self._size += 1
+        self.ids.append(doc_id)
+        self.rows[doc_id] = row
+        self.df += vector != 0
+        if self.centroids is not None:
+            self.members[int(np.argmax(self.centroids @ vector))].append(row)
+
+    def remove(self, doc_id: str):
+        """Remove a document. Its row is zeroed and dropped on the next save."""
+        row = self.rows.pop(doc_id, None)
+        if row is None:
+            return
+        self._writable()
+        self.df -= self._matrix[row] != 0
+        self._matrix[row] = 0
+        self.ids[row] = None
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        idf = np.log((1 + len(self.rows)) / (1 + self.df)) + 1
+        vector = self.vectorizer.embed(query) * idf.astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def search(self, query: str, top_k: int = 10, n_probe: int = 8) -> List[Tuple[str, float]]:
+        """
+        Return up to top_k (doc_id, cosine score) pairs, best first.
+
+        With clusters built, only the rows of the n_probe nearest clusters are scored.
+        """
+        if not self.rows:
+            return []
+        q = self._query_vector(query)
+        if self.centroids is not None and n_probe < len(self.centroids):
+            nearest = np.argpartition(-(self.centroids @ q), n_probe)[:n_probe]
+            candidates = np.fromiter((row for c in nearest for row in self.members[c]), dtype=np.intp)
+            scores = self._matrix[candidates] @ q
+        else:
+            candidates = None
+            scores = self.matrix @ q
+
+        # Only rows that can be results compete for the top_k: removed rows are zero and score 0
+        matches = np.flatnonzero(scores > 0)
+        k = min(top_k, len(matches))
+        if not k:
+            return []
+        best = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        best = best[np.argsort(-scores[best])]
+        results = []
+        for i in best:
+            row = int(candidates[i]) if candidates is not None else int(i)
+            results.append((self.ids[row], float(scores[i])))
+        return results
+
+    def build_clusters(self, n_clusters: Optional[int] = None, iterations: int = 8,
+                       sample_size: int = 20000, seed: int = 0):
+        """
+        Partition the rows with spherical k-means (about sqrt(n) clusters by default).
+
+        Centroids are fitted on a sample; every row is then assigned to its nearest centroid.
+        """
+        live = np.fromiter(self.rows.values(), dtype=np.intp)
+        n_clusters = n_clusters or max(1, int(math.sqrt(len(live))))
+        if len(live) < n_clusters:
+            self.centroids, self.members = None, []
+            return
+        rng = np.random.default_rng(seed)
+        sample = self._matrix[rng.choice(live, min(sample_size, len(live)), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_clusters):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[c] = centroid / norm if norm else centroid
+
+        self.members = [[] for _ in range(n_clusters)]
+        for start in range(0, len(live), 8192):
+            rows = live[start:start + 8192]
+            for row, label in zip(rows.tolist(), np.argmax(self._matrix[rows] @ centroids.T, axis=1).tolist()):
+                self.members[label].append(row)
+        self.centroids = centroids
+        self.clustered_size = len(live)
+
+    def save(self, prefix: str, **meta):
+        """
+        Write the matrix (without removed rows) to a new '<prefix>.<generation>.<unique>.npy'
+        file, then '<prefix>.json' (its name, ids, document frequencies, clusters and any
+        extra meta) via an atomic rename. Matrix files of earlier saves are then deleted;
+        callers sharing the files across processes must hold their lock. An index still
+        mapping a deleted matrix keeps its mapping (on Windows the file stays until a later
+        save can remove it).
+        """
+        live = [row for row, doc_id in enumerate(self.ids) if doc_id is not None]
+        renumber = {old: new for new, old in enumerate(live)}
+        matrix = np.ascontiguousarray(self._matrix[live]) if live else np.zeros((0, self.dim), dtype=np.float32)
+        matrix_path = f"{prefix}.{meta.get('generation', 0)}.{os.getpid()}-{uuid.uuid4().hex[:8]}.npy"
+        try:
+            with open(matrix_path, "xb") as f:
+                np.save(f, matrix)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            _discard(matrix_path)
+            raise
+
+        data = dict(
+            meta,
+            matrix_file=os.path.basename(matrix_path),
+            dim=self.dim,
+            ngram_range=list(self.vectorizer.ngram_range),
+            ids=[self.ids[row] for row in live],
+            df=self.df.tolist(),
+        )
+        if self.centroids is not None:
+            data["centroids"] = self.centroids.tolist()
+            data["members"] = [[renumber[row] for row in rows if row in renumber] for rows in self.members]
+            data["clustered_size"] = self.clustered_size
+        try:
+            with open(prefix + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(prefix + ".json.tmp", prefix + ".json")
+        except BaseException:
+            _discard(matrix_path)
+            raise
+        for path in glob.glob(glob.escape(prefix) + ".*.npy") + [prefix + ".npy"]:
+            if os.path.abspath(path) != os.path.abspath(matrix_path):
+                _discard(path)
+
+        self._matrix, self._size = matrix, len(live)
+        self.ids = data["ids"]
+        self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        if self.centroids is not None:
+            self.members = data["members"]
+
+    @classmethod
+    def load(cls, prefix: str, mmap: bool = True) -> Tuple["VectorIndex", Dict[str, Any]]:
+        """
+        Load an index written by save(), memory-mapping the matrix unless mmap is False.
+
+        Returns:
+            (index, the saved meta dictionary)
+        """
+        with open(prefix + ".json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index = cls(data["dim"], tuple(data["ngram_range"]))
+        # Indexes saved before matrix files were unique used '<prefix>.npy'
+        matrix_path = (os.path.join(os.path.dirname(prefix), data["matrix_file"]) if "matrix_file" in data
+                       else prefix + ".npy")
+        index._matrix = np.load(matrix_path, mmap_mode="r" if mmap else None)
+        index._size = len(index._matrix)
+        if index._matrix.shape != (len(data["ids"]), data["dim"]):
+            raise ValueError(f"{matrix_path} does not match {prefix}.json")
+        index.ids = data["ids"]
+        index.rows = {doc_id: row for row, doc_id in enumerate(index.ids)}
+        index.df = np.array(data["df"], dtype=np.int64)
+        if "centroids" in data:
+            index.centroids = np.array(data["centroids"], dtype=np.float32)
+            index.members = data["members"]
+            index.clustered_size = data.get("clustered_size", 0)
+        return index, data
@@ -1,46 +1,752 @@
+import io
 import os
+import glob
 import json
-from typing import List, Dict, Any
+import mmap
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterator, TextIO
+from metrics import PERSISTENCE_FLUSH, PERSISTENCE_ERRORS
+from agent.kb_index import BM25Index
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ENTRY_FIELDS = ["content", "timestamp", "length", "chunks"]
+SNAPSHOT_FORMAT = 3
+
+
+def iter_chunks(stream: TextIO, chunk_size: int = 1000, overlap: int = 200) -> Iterator[Tuple[int, str]]:
+    """
+    Split a text stream into overlapping chunks without reading it all into memory.
+
+    Chunks end on whitespace near the size limit where possible. At most about
+    two chunks of text are buffered at any time.
+
+    Yields:
+        (character offset of the chunk in the document, chunk text)
+    """
+    buffer = ""
+    offset = 0
+    carried = 0  # characters at the start of the buffer already emitted in the previous chunk
+    eof = False
+    while True:
+        while not eof and len(buffer) < chunk_size:
+            block = stream.read(chunk_size)
+            if block:
+                buffer += block
+            else:
+                eof = True
+        if not buffer or (eof and len(buffer) <= carried):
+            return
+        if eof and len(buffer) <= chunk_size:
+            yield offset, buffer
+            return
+
+        end = chunk_size
+        cut = max(buffer.rfind(" ", chunk_size * 4 // 5, chunk_size), buffer.rfind("\n", chunk_size * 4 // 5, chunk_size))
+        if cut > overlap:
+            end = cut
+        yield offset, buffer[:end]
+
+        step = max(end - overlap, 1)
+        buffer = buffer[step:]
+        offset += step
+        carried = end - step
+
+
+
+def _lock_file(f):
+    """Block until this process holds an exclusive lock on an open file."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass  # LK_LOCK gives up after about ten seconds; keep waiting
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(path: str, data: Any):
+    """Write JSON to a temporary file and rename it over the target, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class EntryStore(MutableMapping):
+    """
+    source -> entry mapping backed by a memory-mapped snapshot data file.
+
+    Only a compact index (source -> offset, length, seq) is held in memory; entries are
+    decoded from the mapping when read, so processes opening the same knowledge base
+    share its content through the OS page cache. Entries added or changed since the
+    snapshot are kept in memory until the next compaction. Returned entries are shared
+    with a small decode cache and must not be modified in place.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.offsets: Dict[str, List[int]] = {}  # source -> [offset, length, seq] in the data file
+        self.changed: Dict[str, Dict[str, Any]] = {}  # entries added or modified since the snapshot
+        self.path = None
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+
+    def open(self, path: str, offsets: Dict[str, List[int]]):
+        """Map a data file written by write_data_file, replacing any previous mapping."""
+        self.close()
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.offsets = offsets
+        self.changed = {}
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = self.path = None
+        self.offsets = {}
+        self.changed = {}
+        with self._lock:
+            self._cache.clear()
+
+    def seq(self, source: str) -> Optional[int]:
+        """Sequence number of an entry without decoding it."""
+        if source in self.changed:
+            return self.changed[source].get("seq")
+        location = self.offsets.get(source)
+        return location[2] if location else None
+
+    def __getitem__(self, source: str) -> Dict[str, Any]:
+        if source in self.changed:
+            return self.changed[source]
+        offset, length, _ = self.offsets[source]
+        with self._lock:
+            entry = self._cache.get(source)
+            if entry is not None:
+                self._cache.move_to_end(source)
+                return entry
+        entry = json.loads(self._map[offset:offset + length])
+        with self._lock:
+            self._cache[source] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def __setitem__(self, source: str, entry: Dict[str, Any]):
+        self.changed[source] = entry
+        if self.offsets.pop(source, None) is not None:
+            with self._lock:
+                self._cache.pop(source, None)
+
+    def __delitem__(self, source: str):
+        if source in self.changed:
+            del self.changed[source]
+        else:
+            del self.offsets[source]
+            with self._lock:
+                self._cache.pop(source, None)
+
+    def __contains__(self, source: object) -> bool:
+        return source in self.changed or source in self.offsets
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self.offsets)
+        yield from list(self.changed)
+
+    def __len__(self) -> int:
+        return len(self.offsets) + len(self.changed)
+
+
+def write_data_file(path: str, entries: Iterator[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[int]]:
+    """
+    Write entries as JSON lines to a new file (never an existing one) and fsync it.
+
+    Returns:
+        source -> [offset, length, seq] of each entry in the file
+    """
+    offsets = {}
+    position = 0
+    with open(path, "xb") as f:
+        for source, entry in entries:
+            data = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+            f.write(data + b"\n")
+            offsets[source] = [position, len(data), entry["seq"]]
+            position += len(data) + 1
+        f.flush()
+        os.fsync(f.fileno())
+    return offsets
+
 
 class KnowledgeBase:
-    """Manages local knowledge and learned information."""
-    
-    def __init__(self, kb_path: str = "knowledge_base.json"):
+    """
+    Manages local knowledge and learned information.
+
+    Changes are appended to a log (one JSON record per line) instead of rewriting the
+    whole knowledge base. When the log grows past the size of the last snapshot it is
+    compacted into a new snapshot, written atomically. Loading maps the snapshot's data
+    file (entries are decoded on demand, see EntryStore) and replays the log on top of it.
+
+    All methods are safe to call from several threads: reads and writes of the entries
+    and search indexes hold the instance's lock (an RLock).
+
+    Several instances, in one process or many, can share the same files. Appends,
+    compactions and loads hold an exclusive lock on a lock file next to the snapshot.
+    Before writing, an instance applies the records other instances logged since it last
+    looked, or reloads if one of them compacted in the meantime.
+    """
+
+    def __init__(self, kb_path: str = "knowledge_base.json", chunk_size: int = 1000, chunk_overlap: int = 200,
+                 compact_ratio: float = 1.0, min_compact_bytes: int = 1 << 20, fsync: bool = False,
+                 vector_search: bool = False, vector_dim: int = 512, vector_cluster_min: Optional[int] = None):
+        """
+        Args:
+            kb_path: Snapshot file; the change log and search index live next to it
+            chunk_size: Maximum characters per document chunk
+            chunk_overlap: Characters shared by consecutive chunks
+            compact_ratio: Compact once the log is this many times the snapshot size
+            min_compact_bytes: Never compact while the log is smaller than this
+            fsync: fsync the log after every write (survives power loss, slower)
+            vector_search: Also keep hashed n-gram vectors for search(mode="vector") (needs NumPy)
+            vector_dim: Dimensions of those vectors
+            vector_cluster_min: Cluster the vectors for sublinear (approximate) search from this many
+                chunks on; None keeps exact brute-force search
+        """
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
         self.kb_path = kb_path
-        self.knowledge = {}
+        base = os.path.splitext(kb_path)[0]
+        self.index_path = base + ".index.json"
+        self.log_path = base + ".log"
+        self.lock_path = base + ".lock"
+        self._base = base
+        self.vectors_prefix = base + ".vectors"
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.fsync = fsync
+        self.knowledge = EntryStore()
+        self.index = BM25Index()
+        self.vector_search = vector_search
+        self.vector_dim = vector_dim
+        self.vector_cluster_min = vector_cluster_min
+        self.vectors = None
+        self.next_seq = 1
+        self.generation = 0
+        self._order = []  # (seq, source) in learn order; entries whose seq moved on are stale
+        self._batch_depth = 0
+        self._pending = []  # log records buffered by batch()
+        self._snapshot_bytes = 0
+        self._log_bytes = 0  # how far into the log this instance has applied
+        self._snapshot_id = None  # identity of the snapshot file loaded, to notice other instances' compactions
+        self._lock = threading.RLock()
+        self._lock_handle = None
         self.load()
 
+    @contextmanager
+    def _exclusive(self):
+        """Hold the cross-process file lock (re-entrant within this instance)."""
+        with self._lock:
+            if self._lock_handle is not None:
+                yield
+                return
+            with open(self.lock_path, "a+b") as f:
+                _lock_file(f)
+                self._lock_handle = f
+                try:
+                    yield
+                finally:
+                    self._lock_handle = None
+                    _unlock_file(f)
+
+    def _current_snapshot_id(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.kb_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
     def load(self):
+        """Load the latest snapshot and replay the change log on top of it."""
+        with self._exclusive():
+            self._load()
+
+    def _load(self):
+        self.knowledge.close()
+        self._snapshot_id = self._current_snapshot_id()
+        self.generation = 0
         if os.path.exists(self.kb_path):
             try:
                 with open(self.kb_path, "r", encoding="utf-8") as f:
-                    self.knowledge = json.load(f)
+                    data = json.load(f)
+                if data.get("format") == SNAPSHOT_FORMAT:
+                    data_path = os.path.join(os.path.dirname(self.kb_path), data["data_file"])
+                    self.knowledge.open(data_path, data["entries"])
+                    self.generation = data.get("generation", 0)
+                    self._snapshot_bytes = os.path.getsize(data_path)
+                else:
+                    # Older snapshots hold every entry inline; they are read fully and
+                    # converted by the next compaction
+                    entries = data["knowledge"] if data.get("format") == 2 else data
+                    self.generation = data.get("generation", 0) if data.get("format") == 2 else 0
+                    self.knowledge.changed = entries
+                    self._snapshot_bytes = os.path.getsize(self.kb_path)
             except Exception:
-                self.knowledge = {}
+                self.knowledge.close()
+        for info in self.knowledge.changed.values():
+            # Entries saved before chunking kept a single (truncated) content string
+            if "chunks" not in info:
+                content = info.pop("content", "")
+                info["chunks"] = [{"offset": 0, "text": content}]
+                info["length"] = len(content)
+        self._rebuild_order()
+        self._load_index()
+        self._load_vectors()
+        self._replay_log()
+
+    def _load_index(self):
+        """Load the persisted search index, rebuilding it if it belongs to another snapshot."""
+        self.index = None
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("generation") == self.generation and self.generation:
+                    self.index = BM25Index.from_dict(data)
+            except Exception:
+                self.index = None
+        if self.index is None:
+            self.index = BM25Index()
+            for source, info in self.knowledge.items():
+                self._index_entry(source, info)
+
+    def _load_vectors(self):
+        """Memory-map the saved vector matrix, re-embedding everything if it belongs to another snapshot."""
+        if not self.vector_search:
+            return
+        from agent.kb_vectors import VectorIndex
+        self.vectors = None
+        if self.generation and os.path.exists(self.vectors_prefix + ".json"):
+            try:
+                vectors, meta = VectorIndex.load(self.vectors_prefix)
+                if meta.get("generation") == self.generation and vectors.dim == self.vector_dim:
+                    self.vectors = vectors
+            except Exception:
+                self.vectors = None
+        if self.vectors is None:
+            self.vectors = VectorIndex(self.vector_dim)
+            for source, info in self.knowledge.items():
+                for i, chunk in enumerate(info["chunks"]):
+                    self.vectors.add(self._chunk_id(source, i), chunk["text"])
+
+    def _replay_log(self, start: int = 0):
+        """Apply logged changes from byte offset start on, dropping a torn final record."""
+        self._log_bytes = start
+        if not os.path.exists(self.log_path):
+            return
+        good_bytes = start
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # partial write from a crash; everything after it is discarded
+                if not line.endswith(b"\n"):
+                    break
+                self._apply(record)
+                good_bytes += len(line)
+        if good_bytes != os.path.getsize(self.log_path):
+            with open(self.log_path, "r+b") as f:
+                f.truncate(good_bytes)
+        self._log_bytes = good_bytes
+
+    def _catch_up(self) -> bool:
+        """
+        Bring the in-memory state up to date with what other instances persisted.
+
+        Requires the file lock. Returns True if anything changed.
+        """
+        if self._current_snapshot_id() != self._snapshot_id:
+            self._load()  # another instance compacted; its snapshot covers everything logged before
+            return True
+        size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if size == self._log_bytes:
+            return False
+        if size < self._log_bytes:
+            self._load()
+        else:
+            self._replay_log(self._log_bytes)
+        return True
+
+    def _reapply(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply this instance's unwritten records again, after those of other instances.
+
+        Every change replaces, removes or overwrites fields of one entry, so applying a
+        record a second time after the others leaves the state that replaying the log
+        in its new order gives. Learned entries are renumbered after everything already
+        persisted so sequence numbers stay unique.
+        """
+        applied = []
+        for record in records:
+            if record["op"] == "learn":
+                record = dict(record, entry=dict(record["entry"], seq=self.next_seq))
+            self._apply(record)
+            applied.append(record)
+        return applied
+
+    @staticmethod
+    def _chunk_id(source: str, chunk_no: int) -> str:
+        return f"{source}#{chunk_no}"
+
+    @staticmethod
+    def _index_text(source: str, content: str) -> str:
+        return f"{source} {content}"
+
+    def _index_entry(self, source: str, info: Dict[str, Any]):
+        for i, chunk in enumerate(info["chunks"]):
+            self.index.add(self._chunk_id(source, i), self._index_text(source, chunk["text"]))
+            if self.vectors is not None:
+                self.vectors.add(self._chunk_id(source, i), chunk["text"])
+
+    def _unindex_entry(self, source: str, info: Dict[str, Any]):
+        for i, chunk in enumerate(info["chunks"]):
+            self.index.remove(self._chunk_id(source, i), self._index_text(source, chunk["text"]))
+            if self.vectors is not None:
+                self.vectors.remove(self._chunk_id(source, i))
+
+    def _rebuild_order(self):
+        """Rebuild the sequence order, numbering entries saved before sequences existed."""
+        self.next_seq = max((self.knowledge.seq(source) or 0 for source in self.knowledge), default=0) + 1
+        for info in self.knowledge.changed.values():
+            if "seq" not in info:
+                info["seq"] = self.next_seq
+                self.next_seq += 1
+        self._order = sorted((self.knowledge.seq(source), source) for source in self.knowledge)
+
+    def _apply(self, record: Dict[str, Any]):
+        """Apply one change record to the in-memory state (used both live and on replay)."""
+        op = record["op"]
+        source = record["source"]
+        if op == "learn":
+            entry = record["entry"]
+            previous = self.knowledge.get(source)
+            if previous is not None:
+                self._unindex_entry(source, previous)
+            self.knowledge[source] = entry
+            if previous is None or previous["seq"] != entry["seq"]:
+                # Already present when a crash hit between writing a snapshot and truncating the log
+                self._order.append((entry["seq"], source))
+            self.next_seq = max(self.next_seq, entry["seq"] + 1)
+            if len(self._order) > 2 * len(self.knowledge) + 64:
+                self._rebuild_order()
+            self._index_entry(source, entry)
+        elif op == "forget":
+            previous = self.knowledge.pop(source, None)
+            if previous is not None:
+                self._unindex_entry(source, previous)
+        elif op == "update":
+            if source in self.knowledge:
+                self.knowledge[source] = dict(self.knowledge[source], **record["fields"])
+
+    def _record(self, record: Dict[str, Any]):
+        """Apply a change and persist it (or buffer it while a batch is open)."""
+        with self._lock:
+            self._apply(record)
+            self._pending.append(record)
+            if not self._batch_depth:
+                self._flush()
+
+    @contextmanager
+    def batch(self):
+        """Group several changes so they reach disk in a single write, at the end."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._flush()
+
+    def _flush(self):
+        """Append buffered records to the change log, compacting it once it outgrows the snapshot."""
+        if not self._pending:
+            return
+        with self._exclusive():
+            records, self._pending = self._pending, []
+            if self._catch_up():
+                records = self._reapply(records)
+            data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode("utf-8")
+            try:
+                with PERSISTENCE_FLUSH.time(store="knowledge_base_log"):
+                    with open(self.log_path, "ab") as f:
+                        f.write(data)
+                        f.flush()
+                        if self.fsync:
+                            os.fsync(f.fileno())
+            except Exception:
+                PERSISTENCE_ERRORS.inc(store="knowledge_base_log")
+                raise
+            self._log_bytes += len(data)
+            if self._log_bytes >= max(self.min_compact_bytes, self.compact_ratio * self._snapshot_bytes):
+                self._compact()
 
     def save(self):
+        """
+        Compact: write a full snapshot and search index atomically, then truncate the change log.
+
+        A crash at any point leaves either the old or the new snapshot in place, and
+        replaying the log over either one gives the same result. Records other instances
+        logged are applied first, so the snapshot covers them too.
+        """
+        with self._exclusive():
+            records, self._pending = self._pending, []
+            if self._catch_up():
+                self._reapply(records)
+            self._compact()
+
+    def _compact(self):
+        generation = self.generation + 1
+        # Unique per writer, so a file another instance has mapped is never rewritten in place
+        data_path = f"{self._base}.{generation}.{os.getpid()}-{uuid.uuid4().hex[:8]}.data"
         try:
-            with open(self.kb_path, "w", encoding="utf-8") as f:
-                json.dump(self.knowledge, f, indent=2)
+            with PERSISTENCE_FLUSH.time(store="knowledge_base"):
+                offsets = write_data_file(data_path, ((source, self.knowledge[source]) for source in self.knowledge))
+                _write_atomic(self.index_path, dict(self.index.to_dict(), generation=generation))
+                if self.vectors is not None:
+                    if (self.vector_cluster_min is not None and len(self.vectors) >= self.vector_cluster_min
+                            and len(self.vectors) >= 2 * self.vectors.clustered_size):
+                        self.vectors.build_clusters()
+                    self.vectors.save(self.vectors_prefix, generation=generation)
+                _write_atomic(self.kb_path, {
+                    "format": SNAPSHOT_FORMAT,
+                    "generation": generation,
+                    "data_file": os.path.basename(data_path),
+                    "entries": offsets
+                })
+                with open(self.log_path, "wb"):
+                    pass
         except Exception:
+            PERSISTENCE_ERRORS.inc(store="knowledge_base")
+            if self._current_snapshot_id() == self._snapshot_id:  # the new snapshot never took its place
+                self._discard(data_path)
+            raise
+        self.generation = generation
+        self.knowledge.open(data_path, offsets)
+        self._snapshot_bytes = os.path.getsize(data_path)
+        self._log_bytes = 0
+        self._snapshot_id = self._current_snapshot_id()
+        self._remove_old_data_files(data_path)
+
+    def _remove_old_data_files(self, current: str):
+        """
+        Delete every data file but current. Called under the cross-process lock, so no other
+        instance is writing one; instances still mapping an old file keep their mapping
+        (on Windows the file stays until a later compaction can remove it).
+        """
+        for path in glob.glob(glob.escape(self._base) + ".*.data"):
+            if os.path.abspath(path) != os.path.abspath(current):
+                self._discard(path)
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except OSError:
             pass
 
+    def owns_file(self, path: str) -> bool:
+        """Whether path is one of this knowledge base's own files (snapshot, log, index, data, vectors)."""
+        directory, name = os.path.split(os.path.realpath(path))
+        base_dir, base_name = os.path.split(os.path.realpath(self._base))
+        return directory == base_dir and name.startswith(base_name + ".")
+
     def learn(self, source: str, content: str):
-        """Add new information to the knowledge base."""
-        self.knowledge[source] = {
-            "content": content[:1000] + ("..." if len(content) > 1000 else ""),
-            "timestamp": os.path.getmtime(source) if os.path.exists(source) else 0
-        }
-        self.save()
-
-    def search(self, query: str) -> List[Dict[str, Any]]:
-        """Simple keyword search in knowledge."""
+        """Add new information to the knowledge base, split into overlapping chunks."""
+        timestamp = os.path.getmtime(source) if os.path.exists(source) else 0
+        self._learn_stream(source, io.StringIO(content), timestamp)
+
+    def learn_file(self, path: str, source: Optional[str] = None):
+        """
+        Add a text file to the knowledge base, streaming it chunk by chunk.
+
+        Args:
+            path: File to read
+            source: Name to store it under, defaults to the path
+        """
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            self._learn_stream(source or path, f, os.path.getmtime(path))
+
+    def _learn_stream(self, source: str, stream: TextIO, timestamp: float):
+        chunks = [{"offset": offset, "text": text}
+                  for offset, text in iter_chunks(stream, self.chunk_size, self.chunk_overlap)]
+        self.add_document(source, chunks, timestamp)
+
+    def add_document(self, source: str, chunks: List[Dict[str, Any]], timestamp: float, **metadata):
+        """
+        Store a document that has already been split into chunks.
+
+        Args:
+            source: Name to store the document under
+            chunks: List of {"offset", "text"} chunks as produced by iter_chunks
+            timestamp: Modification time of the source
+            **metadata: Extra JSON-serializable fields kept on the entry (e.g. size, sha256)
+        """
+        with self._lock:
+            entry = dict(
+                metadata,
+                chunks=chunks,
+                length=chunks[-1]["offset"] + len(chunks[-1]["text"]) if chunks else 0,
+                timestamp=timestamp,
+                seq=self.next_seq
+            )
+            self._record({"op": "learn", "source": source, "entry": entry})
+
+    def forget(self, source: str) -> bool:
+        """Remove a document. Returns False if it was not in the knowledge base."""
+        with self._lock:
+            if source not in self.knowledge:
+                return False
+            self._record({"op": "forget", "source": source})
+            return True
+
+    def update_metadata(self, source: str, **metadata):
+        """Update metadata fields (e.g. timestamp, size) of an entry without re-indexing it."""
+        self._record({"op": "update", "source": source, "fields": metadata})
+
+    def get_entry(self, source: str) -> Optional[Dict[str, Any]]:
+        """A document's entry (chunks and metadata), or None. Must not be modified."""
+        with self._lock:
+            return self.knowledge.get(source)
+
+    def get_content(self, source: str) -> str:
+        """Reassemble a document's full text from its overlapping chunks."""
+        with self._lock:
+            chunks = self.knowledge[source]["chunks"]
+        parts = []
+        end = 0
+        for chunk in chunks:
+            parts.append(chunk["text"][end - chunk["offset"]:])
+            end = chunk["offset"] + len(chunk["text"])
+        return "".join(parts)
+
+    def search(self, query: str, top_k: int = 10, mode: str = "keyword") -> List[Dict[str, Any]]:
+        """
+        Ranked search over chunk content, best match first.
+
+        mode "keyword" ranks sources and content with BM25; mode "vector" ranks by cosine
+        similarity of hashed character n-grams, which also catches inflections and
+        near-paraphrases (requires vector_search=True).
+
+        Each result is a matching chunk with its 'source', 'chunk' number, character 'offset' and 'score'.
+        """
+        if mode not in ("keyword", "vector"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        if mode == "vector" and self.vectors is None:
+            raise ValueError("Vector search is disabled; create the KnowledgeBase with vector_search=True")
         results = []
-        query = query.lower()
-        for source, info in self.knowledge.items():
-            if query in source.lower() or query in info["content"].lower():
-                results.append({"source": source, "content": info["content"]})
+        with self._lock:
+            hits = self.index.search(query, top_k) if mode == "keyword" else self.vectors.search(query, top_k)
+            for chunk_id, score in hits:
+                source, _, chunk_no = chunk_id.rpartition("#")
+                chunk = self.knowledge[source]["chunks"][int(chunk_no)]
+                results.append({
+                    "source": source,
+                    "chunk": int(chunk_no),
+                    "offset": chunk["offset"],
+                    "content": chunk["text"],
+                    "score": round(score, 4)
+                })
         return results
 
-    def get_all(self) -> Dict[str, Any]:
+    def relevance(self, query: str, score: float) -> float:
+        """A keyword search score as a fraction (0..1) of the highest score the query could reach."""
+        with self._lock:
+            best = self.index.max_score(query)
+        return score / best if best else 0.0
+
+    def _entry_fields(self, source: str, info: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        wanted = ENTRY_FIELDS if fields is None else fields
+        item = {}
+        if "content" in wanted:
+            item["content"] = self.get_content(source)
+        if "timestamp" in wanted:
+            item["timestamp"] = info.get("timestamp", 0)
+        if "length" in wanted:
+            item["length"] = info.get("length", 0)
+        if "chunks" in wanted:
+            item["chunks"] = len(info["chunks"])
+        return item
+
+    def get_page(self, cursor: Optional[int] = None, limit: int = 50,
+                 fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of entries, walking from most to least recently learned.
+
+        Returns a tuple of (entries in learn order, cursor for the next older page or None).
+        Each entry carries its 'source' and 'seq'; 'fields' limits the others
+        ('content', 'timestamp', 'length', 'chunks' - the chunk count).
+        """
+        with self._lock:
+            return self._get_page(cursor, limit, fields)
+
+    def _get_page(self, cursor: Optional[int], limit: int,
+                  fields: Optional[List[str]]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        order = self._order
+        lo, hi = 0, len(order)
+        if cursor is not None:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if order[mid][0] < cursor:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            hi = lo
+
+        page = []
+        i = hi - 1
+        while i >= 0 and len(page) < limit:
+            seq, source = order[i]
+            if self.knowledge.seq(source) == seq:
+                item = {"source": source, "seq": seq}
+                item.update(self._entry_fields(source, self.knowledge[source], fields))
+                page.append(item)
+            i -= 1
+
+        next_cursor = page[-1]["seq"] if page and i >= 0 else None
+        page.reverse()
+        return page, next_cursor
+
+    def get_all(self) -> EntryStore:
+        """All entries as a read-only mapping of source -> entry, decoded on access."""
         return self.knowledge
@@ -0,0 +1,264 @@
+"""
+Load generator for the Nexus AI API.
+
+Starts the API in-process or as a subprocess, pointed at a local DuckDuckGo stand-in,
+replays a request mix whose queries are sampled from memory.json, and prints
+throughput plus p50/p95/p99 latency per endpoint as JSON.
+
+Usage:
+    python load_test.py --concurrency 16 --duration 20
+    python load_test.py --rate 50 --duration 20 --mode subprocess --output load.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+import requests
+
+from stub_search_server import start_stub_server
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_QUERIES = ["Calculate 25 * 4 + 100", "What time is it?", "Who is Ada Lovelace", "Hi"]
+
+# Endpoint name -> (method, path, needs a sampled query)
+ENDPOINTS = {
+    "query": ("POST", "/query", True),
+    "history": ("GET", "/history?limit=50", False),
+    "kb": ("GET", "/kb?limit=50", False),
+    "health": ("GET", "/health", False),
+    "metrics": ("GET", "/metrics", False),
+}
+
+
+def load_queries(path: str) -> List[str]:
+    """Sample user queries from a memory.json history file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f).get("history", [])
+        queries = [item["content"] for item in history if item.get("role") == "user" and item.get("content")]
+        return queries or DEFAULT_QUERIES
+    except (OSError, ValueError):
+        return DEFAULT_QUERIES
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    weights = []
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix (choose from {', '.join(ENDPOINTS)})")
+        weights.append((name, float(weight or 1)))
+    return weights
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def prepare_workdir(history_path: str) -> str:
+    """Run the server in a scratch directory so the load test never touches real memory/KB files."""
+    workdir = tempfile.mkdtemp(prefix="nexus_load_")
+    for name in ("memory.json", "knowledge_base.json"):
+        source = history_path if name == "memory.json" else os.path.join(REPO_DIR, name)
+        if os.path.exists(source):
+            shutil.copy(source, os.path.join(workdir, name))
+    return workdir
+
+
+def wait_until_healthy(base_url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("API server did not become healthy")
+
+
+def start_inprocess(port: int, workdir: str, search_url: str):
+    os.chdir(workdir)
+    os.environ["NEXUS_DUCKDUCKGO_URL"] = search_url
+    sys.path.insert(0, REPO_DIR)
+    import uvicorn
+    import api
+    logging.getLogger("NexusAI").setLevel(logging.WARNING)
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    return lambda: setattr(server, "should_exit", True)
+
+
+def start_subprocess(port: int, workdir: str, search_url: str):
+    env = dict(os.environ, NEXUS_DUCKDUCKGO_URL=search_url,
+               PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    def stop():
+        proc.terminate()
+        proc.wait()
+    return stop
+
+
+class LoadGenerator:
+    """Issues requests against the API and records per-endpoint latencies."""
+
+    def __init__(self, base_url: str, mix: List[Tuple[str, float]], queries: List[str], seed: int):
+        self.base_url = base_url
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.queries = queries
+        self.seed = seed
+        self.samples: Dict[str, List[float]] = {name: [] for name in self.names}
+        self.errors: Dict[str, int] = {name: 0 for name in self.names}
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def request(self, rng: random.Random, scheduled: float = None):
+        """Send one request; latency counts from 'scheduled' when given (open-loop mode)."""
+        name = rng.choices(self.names, self.weights)[0]
+        method, path, needs_query = ENDPOINTS[name]
+        body = {"query": rng.choice(self.queries)} if needs_query else None
+        start = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            response = self._session().request(method, self.base_url + path, json=body, timeout=30)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        # list.append is atomic, so worker threads can share the sample lists
+        self.samples[name].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[name] += 1
+
+    def run_concurrency(self, concurrency: int, duration: float):
+        deadline = time.perf_counter() + duration
+
+        def worker(i: int):
+            rng = random.Random(self.seed + i)
+            while time.perf_counter() < deadline:
+                self.request(rng)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+
+    def run_rate(self, rate: float, duration: float, max_workers: int):
+        rng = random.Random(self.seed)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for k in range(int(rate * duration)):
+                scheduled = start + k / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.request, random.Random(rng.random()), scheduled)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = sorted(samples)
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(values) / len(values)) if values else 0.0,
+            "p50": ms(percentile(values, 50)),
+            "p95": ms(percentile(values, 95)),
+            "p99": ms(percentile(values, 99)),
+            "max": ms(values[-1]) if values else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Nexus AI API")
+    parser.add_argument("--mode", choices=["inprocess", "subprocess"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop workers (or pool size with --rate)")
+    parser.add_argument("--rate", type=float, help="Fixed arrival rate in requests/sec (open loop)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to generate load")
+    parser.add_argument("--mix", default="query=8,history=1,health=1", help="Weighted endpoint mix")
+    parser.add_argument("--history", default=os.path.join(REPO_DIR, "memory.json"), help="Source of sampled queries")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="Delay of the local search stand-in")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    queries = load_queries(args.history)
+    mix = parse_mix(args.mix)
+    stub, search_url = start_stub_server(latency=args.search_latency)
+    workdir = prepare_workdir(args.history)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    start_server = start_inprocess if args.mode == "inprocess" else start_subprocess
+    stop_server = start_server(port, workdir, search_url)
+    try:
+        wait_until_healthy(base_url)
+        generator = LoadGenerator(base_url, mix, queries, args.seed)
+        started = time.perf_counter()
+        if args.rate:
+            generator.run_rate(args.rate, args.duration, max(args.concurrency, 64))
+        else:
+            generator.run_concurrency(args.concurrency, args.duration)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_server()
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    all_samples = [s for values in generator.samples.values() for s in values]
+    report = {
+        "config": {
+            "mode": args.mode,
+            "load": {"rate_rps": args.rate} if args.rate else {"concurrency": args.concurrency},
+            "duration_s": args.duration,
+            "mix": dict(mix),
+            "sampled_queries": len(queries),
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "total": summarize(all_samples, sum(generator.errors.values()), elapsed),
+        "endpoints": {
+            f"{ENDPOINTS[name][0]} {ENDPOINTS[name][1].split('?')[0]}": summarize(generator.samples[name], generator.errors[name], elapsed)
+            for name in generator.names
+        },
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Local-first answering: look in the knowledge base and in earlier answers before
+sending a query to the network.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from agent.kb_index import tokenize
+
+# Leading phrases that carry intent but not the subject of a lookup
+QUESTION_PREFIX_RE = re.compile(
+    r"^(please\s+)?(search(\s+the\s+web)?\s+for|look\s+up|find|google|tell\s+me\s+about|"
+    r"(who|what)\s+(is|are|was|were))\s+", re.IGNORECASE)
+
+# Queries about things that change from one minute to the next
+VOLATILE_RE = re.compile(
+    r"\b(news|today|tonight|latest|current|currently|now|live|weather|price|prices|score|scores|stock|stocks)\b",
+    re.IGNORECASE)
+
+# Tool output that must never be replayed as an answer
+UNUSABLE_MARKERS = (
+    "search error",
+    "error performing web search",
+    "no instant answers found",
+    "no results found",
+    "simulated search",
+    "no successful results",
+)
+
+
+def query_subject(query: str) -> str:
+    """Normalized subject of a lookup: lowercase tokens without the question phrase."""
+    stripped = QUESTION_PREFIX_RE.sub("", query.strip().strip("\"'"))
+    return " ".join(tokenize(stripped))
+
+
+class LocalAnswerer:
+    """
+    Answers lookups from the knowledge base or from fresh earlier answers in memory.
+
+    Earlier answers are reused for the same (or a near-identical) question while they
+    are younger than answer_ttl, and only when they came from a single plan step (a
+    multi-step answer also holds the other steps' results). Questions about volatile
+    things ("latest", "news", "price", ...) use volatile_ttl instead, which by default
+    means never. Knowledge base
+    chunks are used when the question's subject appears verbatim in the best match and
+    that match is relevant enough: its BM25 score must be at least kb_min_score of the
+    best score the subject could reach. At the default of 0.5 the subject's words have
+    to recur in the chunk (or also name its source), not just be mentioned once.
+    """
+
+    def __init__(self, kb=None, answer_ttl: float = 86400.0, volatile_ttl: float = 0.0,
+                 kb_max_age: Optional[float] = None, min_similarity: float = 0.85, kb_min_score: float = 0.5):
+        """
+        Args:
+            kb: KnowledgeBase to consult, or None to only reuse earlier answers
+            answer_ttl: Seconds an earlier answer stays reusable
+            volatile_ttl: Same, for questions about volatile things
+            kb_max_age: Ignore knowledge base entries older than this (by source timestamp); None never expires them
+            min_similarity: Token overlap (Jaccard) needed to treat two questions as the same
+            kb_min_score: Minimum relevance of the knowledge base match, as a fraction (0..1)
+                of the highest BM25 score its subject could reach
+        """
+        self.kb = kb
+        self.answer_ttl = answer_ttl
+        self.volatile_ttl = volatile_ttl
+        self.kb_max_age = kb_max_age
+        self.min_similarity = min_similarity
+        self.kb_min_score = kb_min_score
+
+    def ttl(self, query: str) -> float:
+        return self.volatile_ttl if VOLATILE_RE.search(query) else self.answer_ttl
+
+    @staticmethod
+    def usable(answer: str) -> bool:
+        lowered = answer.lower()
+        return bool(answer.strip()) and not any(marker in lowered for marker in UNUSABLE_MARKERS)
+
+    def lookup(self, query: str, memory=None, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find a local answer for a lookup query.
+
+        Returns:
+            {"source": "memory" | "knowledge_base", "answer", "reference", "answered_at"} or None
+        """
+        ttl = self.ttl(query)
+        subject = query_subject(query)
+        if ttl <= 0 or not subject:
+            return None
+        now = now or datetime.now()
+        if memory is not None:
+            found = self._from_memory(subject, memory, ttl, now)
+            if found:
+                return found
+        if self.kb is not None:
+            return self._from_kb(subject, now)
+        return None
+
+    def _similar(self, subject: str, other: str) -> bool:
+        if subject == other:
+            return True
+        a, b = set(subject.split()), set(other.split())
+        return bool(a and b) and len(a & b) / len(a | b) >= self.min_similarity
+
+    def _from_memory(self, subject: str, memory, ttl: float, now: datetime) -> Optional[Dict[str, Any]]:
+        history: List[Dict[str, Any]] = memory.conversation_history
+        # Walk newest first; the freshest matching answer wins and older ones can only be staler
+        for item in reversed(history):
+            if item.get("role") != "assistant":
+                continue
+            metadata = item.get("metadata") or {}
+            question = metadata.get("query")
+            if question is None or not self._similar(subject, query_subject(question)):
+                continue
+            answered_at = metadata.get("answered_at") or item.get("timestamp", "")
+            try:
+                age = (now - datetime.fromisoformat(answered_at)).total_seconds()
+            except ValueError:
+                continue
+            if age > ttl:
+                return None
+            # Answers saved before they recorded their step count may hold several results
+            if (metadata.get("steps") != 1 or metadata.get("status") != "success"
+                    or not self.usable(item.get("content", ""))):
+                continue
+            return {"source": "memory", "answer": item["content"], "reference": item.get("id"),
+                    "answered_at": answered_at}
+        return None
+
+    def _from_kb(self, subject: str, now: datetime) -> Optional[Dict[str, Any]]:
+        hits = self.kb.search(subject, top_k=1)
+        if not hits or self.kb.relevance(subject, hits[0]["score"]) < self.kb_min_score:
+            return None
+        hit = hits[0]
+        if f" {subject} " not in " " + " ".join(tokenize(f"{hit['source']} {hit['content']}")) + " ":
+            return None
+        entry = self.kb.get_entry(hit["source"])
+        if entry is None:
+            return None  # forgotten since the search
+        timestamp = entry.get("timestamp") or 0
+        if self.kb_max_age is not None and timestamp and now.timestamp() - timestamp > self.kb_max_age:
+            return None
+        answered_at = datetime.fromtimestamp(timestamp).isoformat() if timestamp else now.isoformat()
+        return {"source": "knowledge_base", "answer": f"From knowledge base ({hit['source']}):\n{hit['content']}",
+                "reference": hit["source"], "answered_at": answered_at}
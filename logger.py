@@ -12,6 +12,7 @@ class Logger:
     def __init__(self, name: str = "NexusAI", log_file: str = "nexus_ai.log"):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
+        self.log_file = log_file
         
         # Create handlers
         c_handler = logging.StreamHandler()
@@ -9,8 +9,18 @@ from tools.web_search import WebSearch
 from tools.calculator import Calculator
 from config_manager import ConfigManager
 from logger import Logger
-from typing import Dict, Any, List
+from metrics import REGISTRY, CACHE_REQUESTS
+from typing import Dict, Any, List, Optional, Tuple, Callable
 import os
+import time
+
+
+QUERIES = REGISTRY.counter("nexus_queries_total", "Queries processed by the agent.", ["mode"])
+QUERY_DURATION = REGISTRY.histogram("nexus_query_duration_seconds", "End-to-end time to process a query.", ["mode"])
+PLAN_STEPS = REGISTRY.histogram("nexus_plan_steps", "Number of steps in each plan.", buckets=(1, 2, 3, 4, 5, 8, 13))
+TOOL_DURATION = REGISTRY.histogram("nexus_tool_duration_seconds", "Time spent executing a tool action.", ["action"])
+TOOL_ERRORS = REGISTRY.counter("nexus_tool_errors_total", "Tool actions that raised an error.", ["action"])
+LOCAL_ANSWERS = REGISTRY.counter("nexus_local_answers_total", "Web searches answered locally instead.", ["source"])
 
 
 class AgenticAIAssistant:
@@ -38,7 +48,23 @@ class AgenticAIAssistant:
         
         # New Phase 2/3 Components
         from agent.knowledge_base import KnowledgeBase
-        self.kb = KnowledgeBase()
+        kb_config = self.config.get("knowledge_base", {})
+        self.kb = KnowledgeBase(
+            vector_search=kb_config.get("vector_search", False),
+            vector_dim=kb_config.get("vector_dim", 512)
+        )
+        local_config = self.config.get("local_answers", {})
+        self.local_answers = None
+        if local_config.get("enabled", True):
+            from agent.local_answers import LocalAnswerer
+            self.local_answers = LocalAnswerer(
+                self.kb,
+                answer_ttl=local_config.get("answer_ttl", 86400),
+                volatile_ttl=local_config.get("volatile_ttl", 0),
+                kb_max_age=local_config.get("kb_max_age"),
+                min_similarity=local_config.get("min_similarity", 0.85),
+                kb_min_score=local_config.get("kb_min_score", 0.5)
+            )
         
         # Register available tools
         from tools.system_tools import SystemTool, FileTool
@@ -47,11 +73,11 @@ class AgenticAIAssistant:
         from tools.data_tools import DataTool
         
         self.tools = {
-            "web_search": WebSearch(),
-            "calculator": Calculator(),
+            "web_search": self._create_web_search(),
+            "calculator": Calculator(**self.config.get("calculator", {})),
             "system": SystemTool(),
             "file": FileTool(),
-            "data": DataTool()
+            "data": DataTool(**self.config.get("data", {}))
         }
         
         # Load memory
@@ -60,6 +86,14 @@ class AgenticAIAssistant:
         # Load base system prompt
         self.base_system_prompt = self._load_system_prompt()
     
+    def _create_web_search(self):
+        """Web search tool configured from the "web_search" section, with its result cache."""
+        from tools.search_cache import SearchCache
+        search_config = dict(self.config.get("web_search", {}))
+        cache_config = search_config.pop("cache", None)
+        cache = SearchCache(**cache_config) if cache_config else None
+        return WebSearch(cache=cache, **search_config)
+    
     def _load_system_prompt(self) -> str:
         """Load system prompt from file."""
         prompt_path = os.path.join("prompts", "system_prompt.txt")
@@ -68,10 +102,19 @@ class AgenticAIAssistant:
                 return f.read()
         return "You are a helpful AI assistant that can plan and execute tasks."
     
-    def process_query(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    def process_query(self, query: str, context: Dict[str, Any] = None, memory: Optional[Memory] = None,
+                      on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Process a user query through the advanced agent pipeline with persona and file context.
+        
+        Args:
+            query: User query
+            context: Optional context (mode, file_context)
+            memory: Memory to record the exchange in, defaults to the agent's own
+            on_event: Optional callback receiving ('plan' | 'step' | 'result', payload) as the query progresses
         """
+        started = time.perf_counter()
+        memory = memory or self.memory
         context = context or {}
         mode = context.get("mode", "Standard")
         file_data = context.get("file_context", "") # New for Phase 3: attached file content
@@ -87,7 +130,7 @@ class AgenticAIAssistant:
         self.logger.info(f"Applying persona: {mode}")
 
         # Store query in memory
-        self.memory.add_interaction("user", query, metadata={"mode": mode, "has_file": bool(file_data)})
+        memory.add_interaction("user", query, metadata={"mode": mode, "has_file": bool(file_data)})
         
         # Get available tools
         available_tools = list(self.tools.keys())
@@ -95,10 +138,14 @@ class AgenticAIAssistant:
         # Create plan (Advanced Planner) - Pass mode for mode-aware planning
         plan = self.planner.create_plan(effective_query, available_tools, mode=mode)
         self.logger.info(f"Phase 3 Plan created with {len(plan)} steps for mode: {mode}")
+        PLAN_STEPS.observe(len(plan))
+        if on_event:
+            on_event("plan", {"plan": plan})
         
         # Execute plan with cross-step context replacement
         execution_results = []
         step_results_map = {} 
+        reused_at = []  # original answer times of everything served locally
         
         for step in plan:
             action = step.get("action")
@@ -111,18 +158,32 @@ class AgenticAIAssistant:
             
             self.logger.info(f"Executing step {step_num}: {action}")
             
-            if action in self.tools:
+            # Local-first: a fresh earlier answer or a knowledge base match saves the network round trip
+            local = None
+            if action == "web_search" and self.local_answers is not None:
+                local = self.local_answers.lookup(resolved_params.get("query", ""), memory)
+                CACHE_REQUESTS.inc(cache="local_answers", result="hit" if local else "miss")
+            
+            if local:
+                result = local["answer"]
+                status = "success"
+                reused_at.append(local["answered_at"])
+                LOCAL_ANSWERS.inc(source=local["source"])
+                self.logger.info(f"Step {step_num} answered from {local['source']} ({local['reference']})")
+            elif action in self.tools:
                 tool = self.tools[action]
                 try:
                     # Pass file context if tool supports it (simulated)
                     if action == "data" and file_data:
                         resolved_params["temp_data"] = file_data 
                         
-                    result = tool.execute(**resolved_params)
+                    with TOOL_DURATION.time(action=action):
+                        result = tool.execute(**resolved_params)
                     status = "success"
                 except Exception as e:
                     result = str(e)
                     status = "error"
+                    TOOL_ERRORS.inc(action=action)
             else:
                 if action == "general":
                     result = resolved_params.get("response", "I'm not sure how to help with that.")
@@ -142,6 +203,10 @@ class AgenticAIAssistant:
                 "status": status,
                 "parameters": resolved_params 
             })
+            if local:
+                execution_results[-1]["answered_from"] = local["source"]
+            if on_event:
+                on_event("step", execution_results[-1])
             
             if status == "error" and step.get("critical", False):
                 break
@@ -149,8 +214,20 @@ class AgenticAIAssistant:
         # Generate response (Simulate persona tone)
         response = self._generate_response(query, plan, execution_results, mode=mode)
         
-        # Store response in memory
-        self.memory.add_interaction("assistant", response)
+        # Store response in memory, with what local-first answering needs to reuse it later
+        answer_metadata = {
+            "query": query,
+            "steps": len(execution_results),
+            "status": "success" if execution_results and all(r["status"] == "success" for r in execution_results) else "error"
+        }
+        if reused_at:
+            answer_metadata["answered_at"] = min(reused_at)
+        memory.add_interaction("assistant", response, metadata=answer_metadata)
+        if on_event:
+            on_event("result", {"query": query, "response": response})
+        
+        QUERIES.inc(mode=mode)
+        QUERY_DURATION.observe(time.perf_counter() - started, mode=mode)
         
         return {
             "query": query,
@@ -193,6 +270,10 @@ class AgenticAIAssistant:
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get the conversation history from memory."""
         return self.memory.get_history()
+
+    def get_conversation_page(self, cursor: Optional[int] = None, limit: int = 50, **filters) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get one page of conversation history, see Memory.get_page."""
+        return self.memory.get_page(cursor=cursor, limit=limit, **filters)
     
     def clear_memory(self):
         """Clear the conversation memory."""
@@ -2,25 +2,44 @@
 Memory module for storing and retrieving conversation history and context.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import json
 import os
+import threading
+from metrics import PERSISTENCE_FLUSH, PERSISTENCE_ERRORS
+
+
+def _bisect_left(items: List[Dict[str, Any]], key: str, value: Any) -> int:
+    """Find the first position in a list sorted by ``key`` whose value is >= ``value``."""
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if items[mid].get(key, "") < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
 
 
 class Memory:
     """Manages conversation memory and context."""
     
-    def __init__(self, max_history: int = 100):
+    def __init__(self, max_history: int = 100, path: Optional[str] = "memory.json"):
         """
         Initialize memory.
         
         Args:
             max_history: Maximum number of interactions to store
+            path: JSON file used for persistence, or None to keep memory in-process only
         """
         self.max_history = max_history
+        self.path = path
         self.conversation_history = []
         self.context = {}
+        self.next_id = 1
+        # API requests run on worker threads; serialize writes to history and disk
+        self._lock = threading.RLock()
     
     def add_interaction(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """
@@ -31,43 +50,64 @@ class Memory:
             content: Message content
             metadata: Optional metadata dictionary
         """
-        interaction = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        
-        self.conversation_history.append(interaction)
-        
-        # Limit history size
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        with self._lock:
+            interaction = {
+                "id": self.next_id,
+                "role": role,
+                "content": content,
+                "timestamp": datetime.now().isoformat(),
+                "metadata": metadata or {}
+            }
+            self.next_id += 1
             
-        # Auto-save
-        self._save_to_disk()
+            self.conversation_history.append(interaction)
+            
+            # Limit history size
+            if len(self.conversation_history) > self.max_history:
+                self.conversation_history = self.conversation_history[-self.max_history:]
+                
+            # Auto-save
+            self._save_to_disk()
             
     def _save_to_disk(self):
         """Save memory to disk."""
+        if not self.path:
+            return
         try:
-             with open("memory.json", "w", encoding="utf-8") as f:
-                json.dump({
-                    "history": self.conversation_history,
-                    "context": self.context
-                }, f, indent=2, ensure_ascii=False)
+            with self._lock, PERSISTENCE_FLUSH.time(store="memory"):
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump({
+                        "history": self.conversation_history,
+                        "context": self.context,
+                        "next_id": self.next_id
+                    }, f, indent=2, ensure_ascii=False)
         except Exception:
+            PERSISTENCE_ERRORS.inc(store="memory")
             pass # Fail silently for now to avoid interrupting flow
 
     def load_from_disk(self):
         """Load memory from disk if exists."""
-        if os.path.exists("memory.json"):
+        if self.path and os.path.exists(self.path):
             try:
-                with open("memory.json", "r", encoding="utf-8") as f:
+                with open(self.path, "r", encoding="utf-8") as f:
                     data = json.load(f)
                     self.conversation_history = data.get("history", [])
                     self.context = data.get("context", {})
+                    self.next_id = data.get("next_id", 1)
+                    self._assign_ids()
             except Exception:
                 pass
+
+    def _assign_ids(self):
+        """Give sequence ids to interactions saved before ids were introduced."""
+        for item in self.conversation_history:
+            if "id" in item:
+                self.next_id = max(self.next_id, item["id"] + 1)
+        for item in self.conversation_history:
+            if "id" not in item:
+                item["id"] = self.next_id
+                self.next_id += 1
+        self.conversation_history.sort(key=lambda item: item["id"])
     
     def get_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -83,6 +123,51 @@ class Memory:
             return self.conversation_history[-limit:]
         return self.conversation_history.copy()
     
+    def get_page(self, cursor: Optional[int] = None, limit: int = 50, role: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None,
+                 fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of conversation history, walking from newest to oldest.
+        
+        Ids and timestamps grow with insertion order, so page boundaries are
+        found by binary search and only the returned items are touched.
+        
+        Args:
+            cursor: Only return interactions with an id lower than this
+            limit: Maximum number of interactions to return
+            role: Only return interactions from this role
+            since: ISO timestamp lower bound (inclusive)
+            until: ISO timestamp upper bound (exclusive)
+            fields: Fields to include in each item ('id' is always included)
+            
+        Returns:
+            Tuple of (interactions in chronological order, cursor for the next older page or None)
+        """
+        history = self.conversation_history
+        end = len(history) if cursor is None else _bisect_left(history, "id", cursor)
+        if until:
+            end = min(end, _bisect_left(history, "timestamp", until))
+        start = _bisect_left(history, "timestamp", since) if since else 0
+        
+        page = []
+        i = end - 1
+        while i >= start and len(page) < limit:
+            item = history[i]
+            if role is None or item.get("role") == role:
+                page.append(item)
+            i -= 1
+        
+        next_cursor = page[-1]["id"] if page and i >= start else None
+        page.reverse()
+        
+        if fields is not None:
+            keep = set(fields) | {"id"}
+            page = [{k: v for k, v in item.items() if k in keep} for item in page]
+        else:
+            page = [dict(item) for item in page]
+        
+        return page, next_cursor
+    
     def get_recent_context(self, n: int = 5) -> List[Dict[str, Any]]:
         """
         Get recent conversation context.
@@ -183,4 +268,5 @@ class Memory:
             data = json.load(f)
             self.conversation_history = data.get("history", [])
             self.context = data.get("context", {})
+            self._assign_ids()
 
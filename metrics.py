@@ -0,0 +1,217 @@
+"""
+Lightweight in-process metrics for Nexus AI, rendered in Prometheus text format.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Any, List, Tuple, Callable, Optional
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for a metric family with optional labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = Lock()
+
+    def _child(self, labels: Dict[str, Any]):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            # Only the first observation of a label set takes the lock
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child[0])}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return [0.0]
+
+    def inc(self, amount: float = 1.0, **labels):
+        # Plain in-place add: cheap under the GIL, no lock on the hot path
+        self._child(labels)[0] += amount
+
+    def get(self, **labels) -> float:
+        return self._child(labels)[0]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def _new_child(self):
+        return [0.0]
+
+    def set(self, value: float, **labels):
+        self._child(labels)[0] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._child(labels)[0] += amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self._child(labels)[0] -= amount
+
+    def get(self, **labels) -> float:
+        return self._child(labels)[0]
+
+    def set_function(self, func: Callable[[], float], **labels):
+        """Compute the value lazily when metrics are rendered."""
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        self._functions[key] = func
+        self._child(labels)
+
+    def render(self) -> List[str]:
+        for key, func in list(self._functions.items()):
+            try:
+                self._children[key][0] = func()
+            except Exception:
+                pass
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values (typically durations in seconds)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        # Per-bucket counts (last slot is +Inf), then sum and count
+        return {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+
+    def observe(self, value: float, **labels):
+        child = self._child(labels)
+        child["counts"][bisect_left(self.buckets, value)] += 1
+        child["sum"] += value
+        child["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_child(self, key: Tuple[str, ...], child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child["counts"]):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child['sum'])}")
+        lines.append(f"{self.name}_count{labels} {child['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of named metrics. Registering an existing name returns the same metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, cls, name: str, help_text: str, labelnames, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, tuple(labelnames), **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Shared families used by several components
+CACHE_REQUESTS = REGISTRY.counter(
+    "nexus_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "nexus_cache_evictions_total", "Entries evicted to keep a cache within its size bounds.", ["cache"]
+)
+CACHE_BYTES = REGISTRY.gauge("nexus_cache_bytes", "Bytes of cached values.", ["cache"])
+PERSISTENCE_FLUSH = REGISTRY.histogram(
+    "nexus_persistence_flush_seconds", "Time spent writing a store to disk.", ["store"]
+)
+PERSISTENCE_ERRORS = REGISTRY.counter(
+    "nexus_persistence_errors_total", "Failed writes of a store to disk.", ["store"]
+)
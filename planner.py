@@ -4,6 +4,7 @@ Planner module for breaking down complex tasks into actionable steps.
 
 from typing import List, Dict, Any
 import json
+import threading
 
 
 class Planner:
@@ -11,6 +12,7 @@ class Planner:
     
     def __init__(self):
         self.plan_history = []
+        self._lock = threading.Lock()  # one planner serves concurrent API requests
     
     def create_plan(self, task: str, available_tools: List[str], mode: str = "Standard") -> List[Dict[str, Any]]:
         """
@@ -28,17 +30,19 @@ class Planner:
                     # Add steps for each subtask
                     self._add_steps_for_task(subtask, plan, step_offset=len(plan), mode=mode)
                 
-                self.plan_history.append({"task": task, "plan": plan, "mode": mode})
+                with self._lock:
+                    self.plan_history.append({"task": task, "plan": plan, "mode": mode})
                 return plan
 
         # Single task processing
         self._add_steps_for_task(task, plan, mode=mode)
         
-        self.plan_history.append({
-            "task": task,
-            "plan": plan,
-            "mode": mode
-        })
+        with self._lock:
+            self.plan_history.append({
+                "task": task,
+                "plan": plan,
+                "mode": mode
+            })
         
         return plan
 
@@ -228,5 +232,6 @@ class Planner:
     
     def get_plan_history(self) -> List[Dict[str, Any]]:
         """Get the history of all plans created."""
-        return self.plan_history
+        with self._lock:
+            return list(self.plan_history)
 
@@ -0,0 +1,219 @@
+"""
+Persistent cache of web search results with stale-while-revalidate.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, Tuple
+
+from metrics import REGISTRY, CACHE_REQUESTS, CACHE_EVICTIONS, CACHE_BYTES
+
+CACHE_REFRESHES = REGISTRY.counter("nexus_cache_refreshes_total", "Background refreshes of stale cache entries.", ["cache", "result"])
+
+
+class SearchCache:
+    """
+    Disk-backed (SQLite) cache of search results.
+
+    Entries younger than ttl are served as-is. Older entries still inside the
+    stale_ttl window are served immediately while a background refresh replaces
+    them. Past that window the search runs in the foreground, but any entry still
+    present is served if the search fails. The least recently used entries are
+    evicted once the cache holds more than max_entries or max_bytes.
+    """
+
+    EVICT_BATCH = 16  # least recently used rows read per eviction query
+
+    def __init__(self, path: str = "search_cache.sqlite3", ttl: float = 3600.0, stale_ttl: float = 86400.0,
+                 max_entries: int = 5000, max_bytes: int = 20 * 1024 * 1024, refresh_workers: int = 2,
+                 name: str = "web_search"):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            ttl: Seconds an entry is fresh
+            stale_ttl: Seconds after that during which it is served while being refreshed
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum total size of cached values
+            refresh_workers: Threads running background refreshes
+            name: Label of this cache in metrics
+        """
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()  # background refreshes started by aget, kept alive until done
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix=f"{name}-refresh")
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._count, self._bytes = self._totals()
+        CACHE_BYTES.set_function(lambda: self._bytes, cache=name)
+
+    @staticmethod
+    def key(engine: str, query: str, max_results: int) -> str:
+        """Cache key: engine, case- and whitespace-normalized query, result count."""
+        return f"{engine}\x1f{' '.join(query.lower().split())}\x1f{max_results}"
+
+    def _totals(self) -> Tuple[int, int]:
+        count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return count, size
+
+    def lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (value, fetched_at) and mark the entry as recently used, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT value, fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def store(self, key: str, value: str):
+        """Insert or replace an entry, evicting least recently used entries past the bounds."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, fetched_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, size)
+            )
+            # Kept up to date from the row sizes instead of summing the table on every store
+            if old is None:
+                self._count += 1
+                self._bytes += size
+            else:
+                self._bytes += size - old[0]
+            if self._count > self.max_entries or self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries, a batch at a time, until both bounds hold."""
+        evicted = 0
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            batch = max(self._count - self.max_entries, self.EVICT_BATCH)
+            rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at LIMIT ?", (batch,)).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._count <= self.max_entries and self._bytes <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count -= 1
+                self._bytes -= size
+                evicted += 1
+        CACHE_EVICTIONS.inc(evicted, cache=self.name)
+
+    def _freshness(self, entry: Optional[Tuple[str, float]]) -> Optional[str]:
+        """'fresh', 'stale' (serve and refresh) or 'expired' for a cached entry, None when missing."""
+        if entry is None:
+            return None
+        age = time.time() - entry[1]
+        if age < self.ttl:
+            return "fresh"
+        return "stale" if age < self.ttl + self.stale_ttl else "expired"
+
+    def _fallback(self, entry: Optional[Tuple[str, float]]) -> str:
+        """Value to serve when fetching failed; re-raises the failure when there is none."""
+        if entry is None:
+            CACHE_REQUESTS.inc(cache=self.name, result="error")
+            raise
+        CACHE_REQUESTS.inc(cache=self.name, result="stale_if_error")
+        return entry[0]
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refreshed(self, key: str, fresh: Optional[str]):
+        if fresh is not None:
+            self.store(key, fresh)
+        # On failure the stale value keeps being served; the next lookup tries again
+        CACHE_REFRESHES.inc(cache=self.name, result="success" if fresh is not None else "error")
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def get(self, key: str, fetch: Callable[[], str]) -> str:
+        """
+        Return the cached value for key, calling fetch() when it is missing or too old.
+
+        Exceptions from fetch() propagate only when there is no cached value to fall back on.
+        """
+        entry = self.lookup(key)
+        state = self._freshness(entry)
+        if state == "fresh":
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return entry[0]
+        if state == "stale":
+            CACHE_REQUESTS.inc(cache=self.name, result="stale")
+            if self._claim_refresh(key):
+                self._executor.submit(self._refresh, key, fetch)
+            return entry[0]
+        try:
+            fresh = fetch()
+        except Exception:
+            return self._fallback(entry)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        self.store(key, fresh)
+        return fresh
+
+    def _refresh(self, key: str, fetch: Callable[[], str]):
+        try:
+            fresh = fetch()
+        except Exception:
+            fresh = None
+        self._refreshed(key, fresh)
+
+    async def aget(self, key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        """
+        Same as get() for a coroutine fetch; background refreshes run as tasks on the current loop.
+
+        SQLite reads and writes run in the default executor, so a slow disk never blocks the loop.
+        """
+        entry = await asyncio.to_thread(self.lookup, key)
+        state = self._freshness(entry)
+        if state == "fresh":
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return entry[0]
+        if state == "stale":
+            CACHE_REQUESTS.inc(cache=self.name, result="stale")
+            if self._claim_refresh(key):
+                task = asyncio.ensure_future(self._arefresh(key, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return entry[0]
+        try:
+            fresh = await fetch()
+        except Exception:
+            return self._fallback(entry)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        await asyncio.to_thread(self.store, key, fresh)
+        return fresh
+
+    async def _arefresh(self, key: str, fetch: Callable[[], Awaitable[str]]):
+        try:
+            fresh = await fetch()
+        except Exception:
+            fresh = None
+        await asyncio.to_thread(self._refreshed, key, fresh)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._db.close()
@@ -0,0 +1,138 @@
+"""
+One-pass, bounded-memory statistics for data that does not fit in memory.
+
+RunningStats keeps exact count/mean/variance/min/max and merges chunk summaries with
+Chan et al.'s parallel update, so feeding a column chunk by chunk gives the same result
+as computing over the whole column. QuantileSketch is a KLL-style compactor sketch:
+it keeps O(k log(n / k)) values, answers quantiles with a rank error of roughly 1/k,
+and two sketches built over different chunks can be merged.
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+
+class RunningStats:
+    """Exact streaming count, mean, standard deviation, min and max of a numeric column."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray):
+        """Add a chunk of values (NaNs must already be removed)."""
+        n = len(values)
+        if not n:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        self._combine(n, mean, m2, float(values.min()), float(values.max()))
+
+    def merge(self, other: "RunningStats"):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n: int, mean: float, m2: float, low: float, high: float):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, like pandas)."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantiles (KLL-style compactors).
+
+    Level h holds values standing for 2**h originals each. When a level exceeds k
+    values it is sorted and every other value, from a random offset, moves up a level.
+    """
+
+    def __init__(self, k: int = 1024, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        """Add a chunk of values (NaNs must already be removed)."""
+        if len(values):
+            self.count += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+            self._compact()
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        for h, values in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], values])
+        self._compact()
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                if len(level) % 2:
+                    # An odd value out stays at this level so no weight is lost
+                    self.levels[h], level = level[-1:], level[:-1]
+                else:
+                    self.levels[h] = np.empty(0)
+                promoted = level[int(self._rng.integers(2))::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Approximate values at the given quantiles (0..1), interpolated like pandas' default."""
+        if not self.count:
+            return [math.nan] * len(qs)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # Each retained value covers ranks [cum - weight, cum); place it at the middle
+        positions = np.cumsum(weights) - (weights + 1) / 2
+        total = weights.sum()
+        return [float(np.interp(q * (total - 1), positions, values)) for q in qs]
+
+
+class ColumnSummary:
+    """Streaming describe() of one numeric column."""
+
+    def __init__(self, sketch_size: int = 1024):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(sketch_size, seed=0)
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        self.stats.update(values)
+        self.sketch.update(values)
+
+    def merge(self, other: "ColumnSummary"):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+    def describe(self, percentiles: Sequence[float] = (0.25, 0.5, 0.75)) -> Dict[str, Any]:
+        s = self.stats
+        row = {"count": float(s.count), "mean": s.mean if s.count else math.nan, "std": s.std,
+               "min": s.min if s.count else math.nan}
+        for p, value in zip(percentiles, self.sketch.quantiles(percentiles)):
+            row[f"{p * 100:g}%"] = value
+        row["max"] = s.max if s.count else math.nan
+        return row
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the DuckDuckGo Instant Answer API, used by load tests and benchmarks
+so they run offline and reproducibly.
+
+Usage: python stub_search_server.py --port 8765 --latency 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import urlparse, parse_qs
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    """Answers every query with a deterministic DuckDuckGo-shaped JSON document."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    # Headers and body go out in separate writes; with Nagle on, a reused connection
+    # waits for the client's delayed ACK (~40 ms) before sending the body
+    disable_nagle_algorithm = True
+    latency = 0.0
+    tail_latency = 0.0
+    tail_ratio = 0.0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        if self.tail_ratio and random.random() < self.tail_ratio:
+            time.sleep(self.tail_latency)
+        elif self.latency:
+            time.sleep(self.latency)
+        if self.server.take_failure():
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({
+            "AbstractText": f"{query} is a topic served by the local search stand-in.",
+            "RelatedTopics": [{"Text": f"{query} related topic {i}"} for i in range(5)],
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubSearchServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # accept hundreds of concurrent clients without resets
+
+    def __init__(self, address, handler, latency: float = 0.0, failures: int = 0,
+                 tail_latency: float = 0.0, tail_ratio: float = 0.0):
+        super().__init__(address, type("Handler", (handler,), {
+            "latency": latency, "tail_latency": tail_latency, "tail_ratio": tail_ratio
+        }))
+        self.connections = 0  # accepted TCP connections, to check keep-alive reuse
+        self.requests = 0
+        self.failures = failures  # answer this many requests with 503, to exercise retries
+        self._lock = threading.Lock()
+
+    def take_failure(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.failures > 0:
+                self.failures -= 1
+                return True
+            return False
+
+    def get_request(self):
+        request = super().get_request()
+        self.connections += 1
+        return request
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0, failures: int = 0,
+                      tail_latency: float = 0.0, tail_ratio: float = 0.0) -> Tuple[StubSearchServer, str]:
+    """
+    Start the stub server on a background thread.
+
+    Args:
+        port: Port to listen on, 0 for any free port
+        latency: Artificial response delay in seconds
+        failures: Answer the first this many requests with 503 Service Unavailable
+        tail_latency: Delay of the slow requests, see tail_ratio
+        tail_ratio: Fraction of requests delayed by tail_latency instead of latency
+
+    Returns:
+        Tuple of (server, base URL) - pass the URL as WebSearch's duckduckgo_url
+        or the NEXUS_DUCKDUCKGO_URL environment variable.
+    """
+    server = StubSearchServer(("127.0.0.1", port), StubSearchHandler, latency=latency, failures=failures,
+                              tail_latency=tail_latency, tail_ratio=tail_ratio)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local DuckDuckGo stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial response delay in seconds")
+    parser.add_argument("--failures", type=int, default=0, help="Answer the first N requests with 503")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="Delay of occasional slow responses")
+    parser.add_argument("--tail-ratio", type=float, default=0.0, help="Fraction of responses that are slow")
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.latency, args.failures, args.tail_latency, args.tail_ratio)
+    print(f"Stub search server listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -5,7 +5,7 @@ System tools for accessing system information and file system.
 import os
 import datetime
 import platform
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 class SystemTool:
     """Tool for retrieving system information."""
@@ -32,6 +32,19 @@ class FileTool:
     def __init__(self, root_dir: str = "."):
         self.root_dir = os.path.abspath(root_dir)
     
+    def resolve(self, path: str) -> Optional[str]:
+        """
+        Resolve a path relative to the root directory.
+        
+        Returns:
+            Absolute path, or None if it points outside the root directory
+        """
+        target_path = os.path.realpath(os.path.join(self.root_dir, path))
+        root = os.path.realpath(self.root_dir)
+        if os.path.commonpath([root, target_path]) != root:
+            return None
+        return target_path
+    
     def execute(self, operation: str, path: str = ".") -> str:
         """
         Execute file operation.
@@ -41,10 +54,9 @@ class FileTool:
             path: Target path relative to root
         """
         try:
-            target_path = os.path.abspath(os.path.join(self.root_dir, path))
-            
             # Security check: Ensure path is within root_dir
-            if not target_path.startswith(self.root_dir):
+            target_path = self.resolve(path)
+            if target_path is None:
                 return "Error: Access denied (outside root directory)"
             
             if operation == "list":
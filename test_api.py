@@ -39,9 +39,34 @@ def test_history():
     except Exception as e:
         print(f"History check failed: {e}")
 
+def test_history_pagination():
+    print("\nTesting /history pagination...")
+    try:
+        first = requests.get(f"{BASE_URL}/history", params={"limit": 1, "exclude": "content"}).json()
+        print(f"First page: {first}")
+        assert "content" not in first["history"][0]
+        if first["next_cursor"] is not None:
+            older = requests.get(f"{BASE_URL}/history", params={"limit": 1, "cursor": first["next_cursor"]}).json()
+            print(f"Older page: {older['history'][0]['id']}")
+            assert older["history"][0]["id"] < first["history"][0]["id"]
+    except Exception as e:
+        print(f"History pagination failed: {e}")
+
+def test_metrics():
+    print("\nTesting /metrics...")
+    try:
+        response = requests.get(f"{BASE_URL}/metrics")
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 200
+        assert "nexus_http_request_duration_seconds" in response.text
+    except Exception as e:
+        print(f"Metrics check failed: {e}")
+
 if __name__ == "__main__":
     # Wait for server to start
     time.sleep(1)
     test_health()
     test_query()
     test_history()
+    test_history_pagination()
+    test_metrics()
@@ -0,0 +1,20 @@
+"""
+The modules sit flat in the repository root but import each other as tools.<name> and
+agent.<name>, their places in the deployed layout. Map both package names onto the root
+(unless a real package is installed) so the tests import the modules as they are.
+"""
+
+import importlib.util
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+for package in ("agent", "tools"):
+    if package not in sys.modules and importlib.util.find_spec(package) is None:
+        module = types.ModuleType(package)
+        module.__path__ = [ROOT]
+        sys.modules[package] = module
@@ -0,0 +1,89 @@
+import pytest
+
+from tools.calculator import Calculator
+
+
+@pytest.fixture
+def calc():
+    return Calculator()
+
+
+def test_bounded_expressions_evaluate(calc):
+    assert calc.execute("sqrt(16) + factorial(5)") == "124"
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("comb(ceil(10/3), 2)", "6"),
+    ("factorial(round(4.2))", "24"),
+    ("factorial(floor(6.5))", "720"),
+])
+def test_rounded_floats_have_finite_bounds(calc, expression, expected):
+    assert calc.execute(expression) == expected
+
+
+def test_huge_operands_with_small_results_evaluate(calc):
+    assert calc.execute("comb(10**400, 2)") == str((10 ** 400) * (10 ** 400 - 1) // 2)
+
+
+@pytest.mark.parametrize("expression", [
+    "9**9**9",
+    "factorial(10**6)",
+    "factorial(floor(1e300))",
+    "prod([10**100000, 10**100000, 10**100000, 10**100000, 1.0])",
+])
+def test_expensive_expressions_are_refused(calc, expression):
+    assert "too expensive" in calc.execute(expression)
+
+
+def test_sumprod_is_bounded_or_unknown(calc):
+    # Bounded where math has sumprod (Python 3.12+), an unknown name before that
+    assert calc.execute("sumprod([10**4000], [10**4000])**(10**6)").startswith("Calculation error")
+
+
+@pytest.mark.parametrize("expression", ["pi(2)", "math.__loader__"])
+def test_names_without_a_bound_are_refused(calc, expression):
+    result = calc.execute(expression)
+    assert result.startswith("Calculation error")
+    assert "too expensive" not in result
+
+
+def test_evaluate_many_vectorizes_math_functions(calc):
+    result = calc.evaluate_many("x**2 + sqrt(y)", {"x": [1, 2, 3], "y": [4, 9, 16]})
+    assert result["values"].tolist() == [3.0, 7.0, 13.0]
+    assert result["errors"] == {}
+
+
+def test_evaluate_many_broadcasts_scalars_and_shapes(calc):
+    result = calc.evaluate_many("x * y", {"x": 2, "y": [[1], [2]]})
+    assert result["values"].tolist() == [[2.0], [4.0]]
+
+
+def test_evaluate_many_applies_functions_without_ufuncs_elementwise(calc):
+    result = calc.evaluate_many("factorial(x) + gcd(x, 4)", {"x": [3, 4, 6]})
+    assert result["values"].tolist() == [7.0, 28.0, 722.0]
+    assert result["errors"] == {}
+
+
+@pytest.mark.parametrize("expression, values, expected, errors", [
+    ("1/x", [1, 0, 4], [1.0, None, 0.25], {1: "float division by zero"}),
+    ("sqrt(x)", [-1, 4], [None, 2.0], {0: "math domain error"}),
+    ("exp(x)", [0, 1000], [1.0, None], {1: "math range error"}),
+    ("factorial(x)", [3, 2.5], [6.0, None], {1: "'float' object cannot be interpreted as an integer"}),
+])
+def test_evaluate_many_reports_each_failing_element(calc, expression, values, expected, errors):
+    result = calc.evaluate_many(expression, {"x": values})
+    assert [None if v != v else v for v in result["values"].tolist()] == expected
+    assert result["errors"] == errors
+
+
+def test_evaluate_many_refuses_expensive_elements_only(calc):
+    result = calc.evaluate_many("factorial(x)", {"x": [5, 10 ** 7]})
+    assert result["values"][0] == 120.0
+    assert list(result["errors"]) == [1]
+    assert "too expensive" in result["errors"][1]
+
+
+@pytest.mark.parametrize("variables", [{"x": [1, 2], "y": [1, 2, 3]}, {"pi": [1]}, {"x": ["a"]}])
+def test_evaluate_many_rejects_bad_variables(calc, variables):
+    with pytest.raises(ValueError):
+        calc.evaluate_many("x + 1", variables)
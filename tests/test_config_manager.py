@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from config_manager import ConfigManager
+
+
+def test_file_settings_merge_over_nested_defaults(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"theme": "light", "web_search": {"retries": 5, "cache": {"ttl": 60}}}))
+    config = ConfigManager(str(path)).config
+    assert config["theme"] == "light"
+    assert config["web_search"]["retries"] == 5
+    assert config["web_search"]["cache"]["ttl"] == 60
+    assert config["web_search"]["cache"]["max_entries"] == 5000
+    assert config["web_search"]["pool_size"] == 10
+    assert config["data"] == ConfigManager.DEFAULT_CONFIG["data"]
+
+
+@pytest.mark.parametrize("contents", [None, "{}"])
+def test_changes_never_reach_the_defaults(tmp_path, contents):
+    path = tmp_path / "config.json"
+    if contents is not None:
+        path.write_text(contents)
+    config = ConfigManager(str(path)).config
+    config["web_search"]["cache"]["ttl"] = 1
+    config["features"]["web_search"] = False
+    assert ConfigManager.DEFAULT_CONFIG["web_search"]["cache"]["ttl"] == 3600
+    assert ConfigManager.DEFAULT_CONFIG["features"]["web_search"] is True
@@ -0,0 +1,160 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.columnar_cache import ColumnarCache
+from tools.data_tools import DataFrameCache, DataTool, count_csv_rows
+
+
+def write_text(path, text):
+    with open(path, "w", newline="") as f:
+        f.write(text)
+    return str(path)
+
+
+def write_csv(path, **columns):
+    pd.DataFrame(columns).to_csv(path, index=False)
+    return str(path)
+
+
+def test_dataframe_cache_counts_concurrent_misses_once(tmp_path):
+    path = write_csv(tmp_path / "data.csv", a=[1, 2, 3])
+    cache = DataFrameCache()
+    barrier = threading.Barrier(4)
+
+    def load():
+        barrier.wait()  # every caller misses before any stores
+        return pd.read_csv(path)
+
+    threads = [threading.Thread(target=cache.get, args=(path, load)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    df = cache.get(path, lambda: pd.read_csv(path))
+    assert len(cache) == 1
+    assert cache._bytes == int(df.memory_usage(deep=True).sum())
+
+
+def test_dataframe_cache_reloads_on_mtime_change(tmp_path):
+    path = write_csv(tmp_path / "data.csv", a=[1, 2, 3])
+    cache = DataFrameCache()
+    assert cache.get(path, lambda: pd.read_csv(path))["a"].tolist() == [1, 2, 3]
+    write_csv(path, a=[4, 5, 6, 7])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    df = cache.get(path, lambda: pd.read_csv(path))
+    assert df["a"].tolist() == [4, 5, 6, 7]
+    # The old version is dropped, not kept alongside
+    assert len(cache) == 1
+    assert cache._bytes == int(df.memory_usage(deep=True).sum())
+
+
+def test_dataframe_cache_smaller_than_any_frame_stores_nothing(tmp_path):
+    path = write_csv(tmp_path / "data.csv", a=[1, 2, 3])
+    cache = DataFrameCache(max_bytes=1)
+    assert cache.get(path, lambda: pd.read_csv(path))["a"].tolist() == [1, 2, 3]
+    assert len(cache) == 0
+
+
+def test_row_count_skips_whitespace_only_lines(tmp_path):
+    path = write_text(tmp_path / "data.csv", "a,b\r\n1,2\r\n   \r\n\t\n3,4\n \n")
+    assert len(pd.read_csv(path)) == 2
+    for block_size in (1, 3, 1 << 20):
+        assert count_csv_rows(path, block_size=block_size) == 2
+
+
+def test_row_count_gives_up_on_quoted_newlines(tmp_path):
+    path = write_text(tmp_path / "data.csv", 'a,b\n1,"x"\n2,"two\nlines"\n')
+    assert count_csv_rows(path) is None
+
+
+def test_summary_counts_quoted_newlines_past_the_sample(tmp_path):
+    path = write_text(tmp_path / "data.csv", "a,b\n" + "1,x\n" * 20 + '2,"two\nlines"\n' + "3,y\n" * 20)
+    summary = DataTool(cache_bytes=0, cache_dir=None, sample_rows=10).summarize_csv(path)
+    assert f"Rows: {len(pd.read_csv(path))}" in summary
+
+
+def store_sidecar(cache, path):
+    cache.store(path, pd.read_csv(path), os.stat(path))
+
+
+def sidecar_sources(cache_dir):
+    return sorted(name.split(".")[0] for name in os.listdir(cache_dir) if not name.startswith("."))
+
+
+def test_sidecars_of_deleted_csvs_are_pruned(tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"), max_bytes=None)
+    a, b, c = (write_csv(tmp_path / f"{name}.csv", x=range(1000)) for name in "abc")
+    store_sidecar(cache, a)
+    store_sidecar(cache, b)
+    os.remove(a)
+    store_sidecar(cache, c)
+    assert sidecar_sources(cache.cache_dir) == ["b", "c"]
+
+
+def test_least_recently_used_sidecars_go_over_budget(tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"), max_bytes=None)
+    b, c = (write_csv(tmp_path / f"{name}.csv", x=range(1000)) for name in "bc")
+    store_sidecar(cache, b)
+    store_sidecar(cache, c)
+    cache.max_bytes = 1
+    cache.load(b)
+    # Over budget, but the sidecar just written stays
+    store_sidecar(cache, c)
+    assert sidecar_sources(cache.cache_dir) == ["c"]
+    assert cache.load(c) is not None
+
+
+def test_pruning_leaves_other_files_alone(tmp_path):
+    cache_dir = tmp_path / "cache"
+    (cache_dir / "notes").mkdir(parents=True)
+    (cache_dir / "readme.txt").write_text("kept")
+    cache = ColumnarCache(str(cache_dir), max_bytes=1)
+    store_sidecar(cache, write_csv(tmp_path / "a.csv", x=range(10)))
+    assert {"notes", "readme.txt"} <= set(os.listdir(cache_dir))
+
+
+@pytest.fixture
+def mixed_csv(tmp_path):
+    n = 400
+    rows = np.arange(n)
+    return write_csv(
+        tmp_path / "mixed.csv",
+        small_int=rows % 200,
+        neg_int=rows % 11 - 5,
+        wide_int=np.where(rows == n - 1, 2 ** 40, rows),  # past the sample
+        exact_float=rows * 0.25,
+        inexact_float=rows * 0.1,
+        nan_float=np.where(rows % 7 == 0, np.nan, rows / 2),
+        huge_float=np.where(rows == n - 1, 1e300, 1.5),
+        label=np.where(rows == n - 1, "late", np.array(["red", "green", "blue"])[rows % 3]),
+        when=pd.date_range("2024-01-01", periods=n, freq="h").strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+
+
+def test_compact_dtypes_are_narrow(mixed_csv):
+    dtypes = DataTool(cache_bytes=0, cache_dir=None, sample_rows=50)._load(mixed_csv).dtypes
+    assert {c: str(t) for c, t in dtypes.items() if c != "when"} == {
+        "small_int": "uint8", "neg_int": "int8", "wide_int": "uint64", "exact_float": "float32",
+        "inexact_float": "float64", "nan_float": "float32", "huge_float": "float64", "label": "category",
+    }
+    assert dtypes["when"].kind == "M"  # the resolution depends on the pandas version
+
+
+@pytest.mark.parametrize("cache_dir", [None, "cache"])
+def test_compact_dtypes_round_trip_the_values(tmp_path, mixed_csv, cache_dir):
+    tool = DataTool(cache_bytes=0, cache_dir=cache_dir and str(tmp_path / cache_dir), sidecar_format="npy",
+                    sample_rows=50)
+    default = pd.read_csv(mixed_csv)
+    for _ in range(2):  # with a cache_dir, the second load reads the sidecar
+        compact = tool._load(mixed_csv)
+        for column in ("small_int", "neg_int", "wide_int"):
+            assert compact[column].astype("int64").tolist() == default[column].tolist()
+        for column in ("exact_float", "inexact_float", "nan_float", "huge_float"):
+            np.testing.assert_array_equal(compact[column].to_numpy(dtype="float64"), default[column].to_numpy())
+        assert compact["label"].astype(str).tolist() == default["label"].tolist()
+        assert compact["when"].tolist() == pd.to_datetime(default["when"], format="ISO8601").tolist()
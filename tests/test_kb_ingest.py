@@ -0,0 +1,24 @@
+import os
+
+from agent.kb_ingest import agent_files, ingest_directory
+from agent.knowledge_base import KnowledgeBase
+from tools.system_tools import FileTool
+
+
+def test_agent_files_are_not_ingested(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("notes.txt", "memory.json", "nexus_ai.log", os.path.join("data_cache", "rows.csv")):
+        os.makedirs(os.path.dirname(name) or ".", exist_ok=True)
+        with open(name, "w") as f:
+            f.write("some text about rust")
+    kb = KnowledgeBase("kb.json")
+    report = ingest_directory(kb, ".", FileTool("."), exclude=agent_files({}), workers=2)
+    assert report["ingested"] == 1
+    assert [os.path.basename(source) for source in kb.knowledge] == ["notes.txt"]
+    assert report["excluded"] >= 3
+
+
+def test_agent_files_follow_the_config():
+    config = {"data": {"cache_dir": "frames"}, "web_search": {"cache": {"path": "searches.db"}}}
+    files = agent_files(config)
+    assert "frames" in files and "searches.db" in files and "data_cache" not in files
@@ -0,0 +1,63 @@
+import glob
+import json
+import os
+
+import numpy as np
+
+from agent.kb_vectors import VectorIndex
+
+
+def make_index(count):
+    index = VectorIndex(dim=256)
+    for i in range(count):
+        index.add(f"doc{i}", f"alpha beta gamma {i}")
+    return index
+
+
+def test_search_fills_top_k_after_removals():
+    index = make_index(12)
+    for i in range(0, 12, 2):
+        index.remove(f"doc{i}")
+    results = index.search("alpha beta gamma", top_k=5)
+    assert len(results) == 5
+    assert all(int(doc_id[3:]) % 2 for doc_id, _ in results)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_search_never_returns_removed_documents():
+    index = make_index(3)
+    for i in range(3):
+        index.remove(f"doc{i}")
+    index.add("kept", "alpha beta gamma")
+    assert [doc_id for doc_id, _ in index.search("alpha beta gamma", top_k=3)] == ["kept"]
+
+
+def test_save_writes_a_new_matrix_and_keeps_mapped_ones_readable(tmp_path):
+    prefix = str(tmp_path / "kb.vectors")
+    index = make_index(4)
+    index.save(prefix, generation=1)
+    mapped, meta = VectorIndex.load(prefix)
+    assert meta["generation"] == 1
+    expected = np.array(mapped.matrix)
+
+    index.remove("doc0")
+    index.save(prefix, generation=2)
+    assert np.array_equal(mapped.matrix, expected)
+    reloaded, meta = VectorIndex.load(prefix)
+    assert meta["generation"] == 2
+    assert sorted(reloaded.rows) == ["doc1", "doc2", "doc3"]
+    assert glob.glob(prefix + ".*.npy") == [os.path.join(str(tmp_path), meta["matrix_file"])]
+
+
+def test_load_reads_the_old_single_matrix_layout(tmp_path):
+    prefix = str(tmp_path / "kb.vectors")
+    make_index(3).save(prefix, generation=1)
+    with open(prefix + ".json", encoding="utf-8") as f:
+        data = json.load(f)
+    os.replace(os.path.join(str(tmp_path), data.pop("matrix_file")), prefix + ".npy")
+    with open(prefix + ".json", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    index, _ = VectorIndex.load(prefix)
+    assert sorted(index.rows) == ["doc0", "doc1", "doc2"]
+    index.save(prefix, generation=2)
+    assert not os.path.exists(prefix + ".npy")
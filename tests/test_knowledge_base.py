@@ -0,0 +1,58 @@
+import glob
+import os
+
+from agent.knowledge_base import KnowledgeBase
+
+
+def test_compaction_keeps_other_instances_records(tmp_path):
+    path = str(tmp_path / "kb.json")
+    first = KnowledgeBase(path, min_compact_bytes=1 << 30)
+    second = KnowledgeBase(path, min_compact_bytes=1 << 30)
+    first.learn("a1", "alpha one")
+    second.learn("b1", "beta one")
+    first.learn("a2", "alpha two")
+    first.forget("a1")
+    second.save()
+    reloaded = KnowledgeBase(path)
+    assert sorted(reloaded.knowledge) == ["a2", "b1"]
+    assert reloaded.get_content("a2") == "alpha two"
+    assert os.path.getsize(reloaded.log_path) == 0
+
+
+def test_log_records_replay_over_the_snapshot(tmp_path):
+    path = str(tmp_path / "kb.json")
+    first = KnowledgeBase(path, min_compact_bytes=1 << 30)
+    first.learn("a1", "alpha one")
+    KnowledgeBase(path).save()
+    first.learn("a2", "alpha two")
+    reloaded = KnowledgeBase(path)
+    assert sorted(reloaded.knowledge) == ["a1", "a2"]
+    seqs = [reloaded.knowledge.seq(source) for source in reloaded.knowledge]
+    assert len(set(seqs)) == len(seqs)
+
+
+def test_compaction_never_rewrites_a_mapped_data_file(tmp_path):
+    path = str(tmp_path / "kb.json")
+    first = KnowledgeBase(path)
+    first.learn("a", "alpha " * 200)
+    first.save()
+    mapped = first.knowledge.path
+    second = KnowledgeBase(path)
+    second.learn("b", "beta " * 200)
+    second.save()
+    assert second.knowledge.path != mapped
+    assert first.get_content("a") == "alpha " * 200
+    assert glob.glob(str(tmp_path / "kb.*.data")) == [second.knowledge.path]
+
+
+def test_reload_serves_entries_from_the_mapped_snapshot(tmp_path):
+    path = str(tmp_path / "kb.json")
+    kb = KnowledgeBase(path)
+    kb.learn("a", "alpha " * 200)
+    kb.learn("b", "beta " * 200)
+    kb.save()
+    reloaded = KnowledgeBase(path)
+    assert reloaded.knowledge.path == kb.knowledge.path
+    assert not reloaded.knowledge.changed
+    assert reloaded.get_content("a") == "alpha " * 200
+    assert reloaded.get_content("b") == "beta " * 200
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from agent.knowledge_base import KnowledgeBase
+from agent.local_answers import LocalAnswerer
+
+FILLER = " ".join(f"word{i}" for i in range(120))
+
+
+@pytest.fixture
+def kb(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "kb.json"))
+    kb.learn("notes.txt", f"Meeting notes. {FILLER} someone mentioned python once. {FILLER}")
+    kb.learn("rust.md", f"Rust is a systems programming language. Rust guarantees memory safety. {FILLER}")
+    return kb
+
+
+def test_passing_mention_is_not_an_answer(kb):
+    assert LocalAnswerer(kb).lookup("what is python") is None
+
+
+def test_relevant_chunk_answers(kb):
+    found = LocalAnswerer(kb).lookup("what is rust")
+    assert found is not None
+    assert found["reference"] == "rust.md"
+
+
+def test_zero_threshold_takes_any_mention(kb):
+    assert LocalAnswerer(kb, kb_min_score=0.0).lookup("what is python")["reference"] == "notes.txt"
+
+
+class FakeMemory:
+    def __init__(self, *items):
+        self.conversation_history = list(items)
+
+
+def answer(content, steps, answered_at="2026-01-01T12:00:00"):
+    return {"role": "assistant", "content": content, "id": "a1", "timestamp": answered_at,
+            "metadata": {"query": "what is rust", "steps": steps, "status": "success"}}
+
+
+NOW = datetime(2026, 1, 1, 13, 0)
+
+
+def test_single_step_answer_is_reused():
+    memory = FakeMemory(answer("Rust is a systems language.", steps=1))
+    found = LocalAnswerer().lookup("what is rust", memory, now=NOW)
+    assert found["source"] == "memory"
+    assert found["answer"] == "Rust is a systems language."
+
+
+@pytest.mark.parametrize("steps", [2, None])
+def test_answer_from_several_steps_is_not_reused(steps):
+    memory = FakeMemory(answer("Rust is a systems language.\n\n42", steps=steps))
+    assert LocalAnswerer().lookup("what is rust", memory, now=NOW) is None
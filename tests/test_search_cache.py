@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from tools.search_cache import SearchCache
+
+
+def table_totals(cache):
+    return cache._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+
+def test_totals_follow_replacements(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+    cache.store("a", "x" * 10)
+    cache.store("b", "y" * 5)
+    cache.store("a", "z" * 3)
+    assert (len(cache), cache._bytes) == table_totals(cache) == (2, 8)
+    cache.close()
+
+
+def test_evicts_least_recently_used_past_either_bound(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"), max_entries=40, max_bytes=250)
+    for i in range(60):
+        cache.store(f"k{i}", "v" * 5)
+        cache.lookup("k0")
+    assert (len(cache), cache._bytes) == table_totals(cache) == (40, 200)
+    assert cache.lookup("k0") is not None
+    assert cache.lookup("k1") is None
+
+    cache.store("big", "v" * 100)
+    assert cache._bytes <= 250
+    assert (len(cache), cache._bytes) == table_totals(cache)
+    assert cache.lookup("big") is not None
+    cache.close()
+
+
+def test_aget_keeps_sqlite_off_the_event_loop(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+    threads = set()
+    for name in ("lookup", "store"):
+        method = getattr(cache, name)
+
+        def record(*args, method=method):
+            threads.add(threading.current_thread())
+            return method(*args)
+
+        setattr(cache, name, record)
+
+    async def fetch():
+        return "result"
+
+    async def run():
+        assert await cache.aget("k", fetch) == "result"
+        assert await cache.aget("k", fetch) == "result"
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert threads and loop_thread not in threads
+    cache.close()
@@ -0,0 +1,86 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.data_tools import DataTool
+from tools.stream_stats import ColumnSummary, QuantileSketch
+
+PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def rank_error(sorted_values, value, q):
+    """Distance, as a fraction of the data, between value's rank and quantile q."""
+    low = np.searchsorted(sorted_values, value, side="left")
+    high = np.searchsorted(sorted_values, value, side="right")
+    target = q * (len(sorted_values) - 1)
+    return max(0, low - target, target - high) / len(sorted_values)
+
+
+def streamed_stats(path, **options):
+    output = DataTool(stream_threshold_bytes=0, cache_dir=None, **options).get_stats(path)
+    assert "percentiles are approximate" in output
+    table = output.split("\n", 1)[1].rsplit("\n", 1)[0]
+    return pd.read_csv(io.StringIO(table), sep=r"\s+")
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(7)
+    n = 20_000
+    frame = pd.DataFrame({
+        "normal": rng.normal(50, 10, n),
+        "skewed": rng.exponential(3, n),
+        "ints": rng.integers(-1000, 1000, n),
+        "label": rng.choice(["a", "b"], n),
+    })
+    frame.loc[rng.choice(n, 500, replace=False), "normal"] = np.nan
+    path = str(tmp_path / "data.csv")
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_streamed_moments_match_pandas(csv_path):
+    expected = pd.read_csv(csv_path).describe()
+    streamed = streamed_stats(csv_path, chunk_rows=1_000)
+    assert list(streamed.columns) == ["normal", "skewed", "ints"]
+    for row in ("count", "mean", "std", "min", "max"):
+        # to_string prints six decimals or six significant digits
+        np.testing.assert_allclose(streamed.loc[row], expected.loc[row, streamed.columns], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("sketch_size", [128, 512])
+def test_streamed_percentiles_stay_within_the_rank_error(csv_path, sketch_size):
+    frame = pd.read_csv(csv_path)
+    streamed = streamed_stats(csv_path, chunk_rows=1_000, sketch_size=sketch_size)
+    for column in streamed.columns:
+        values = np.sort(frame[column].dropna().to_numpy(dtype="float64"))
+        for q in PERCENTILES:
+            value = streamed.loc[f"{q * 100:g}%", column]
+            assert rank_error(values, value, q) <= 3 / sketch_size, (column, q)
+
+
+def test_sketch_below_its_size_is_exact():
+    values = np.random.default_rng(1).normal(size=900)
+    sketch = QuantileSketch(1024)
+    for chunk in np.array_split(values, 9):
+        sketch.update(chunk)
+    np.testing.assert_allclose(sketch.quantiles(PERCENTILES), np.quantile(values, PERCENTILES))
+
+
+def test_merged_summaries_match_one_pass():
+    values = np.random.default_rng(2).exponential(size=30_000)
+    whole = ColumnSummary(256)
+    whole.update(values)
+    merged = ColumnSummary(256)
+    for chunk in np.array_split(values, 6):
+        part = ColumnSummary(256)
+        part.update(chunk)
+        merged.merge(part)
+    one, other = whole.describe(), merged.describe()
+    for key in ("count", "mean", "std", "min", "max"):
+        assert other[key] == pytest.approx(one[key], rel=1e-12)
+    ordered = np.sort(values)
+    for q in PERCENTILES:
+        assert rank_error(ordered, other[f"{q * 100:g}%"], q) <= 3 / 256
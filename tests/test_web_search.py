@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import pytest
+
+from stub_search_server import start_stub_server
+from tools.web_search import SEARCH_RETRIES, WebSearch
+
+BACKOFF = 0.2
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(failures):
+        server, url = start_stub_server(failures=failures)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retries_transient_failures_with_backoff(stub):
+    server, url = stub(failures=2)
+    search = WebSearch(duckduckgo_url=url, retries=2, backoff_factor=BACKOFF)
+    retries = SEARCH_RETRIES.get(action="web_search")
+    started = time.perf_counter()
+    result = search.execute("python")
+    elapsed = time.perf_counter() - started
+    search.close()
+    assert result.startswith("Answer: python")
+    assert server.requests == 3
+    assert SEARCH_RETRIES.get(action="web_search") - retries == 2
+    # The first retry is immediate, the second waits backoff_factor * 2
+    assert 2 * BACKOFF <= elapsed < 4 * BACKOFF + 1
+
+
+def test_gives_up_after_the_last_retry(stub):
+    server, url = stub(failures=5)
+    search = WebSearch(duckduckgo_url=url, retries=2, backoff_factor=0.01)
+    result = search.execute("python")
+    search.close()
+    assert "503" in result
+    assert server.requests == 3
+
+
+def test_async_retries_match_the_blocking_ones(stub):
+    pytest.importorskip("httpx")
+    server, url = stub(failures=2)
+    search = WebSearch(duckduckgo_url=url, retries=2, backoff_factor=BACKOFF)
+    retries = SEARCH_RETRIES.get(action="web_search")
+
+    async def run():
+        try:
+            started = time.perf_counter()
+            return await search.aexecute("python"), time.perf_counter() - started
+        finally:
+            await search.aclose()
+
+    result, elapsed = asyncio.run(run())
+    search.close()
+    assert result.startswith("Answer: python")
+    assert server.requests == 3
+    assert SEARCH_RETRIES.get(action="web_search") - retries == 2
+    assert 2 * BACKOFF <= elapsed < 4 * BACKOFF + 1
+
+
+def fanout_search():
+    search = WebSearch(search_engine="fanout", fanout_engines=["broken", "working"], hedge_percentile=None)
+
+    def broken(query, max_results):
+        raise KeyError("items")
+
+    def working(query, max_results):
+        return {"answer": f"{query} answer", "items": []}
+
+    async def abroken(query, max_results):
+        return broken(query, max_results)
+
+    async def aworking(query, max_results):
+        return working(query, max_results)
+
+    search.register_engine("broken", broken, abroken)
+    search.register_engine("working", working, aworking)
+    return search
+
+
+def test_fanout_survives_an_engine_raising_any_exception():
+    search = fanout_search()
+    assert search.execute("python") == "Answer: python answer"
+    search.close()
+
+
+def test_async_fanout_survives_an_engine_raising_any_exception():
+    search = fanout_search()
+    assert asyncio.run(search.aexecute("python")) == "Answer: python answer"
+    search.close()
+
+
+def test_fanout_reports_each_engines_error():
+    search = fanout_search()
+    search.fanout_engines = ["broken"]
+    assert search.execute("python") == "broken search error: KeyError('items')"
+    assert asyncio.run(search.aexecute("python")) == "broken search error: KeyError('items')"
+    search.close()
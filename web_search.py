@@ -2,24 +2,220 @@
 Web search tool for searching the internet.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 import requests
-from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote, urlsplit
+from urllib3.util.retry import Retry
+from metrics import REGISTRY
+from tools.search_cache import SearchCache
+
+
+SEARCH_TIMEOUTS = REGISTRY.counter("nexus_tool_timeouts_total", "Tool actions that timed out.", ["action"])
+SEARCH_RETRIES = REGISTRY.counter("nexus_tool_retries_total", "Tool requests retried after a transient failure.", ["action"])
+ENGINE_DURATION = REGISTRY.histogram("nexus_search_engine_seconds", "Latency of each search engine request.", ["engine"])
+ENGINE_ERRORS = REGISTRY.counter("nexus_search_engine_errors_total", "Failed search engine requests.", ["engine"])
+SEARCH_HEDGES = REGISTRY.counter("nexus_search_hedges_total", "Fan-out searches that started another engine.", ["reason"])
+
+# A search engine takes (query, max_results) and returns {"answer": str or None, "items": [str]},
+# raising SearchError when it has no usable results
+Engine = Callable[[str, int], Dict[str, Any]]
+AsyncEngine = Callable[[str, int], Awaitable[Dict[str, Any]]]
+
+
+class SearchError(Exception):
+    """A search that produced no usable results; the message is shown to the user."""
+
+
+class _SearchRetry(Retry):
+    """Retry policy that caps the backoff sleep and counts every retry."""
+
+    MAX_BACKOFF = 4.0
+
+    def get_backoff_time(self) -> float:
+        return min(self.MAX_BACKOFF, super().get_backoff_time())
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        SEARCH_RETRIES.inc(action="web_search")
+        return retry
+
+
+class EngineLatency:
+    """Sliding window of recent request latencies per engine."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, engine: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(engine, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, engine: str, pct: float) -> Optional[float]:
+        """Latency percentile over the window, or None before the engine has enough samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(engine, ()))
+        if len(samples) < 5:
+            return None
+        return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]
+
+
+class _AsyncState:
+    """HTTP clients and concurrency limits of one event loop (asyncio primitives are bound to a loop)."""
+
+    # httpcore scans every pooled connection against every other one on each request
+    # event, so one pool of hundreds of connections spends more time on bookkeeping than
+    # on I/O; the connections are spread over several small pools instead
+    SHARD_SIZE = 8
+
+    def __init__(self, loop, clients: List[Any], engine_limit: int, host_limit: int):
+        self.loop = loop
+        self.clients = clients
+        self.in_flight = [0] * len(clients)
+        self.engine_limit = engine_limit
+        self.host_limit = host_limit
+        self.engines: Dict[str, asyncio.Semaphore] = {}
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def engine(self, name: str) -> asyncio.Semaphore:
+        return self.engines.setdefault(name, asyncio.Semaphore(self.engine_limit))
+
+    def host(self, url: str) -> asyncio.Semaphore:
+        return self.hosts.setdefault(urlsplit(url).netloc, asyncio.Semaphore(self.host_limit))
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None):
+        """GET through the least busy pool."""
+        shard = self.in_flight.index(min(self.in_flight))
+        self.in_flight[shard] += 1
+        try:
+            return await self.clients[shard].get(url, params=params)
+        finally:
+            self.in_flight[shard] -= 1
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
 
 
 class WebSearch:
     """Tool for performing web searches."""
     
-    def __init__(self, api_key: Optional[str] = None, search_engine: str = "duckduckgo"):
+    # Only GETs are sent, so every one of these is safe to retry
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    # Overridable so load tests can point searches at a local stand-in
+    DUCKDUCKGO_URL = os.environ.get("NEXUS_DUCKDUCKGO_URL", "https://api.duckduckgo.com/")
+    
+    def __init__(self, api_key: Optional[str] = None, search_engine: str = "duckduckgo",
+                 duckduckgo_url: Optional[str] = None, pool_size: int = 10, connect_timeout: float = 3.05,
+                 read_timeout: float = 5.0, retries: int = 2, backoff_factor: float = 0.25,
+                 cache: Optional[SearchCache] = None, fanout_engines: Optional[List[str]] = None,
+                 hedge_percentile: Optional[float] = 90.0, hedge_delay: float = 0.3, min_hedge_delay: float = 0.02,
+                 engine_concurrency: int = 64, host_concurrency: Optional[int] = None):
         """
         Initialize web search tool.
         
         Args:
             api_key: Optional API key for search services
-            search_engine: Search engine to use ('duckduckgo' or 'google')
+            search_engine: Search engine to use ('duckduckgo', 'google', another registered engine, or 'fanout')
+            duckduckgo_url: Base URL of the DuckDuckGo Instant Answer API
+            pool_size: Keep-alive connections kept open per host
+            connect_timeout: Seconds to wait for a TCP/TLS connection
+            read_timeout: Seconds to wait for the server to send a response
+            retries: Retries after connection errors, timeouts and 429/5xx responses
+            backoff_factor: Base of the exponential sleep between retries (capped at a few seconds)
+            cache: Optional result cache; failed searches are never cached
+            fanout_engines: Engines queried in 'fanout' mode (default: every registered engine that is configured)
+            hedge_percentile: In 'fanout' mode, start the next engine once the running one is slower than
+                this percentile of its recent latencies; None queries all engines at once
+            hedge_delay: Hedging delay used until an engine has latency history
+            min_hedge_delay: Lower bound of the hedging delay
+            engine_concurrency: aexecute() requests in flight at once per engine; the rest wait their turn
+            host_concurrency: aexecute() connections open at once per host (default: pool_size)
         """
         self.api_key = api_key
         self.search_engine = search_engine
+        self.duckduckgo_url = duckduckgo_url or self.DUCKDUCKGO_URL
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.session = self._create_session(pool_size, retries, backoff_factor)
+        self.cache = cache
+        self.engines: Dict[str, Engine] = {
+            "duckduckgo": self._fetch_duckduckgo,
+            "google": self._fetch_google
+        }
+        self.async_engines: Dict[str, AsyncEngine] = {
+            "duckduckgo": self._afetch_duckduckgo,
+            "google": self._afetch_google
+        }
+        self.fanout_engines = fanout_engines
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.latency = EngineLatency()
+        self.engine_concurrency = engine_concurrency
+        self.host_concurrency = host_concurrency or pool_size
+        self._executor = None
+        self._async: Optional[_AsyncState] = None
+    
+    def _create_session(self, pool_size: int, retries: int, backoff_factor: float) -> requests.Session:
+        """Keep-alive session shared by all searches, so DNS, TCP and TLS setup happen once per host."""
+        retry = _SearchRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def register_engine(self, name: str, engine: Engine, async_engine: Optional[AsyncEngine] = None):
+        """
+        Add a search backend.
+        
+        Args:
+            name: Engine name, usable as search_engine or in fanout_engines
+            engine: Callable (query, max_results) -> {"answer", "items"}, raising SearchError on failure
+            async_engine: Coroutine version used by aexecute(); without one, engine runs in a worker thread
+        """
+        self.engines[name] = engine
+        if async_engine is not None:
+            self.async_engines[name] = async_engine
+        else:
+            self.async_engines.pop(name, None)
+    
+    def duckduckgo_engine(self, url: str) -> Engine:
+        """Engine for another DuckDuckGo-compatible Instant Answer endpoint (e.g. a mirror or proxy)."""
+        return partial(self._fetch_duckduckgo, url=url)
+    
+    def async_duckduckgo_engine(self, url: str) -> AsyncEngine:
+        """Coroutine version of duckduckgo_engine(), for register_engine(..., async_engine=...)."""
+        return partial(self._afetch_duckduckgo, url=url)
+    
+    def close(self):
+        """Close pooled connections and the result cache."""
+        self.session.close()
+        self._async = None  # the non-blocking pool is closed by aclose() on its loop, or goes with the loop
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
     
     def execute(self, query: str, max_results: int = 5) -> str:
         """
@@ -33,72 +229,370 @@ class WebSearch:
             Search results as formatted string
         """
         try:
-            if self.search_engine == "duckduckgo":
-                return self._search_duckduckgo(query, max_results)
-            elif self.search_engine == "google":
-                return self._search_google(query, max_results)
-            else:
-                return self._search_simple(query, max_results)
+            if self.cache is not None and (self.search_engine == "fanout" or self.search_engine in self.engines):
+                engine = self.search_engine
+                if engine == "fanout":
+                    engine = "fanout:" + ",".join(sorted(self._fanout_engines()))
+                key = SearchCache.key(engine, query, max_results)
+                return self.cache.get(key, lambda: self._search(query, max_results))
+            return self._search(query, max_results)
+        except SearchError as e:
+            return str(e)
         except Exception as e:
             return f"Error performing web search: {str(e)}"
     
-    def _search_duckduckgo(self, query: str, max_results: int) -> str:
+    async def aexecute(self, query: str, max_results: int = 5) -> str:
+        """
+        Execute a web search without blocking the event loop.
+        
+        Same results and caching as execute(). Requests go through one non-blocking
+        connection pool per event loop, so hundreds of searches can run concurrently
+        without a thread each; engine_concurrency and host_concurrency bound how many
+        actually hit the network at once.
+        """
+        try:
+            if self.cache is not None and (self.search_engine == "fanout" or self.search_engine in self.engines):
+                engine = self.search_engine
+                if engine == "fanout":
+                    engine = "fanout:" + ",".join(sorted(self._fanout_engines()))
+                key = SearchCache.key(engine, query, max_results)
+                return await self.cache.aget(key, lambda: self._asearch(query, max_results))
+            return await self._asearch(query, max_results)
+        except SearchError as e:
+            return str(e)
+        except Exception as e:
+            return f"Error performing web search: {str(e)}"
+    
+    async def aclose(self):
+        """Close the non-blocking connection pool of the running event loop."""
+        state, self._async = self._async, None
+        if state is not None:
+            await state.aclose()
+    
+    def _async_state(self) -> _AsyncState:
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._async.loop is not loop:
+            try:
+                import httpx
+            except ImportError:
+                raise RuntimeError("aexecute() requires httpx (pip install httpx)")
+            timeout = httpx.Timeout(self.timeout[1], connect=self.timeout[0])
+            shard = _AsyncState.SHARD_SIZE
+            clients = [httpx.AsyncClient(timeout=timeout, limits=httpx.Limits(max_connections=shard,
+                                                                              max_keepalive_connections=shard))
+                       for _ in range(-(-self.host_concurrency // shard))]
+            self._async = _AsyncState(loop, clients, self.engine_concurrency, self.host_concurrency)
+        return self._async
+    
+    async def _aget_json(self, engine: str, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a JSON document, retrying like the blocking session does, within the engine and host limits."""
+        import httpx
+        state = self._async_state()
+        async with state.engine(engine), state.host(url):
+            attempt = 0
+            while True:
+                try:
+                    response = await state.get(url, params=params)
+                    if response.status_code not in self.RETRY_STATUSES or attempt >= self.retries:
+                        response.raise_for_status()
+                        return response.json()
+                except httpx.TransportError:
+                    if attempt >= self.retries:
+                        raise
+                backoff = min(_SearchRetry.MAX_BACKOFF, self.backoff_factor * (2 ** attempt)) if attempt else 0.0
+                attempt += 1
+                SEARCH_RETRIES.inc(action="web_search")
+                await asyncio.sleep(backoff)
+    
+    def _search(self, query: str, max_results: int) -> str:
+        if self.search_engine == "fanout":
+            return self._format(query, self._search_fanout(query, max_results))
+        elif self.search_engine in self.engines:
+            return self._format(query, self._run_engine(self.search_engine, query, max_results), self.search_engine)
+        else:
+            return self._search_simple(query, max_results)
+    
+    def _format(self, query: str, result: Dict[str, Any], engine: Optional[str] = None) -> str:
+        lines = ([f"Answer: {result['answer']}"] if result.get("answer") else []) + result["items"]
+        if lines:
+            return "\n".join(lines)
+        if engine == "duckduckgo":
+            return f"Search completed for '{query}'. No instant answers found. Consider using a search API for more detailed results."
+        return f"No results found for '{query}'"
+    
+    async def _asearch(self, query: str, max_results: int) -> str:
+        if self.search_engine == "fanout":
+            return self._format(query, await self._asearch_fanout(query, max_results))
+        elif self.search_engine in self.engines:
+            return self._format(query, await self._arun_engine(self.search_engine, query, max_results), self.search_engine)
+        else:
+            return self._search_simple(query, max_results)
+    
+    def _run_engine(self, engine: str, query: str, max_results: int) -> Dict[str, Any]:
+        """Query one engine, recording its latency (failures count as a full read timeout)."""
+        started = time.perf_counter()
+        try:
+            result = self.engines[engine](query, max_results)
+        except Exception:
+            ENGINE_ERRORS.inc(engine=engine)
+            self.latency.record(engine, self.timeout[1])
+            raise
+        elapsed = time.perf_counter() - started
+        self.latency.record(engine, elapsed)
+        ENGINE_DURATION.observe(elapsed, engine=engine)
+        return result
+    
+    async def _arun_engine(self, engine: str, query: str, max_results: int) -> Dict[str, Any]:
+        """_run_engine() for aexecute(); engines without a coroutine version run in a worker thread."""
+        if engine not in self.async_engines:
+            return await asyncio.to_thread(self._run_engine, engine, query, max_results)
+        started = time.perf_counter()
+        try:
+            result = await self.async_engines[engine](query, max_results)
+        except Exception:
+            ENGINE_ERRORS.inc(engine=engine)
+            self.latency.record(engine, self.timeout[1])
+            raise
+        elapsed = time.perf_counter() - started
+        self.latency.record(engine, elapsed)
+        ENGINE_DURATION.observe(elapsed, engine=engine)
+        return result
+    
+    def _fanout_engines(self) -> List[str]:
+        if self.fanout_engines:
+            return [name for name in self.fanout_engines if name in self.engines]
+        return [name for name in self.engines if name != "google" or self.api_key]
+    
+    def _expected_latency(self, engine: str) -> float:
+        median = self.latency.percentile(engine, 50)
+        return self.hedge_delay if median is None else median
+    
+    def _hedge_delay(self, engine: str) -> float:
+        delay = self.latency.percentile(engine, self.hedge_percentile)
+        delay = self.hedge_delay if delay is None else delay
+        return min(max(delay, self.min_hedge_delay), self.timeout[1])
+    
+    @staticmethod
+    def _good(result: Dict[str, Any], max_results: int) -> bool:
+        """An answer, or a full page of related results."""
+        return bool(result.get("answer")) or len(result["items"]) >= max_results
+    
+    def _search_fanout(self, query: str, max_results: int) -> Dict[str, Any]:
+        """
+        Query several engines, fastest first, and return the first good result.
+        
+        The next engine is started when the running one fails, returns a weak result, or
+        takes longer than its usual (hedge_percentile) latency. Results of engines that
+        finished in the meantime are merged in; stragglers are abandoned.
+        """
+        queue = sorted(self._fanout_engines(), key=self._expected_latency)
+        if not queue:
+            raise SearchError(f"No search engines configured for '{query}'")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4 * max(len(self.engines), 2), thread_name_prefix="web-search")
+        
+        running = {}
+        finished = []  # (engine, result) in completion order
+        errors = []
+        
+        def launch():
+            engine = queue.pop(0)
+            running[self._executor.submit(self._run_engine, engine, query, max_results)] = engine
+            return engine
+        
+        last = launch()
+        if self.hedge_percentile is None:
+            while queue:
+                launch()
+        best = None
+        while running and best is None:
+            timeout = self._hedge_delay(last) if queue else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                SEARCH_HEDGES.inc(reason="slow")
+                last = launch()
+                continue
+            for future in done:
+                engine = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A third-party engine may raise anything; it only costs that engine its turn
+                    errors.append(self._engine_error(engine, e))
+                    if queue:
+                        SEARCH_HEDGES.inc(reason="error")
+                        last = launch()
+                    continue
+                finished.append((engine, result))
+                if self._good(result, max_results):
+                    best = result
+                elif queue:
+                    SEARCH_HEDGES.inc(reason="weak")
+                    last = launch()
+        
+        for future in running:
+            future.cancel()  # only stops engines not yet started; running requests are left to finish
+        if not finished:
+            raise SearchError("; ".join(errors))
+        return self._merge(best or max((r for _, r in finished), key=lambda r: len(r["items"])),
+                           [r for _, r in finished], max_results)
+    
+    async def _asearch_fanout(self, query: str, max_results: int) -> Dict[str, Any]:
+        """_search_fanout() for aexecute(); abandoned engines are cancelled, closing their requests."""
+        queue = sorted(self._fanout_engines(), key=self._expected_latency)
+        if not queue:
+            raise SearchError(f"No search engines configured for '{query}'")
+        
+        running = {}
+        finished = []
+        errors = []
+        
+        def launch():
+            engine = queue.pop(0)
+            running[asyncio.ensure_future(self._arun_engine(engine, query, max_results))] = engine
+            return engine
+        
+        last = launch()
+        if self.hedge_percentile is None:
+            while queue:
+                launch()
+        best = None
+        try:
+            while running and best is None:
+                timeout = self._hedge_delay(last) if queue else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    SEARCH_HEDGES.inc(reason="slow")
+                    last = launch()
+                    continue
+                for task in done:
+                    engine = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(self._engine_error(engine, e))
+                        if queue:
+                            SEARCH_HEDGES.inc(reason="error")
+                            last = launch()
+                        continue
+                    finished.append((engine, result))
+                    if self._good(result, max_results):
+                        best = result
+                    elif queue:
+                        SEARCH_HEDGES.inc(reason="weak")
+                        last = launch()
+        finally:
+            for task in running:
+                task.cancel()
+        if not finished:
+            raise SearchError("; ".join(errors))
+        return self._merge(best or max((r for _, r in finished), key=lambda r: len(r["items"])),
+                           [r for _, r in finished], max_results)
+    
+    @staticmethod
+    def _engine_error(engine: str, error: Exception) -> str:
+        """Message for a failed fan-out engine; SearchError messages are already meant for the user."""
+        return str(error) if isinstance(error, SearchError) else f"{engine} search error: {error!r}"
+    
+    @staticmethod
+    def _merge(primary: Dict[str, Any], results: List[Dict[str, Any]], max_results: int) -> Dict[str, Any]:
+        """Primary result first, then unseen items from the others, deduplicated case- and whitespace-insensitively."""
+        answer = primary.get("answer") or next((r["answer"] for r in results if r.get("answer")), None)
+        items, seen = [], set()
+        for result in [primary] + [r for r in results if r is not primary]:
+            for item in result["items"]:
+                key = " ".join(item.lower().split())
+                if key not in seen:
+                    seen.add(key)
+                    items.append(item)
+        return {"answer": answer, "items": items[:max_results]}
+    
+    def _fetch_duckduckgo(self, query: str, max_results: int, url: Optional[str] = None) -> Dict[str, Any]:
         """Search using DuckDuckGo (no API key required)."""
         try:
-            # DuckDuckGo Instant Answer API
-            url = f"https://api.duckduckgo.com/?q={quote(query)}&format=json&no_html=1&skip_disambig=1"
-            response = requests.get(url, timeout=5)
-            data = response.json()
-            
-            results = []
-            
-            # Get abstract/answer
-            if data.get("AbstractText"):
-                results.append(f"Answer: {data['AbstractText']}")
-            
-            # Get related topics
-            if data.get("RelatedTopics"):
-                for topic in data["RelatedTopics"][:max_results]:
-                    if isinstance(topic, dict) and "Text" in topic:
-                        results.append(f"- {topic['Text']}")
-            
-            if results:
-                return "\n".join(results)
-            else:
-                return f"Search completed for '{query}'. No instant answers found. Consider using a search API for more detailed results."
-                
+            response = self.session.get(self._duckduckgo_request(query, url), timeout=self.timeout)
+            response.raise_for_status()
+            return self._parse_duckduckgo(response.json(), max_results)
+        except requests.Timeout as e:
+            SEARCH_TIMEOUTS.inc(action="web_search")
+            raise SearchError(f"DuckDuckGo search error: {str(e)}. Note: For production use, consider integrating a proper search API.")
         except Exception as e:
-            return f"DuckDuckGo search error: {str(e)}. Note: For production use, consider integrating a proper search API."
+            raise SearchError(f"DuckDuckGo search error: {str(e)}. Note: For production use, consider integrating a proper search API.")
+    
+    async def _afetch_duckduckgo(self, query: str, max_results: int, url: Optional[str] = None) -> Dict[str, Any]:
+        """Non-blocking _fetch_duckduckgo()."""
+        import httpx
+        try:
+            data = await self._aget_json("duckduckgo", self._duckduckgo_request(query, url))
+            return self._parse_duckduckgo(data, max_results)
+        except httpx.TimeoutException as e:
+            SEARCH_TIMEOUTS.inc(action="web_search")
+            raise SearchError(f"DuckDuckGo search error: {str(e) or 'timed out'}. Note: For production use, consider integrating a proper search API.")
+        except Exception as e:
+            raise SearchError(f"DuckDuckGo search error: {str(e)}. Note: For production use, consider integrating a proper search API.")
+    
+    def _duckduckgo_request(self, query: str, url: Optional[str] = None) -> str:
+        # DuckDuckGo Instant Answer API
+        return f"{url or self.duckduckgo_url}?q={quote(query)}&format=json&no_html=1&skip_disambig=1"
+    
+    @staticmethod
+    def _parse_duckduckgo(data: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+        # Abstract/answer plus related topics
+        items = []
+        if data.get("RelatedTopics"):
+            for topic in data["RelatedTopics"][:max_results]:
+                if isinstance(topic, dict) and "Text" in topic:
+                    items.append(f"- {topic['Text']}")
+        return {"answer": data.get("AbstractText") or None, "items": items}
     
-    def _search_google(self, query: str, max_results: int) -> str:
+    def _fetch_google(self, query: str, max_results: int) -> Dict[str, Any]:
         """Search using Google (requires API key)."""
         if not self.api_key:
-            return "Google search requires an API key. Please set it in the WebSearch initialization."
+            raise SearchError("Google search requires an API key. Please set it in the WebSearch initialization.")
         
         try:
-            # Google Custom Search API
-            url = "https://www.googleapis.com/customsearch/v1"
-            params = {
-                "key": self.api_key,
-                "cx": "YOUR_SEARCH_ENGINE_ID",  # Replace with actual search engine ID
-                "q": query,
-                "num": max_results
-            }
-            response = requests.get(url, params=params, timeout=5)
-            data = response.json()
-            
-            results = []
-            if "items" in data:
-                for item in data["items"]:
-                    results.append(f"Title: {item.get('title', 'N/A')}")
-                    results.append(f"Link: {item.get('link', 'N/A')}")
-                    results.append(f"Snippet: {item.get('snippet', 'N/A')}")
-                    results.append("")
-            
-            return "\n".join(results) if results else f"No results found for '{query}'"
-            
+            url, params = self._google_request(query, max_results)
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return self._parse_google(response.json())
+        except requests.Timeout as e:
+            SEARCH_TIMEOUTS.inc(action="web_search")
+            raise SearchError(f"Google search error: {str(e)}")
         except Exception as e:
-            return f"Google search error: {str(e)}"
+            raise SearchError(f"Google search error: {str(e)}")
+    
+    async def _afetch_google(self, query: str, max_results: int) -> Dict[str, Any]:
+        """Non-blocking _fetch_google()."""
+        if not self.api_key:
+            raise SearchError("Google search requires an API key. Please set it in the WebSearch initialization.")
+        
+        import httpx
+        try:
+            url, params = self._google_request(query, max_results)
+            return self._parse_google(await self._aget_json("google", url, params))
+        except httpx.TimeoutException as e:
+            SEARCH_TIMEOUTS.inc(action="web_search")
+            raise SearchError(f"Google search error: {str(e) or 'timed out'}")
+        except Exception as e:
+            raise SearchError(f"Google search error: {str(e)}")
+    
+    def _google_request(self, query: str, max_results: int):
+        # Google Custom Search API
+        url = "https://www.googleapis.com/customsearch/v1"
+        params = {
+            "key": self.api_key,
+            "cx": "YOUR_SEARCH_ENGINE_ID",  # Replace with actual search engine ID
+            "q": query,
+            "num": max_results
+        }
+        return url, params
+    
+    @staticmethod
+    def _parse_google(data: Dict[str, Any]) -> Dict[str, Any]:
+        items = []
+        for item in data.get("items", []):
+            items.append(f"Title: {item.get('title', 'N/A')}\nLink: {item.get('link', 'N/A')}\nSnippet: {item.get('snippet', 'N/A')}\n")
+        return {"answer": None, "items": items}
     
     def _search_simple(self, query: str, max_results: int) -> str:
         """Simple search fallback (simulated)."""
@@ -110,4 +604,3 @@ if __name__ == "__main__":
     search = WebSearch()
     result = search.execute("Python programming")
     print(result)
-